@@ -14,3 +14,13 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'petrescue.settings')
 
 application = get_asgi_application()
+
+# Import views, compile templates and fill caches before serving; a no-op unless WARMUP_ON_START.
+from users.warmup import warm_up_if_enabled  # noqa: E402
+
+warm_up_if_enabled()
+
+# Background jobs (adoption due-date processing); a no-op unless SCHEDULER_ENABLED.
+from users.scheduler import start_if_enabled  # noqa: E402
+
+start_if_enabled()
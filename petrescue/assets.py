@@ -0,0 +1,296 @@
+"""
+Build-time static asset pipeline and the middleware that serves its output.
+
+OptimizedStaticFilesStorage runs during ``collectstatic``:
+
+* CSS is minified before Django content-hashes it, so hashed names change
+  only when the minified output does;
+* every hashed text asset gets ``.gz`` (and ``.br`` when the optional
+  ``brotli`` package is installed) siblings;
+* every hashed JPEG/PNG gets resized copies at STATIC_IMAGE_WIDTHS plus WebP
+  and AVIF siblings of each size (AVIF only if Pillow was built with it).
+  The sizes produced are recorded in ``staticfiles-variants.json`` for the
+  ``responsive_image`` template tag;
+* CSS background images get the same widths through media queries appended
+  to the hashed stylesheet (see background_overrides). The stylesheet's hash
+  covers the hashed image URLs those queries derive from, but not
+  STATIC_IMAGE_WIDTHS: change the widths together with the CSS.
+
+Sibling files are named ``<hashed name>.<gz|br|webp|avif>``;
+PrecompressedStaticMiddleware picks the best one for each request from
+Accept-Encoding / Accept.
+"""
+import gzip
+import json
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+try:
+    from PIL import Image, features
+except ImportError:  # Pillow is required by ImageField, but stay importable without it
+    Image = features = None
+
+VARIANTS_MANIFEST = 'staticfiles-variants.json'
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.svg', '.json', '.txt', '.html', '.xml')
+RASTER_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.')
+CSS_URL_RE = re.compile(r'''url\((['"]?)([^'")?#]+)\1\)''')
+
+
+def minify_css(css):
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    css = css.replace(';}', '}')
+    return css.strip()
+
+
+def image_formats():
+    """Modern formats this Pillow build can encode, best first."""
+    if features is None:
+        return []
+    return [fmt for fmt in ('avif', 'webp') if features.check(fmt)]
+
+
+def width_variant_name(name, width):
+    base, ext = os.path.splitext(name)
+    return f"{base}.{width}w{ext}"
+
+
+def _top_level_rules(css):
+    """(selector, declarations) for each rule of minified CSS outside @-blocks."""
+    position = 0
+    while True:
+        brace = css.find('{', position)
+        if brace < 0:
+            return
+        selector = css[position:brace].rsplit(';', 1)[-1].strip()
+        if selector.startswith('@'):
+            depth, position = 1, brace + 1
+            while depth and position < len(css):
+                depth += {'{': 1, '}': -1}.get(css[position], 0)
+                position += 1
+            continue
+        end = css.find('}', brace)
+        if end < 0:
+            return
+        yield selector, css[brace + 1:end]
+        position = end + 1
+
+
+def background_overrides(css, css_name, image_widths):
+    """
+    Media queries that point the background images of ``css`` (the hashed
+    stylesheet ``css_name``) at their width variants. ``image_widths`` maps
+    hashed image names to the widths built for them. A variant is used on
+    1x screens up to its width and on any screen up to half of it. The
+    rule's background declarations are repeated whole, so shorthands keep
+    the longhands that follow them.
+    """
+    by_width = {}
+    for selector, block in _top_level_rules(css):
+        declarations = [d for d in block.split(';') if d.strip().lower().startswith('background')]
+        widths = set()
+        for declaration in declarations:
+            for _, url in CSS_URL_RE.findall(declaration):
+                name = posixpath.normpath(posixpath.join(posixpath.dirname(css_name), url))
+                widths.update(image_widths.get(name, ())[:-1])
+        for width in widths:
+            def variant(match):
+                url = match.group(2)
+                name = posixpath.normpath(posixpath.join(posixpath.dirname(css_name), url))
+                if width in image_widths.get(name, ())[:-1]:
+                    url = width_variant_name(url, width)
+                return f"url({match.group(1)}{url}{match.group(1)})"
+            rewritten = ';'.join(CSS_URL_RE.sub(variant, d) for d in declarations)
+            by_width.setdefault(width, []).append(f"{selector}{{{rewritten}}}")
+    # Widest first, so the narrower queries that also match win.
+    return ''.join(
+        f"@media (max-width:{width // 2}px),(max-width:{width}px) and (max-resolution:1dppx){{{''.join(rules)}}}"
+        for width, rules in sorted(by_width.items(), reverse=True)
+    )
+
+
+class OptimizedStaticFilesStorage(ManifestStaticFilesStorage):
+    def stored_name(self, name):
+        # Without a manifest (collectstatic has not run, e.g. in tests) there
+        # is nothing to look up. Once it exists every lookup is strict, so a
+        # missing or misspelled reference still fails.
+        if not self.hashed_files:
+            return name
+        return super().stored_name(name)
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = dict(paths)
+            for name in paths:
+                if name.endswith('.css'):
+                    self._minify(name)
+                    # Hash the minified copy in STATIC_ROOT, not the source file.
+                    paths[name] = (self, name)
+
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+
+        # Images first: the stylesheets point at their variants before being compressed.
+        variants, image_widths = {}, {}
+        for original, hashed in self.hashed_files.items():
+            if hashed.lower().endswith(RASTER_EXTENSIONS):
+                info = self._build_image_variants(hashed)
+                if info:
+                    variants[original] = info
+                    image_widths[hashed] = info['widths']
+        self._write(VARIANTS_MANIFEST, json.dumps(variants, sort_keys=True).encode())
+        for hashed in self.hashed_files.values():
+            lowered = hashed.lower()
+            if lowered.endswith('.css'):
+                self._add_background_overrides(hashed, image_widths)
+            if lowered.endswith(COMPRESSIBLE_EXTENSIONS):
+                self._compress(hashed)
+
+    def _minify(self, name):
+        with self.open(name) as fh:
+            css = fh.read().decode('utf-8')
+        self._write(name, minify_css(css).encode('utf-8'))
+
+    def _add_background_overrides(self, name, image_widths):
+        with self.open(name) as fh:
+            css = fh.read().decode('utf-8')
+        overrides = background_overrides(css, name, image_widths)
+        if overrides:
+            self._write(name, (css + overrides).encode('utf-8'))
+
+    def _compress(self, name):
+        with self.open(name) as fh:
+            data = fh.read()
+        self._write(name + '.gz', gzip.compress(data, compresslevel=9, mtime=0), smaller_than=data)
+        if brotli is not None:
+            self._write(name + '.br', brotli.compress(data), smaller_than=data)
+
+    def _build_image_variants(self, name):
+        if Image is None:
+            return None
+        formats = image_formats()
+        with Image.open(self.path(name)) as source:
+            source.load()
+            if source.mode == 'P':
+                source = source.convert('RGBA')
+            width, height = source.size
+            widths = sorted({w for w in settings.STATIC_IMAGE_WIDTHS if w < width} | {width})
+            for w in widths:
+                image = source if w == width else source.resize((w, round(height * w / width)), Image.LANCZOS)
+                target = name if w == width else width_variant_name(name, w)
+                if w != width:
+                    self._save_image(image, target, source.format)
+                for fmt in formats:
+                    self._save_image(image, f"{target}.{fmt}", fmt.upper())
+        return {'width': width, 'height': height, 'widths': widths, 'formats': formats}
+
+    def _save_image(self, image, name, fmt):
+        if fmt in ('JPEG', 'AVIF') and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        path = self.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if fmt == 'JPEG':
+            image.save(path, fmt, quality=80, optimize=True, progressive=True)
+        else:
+            image.save(path, fmt, quality=70)
+
+    def _write(self, name, data, smaller_than=None):
+        if smaller_than is not None and len(data) >= len(smaller_than):
+            return
+        if self.exists(name):
+            self.delete(name)
+        self._save(name, ContentFile(data))
+
+
+# -----------------------
+# Serving
+# -----------------------
+def _accepts(header, token):
+    """True if ``token`` is listed in an Accept/Accept-Encoding header with q > 0."""
+    for part in header.split(','):
+        value, _, params = part.strip().partition(';')
+        if value.strip().lower() == token:
+            q = params.strip().lower()
+            return not (q.startswith('q=') and float(q[2:] or 0) == 0)
+    return False
+
+
+class PrecompressedStaticMiddleware:
+    """
+    Serves files from STATIC_ROOT, preferring a precompressed or modern-format
+    sibling the client accepts. Hashed files are cached for a year.
+    """
+    encodings = (('br', '.br'), ('gzip', '.gz'))
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.root = getattr(settings, 'STATIC_ROOT', None)
+        self.prefix = '/' + settings.STATIC_URL.lstrip('/') if settings.STATIC_URL else None
+
+    def __call__(self, request):
+        if self.root and self.prefix and request.method in ('GET', 'HEAD') and request.path.startswith(self.prefix):
+            response = self.serve(request, request.path[len(self.prefix):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(self.root, name)
+        except Exception:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        content_type, _ = mimetypes.guess_type(path)
+        chosen, extra_headers, vary = path, {}, None
+        if name.lower().endswith(RASTER_EXTENSIONS):
+            vary = 'Accept'
+            accept = request.META.get('HTTP_ACCEPT', '')
+            for fmt in image_formats():
+                if _accepts(accept, f'image/{fmt}') and os.path.isfile(f"{path}.{fmt}"):
+                    chosen, content_type = f"{path}.{fmt}", f'image/{fmt}'
+                    break
+        elif name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+            vary = 'Accept-Encoding'
+            accept = request.META.get('HTTP_ACCEPT_ENCODING', '')
+            for encoding, suffix in self.encodings:
+                if _accepts(accept, encoding) and os.path.isfile(path + suffix):
+                    chosen, extra_headers = path + suffix, {'Content-Encoding': encoding}
+                    break
+
+        stat = os.stat(chosen)
+        if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(open(chosen, 'rb'), content_type=content_type or 'application/octet-stream')
+            response['Content-Length'] = stat.st_size
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        for header, value in extra_headers.items():
+            response[header] = value
+        if vary:
+            response['Vary'] = vary
+        if HASHED_NAME_RE.search(name):
+            response['Cache-Control'] = 'public, max-age=31536000, immutable'
+        else:
+            response['Cache-Control'] = 'public, max-age=300'
+        return response
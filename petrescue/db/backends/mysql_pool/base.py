@@ -0,0 +1,50 @@
+"""
+MySQL backend that borrows connections from a process-wide pool instead of
+opening a new one per request.
+
+Django still "closes" the connection at the end of every request
+(CONN_MAX_AGE = 0); closing hands the connection back to the pool after
+rolling back anything left open. Pool settings come from the POOL key of the
+database settings:
+
+    'POOL': {'MAX_SIZE': 10, 'TIMEOUT': 5, 'MAX_LIFETIME': 1800, 'HEALTH_CHECK': True}
+"""
+from django.db.backends.mysql import base as mysql_base
+
+from petrescue.db.pool import PoolTimeout, get_pool
+
+Database = mysql_base.Database
+
+
+def _ping(conn):
+    conn.ping()
+
+
+class DatabaseWrapper(mysql_base.DatabaseWrapper):
+    def _get_pool(self, conn_params):
+        options = self.settings_dict.get('POOL', {})
+        return get_pool(
+            self.alias,
+            factory=lambda: super(DatabaseWrapper, self).get_new_connection(conn_params),
+            max_size=options.get('MAX_SIZE', 10),
+            timeout=options.get('TIMEOUT', 5.0),
+            max_lifetime=options.get('MAX_LIFETIME', 1800.0),
+            validate=_ping if options.get('HEALTH_CHECK', True) else None,
+        )
+
+    def get_new_connection(self, conn_params):
+        try:
+            return self._get_pool(conn_params).acquire()
+        except PoolTimeout as exc:
+            # Raised as a driver error so Django reports it as OperationalError.
+            raise Database.OperationalError(str(exc)) from exc
+
+    def _close(self):
+        if self.connection is None:
+            return
+        reusable = not self.errors_occurred
+        try:
+            self.connection.rollback()
+        except Database.Error:
+            reusable = False
+        self._get_pool(None).release(self.connection, reusable=reusable)
@@ -0,0 +1,203 @@
+"""
+A small bounded connection pool shared by all threads of a worker process.
+
+Connections are handed out LIFO so idle ones at the bottom can age out. Every
+borrowed connection is optionally validated first and is recycled once it is
+older than ``max_lifetime``. Network I/O (connect, validate, close) happens
+outside the pool lock, so a slow server never blocks other borrowers that
+could be served from the idle list.
+
+A forked child (gunicorn --preload) starts with empty pools: the connections
+inherited from the parent share its sockets, so the child forgets them
+without closing them and opens its own.
+"""
+import os
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    pass
+
+
+class ConnectionPool:
+    def __init__(self, factory, max_size=10, timeout=5.0, max_lifetime=1800.0, validate=None):
+        self._factory = factory
+        self._validate = validate
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._born = {}  # id(conn) -> creation time
+        self._size = 0  # open connections, idle or checked out
+
+        self._checkouts = 0
+        self._checkout_failures = 0
+        self._timeouts = 0
+        self._created = 0
+        self._recycled = 0
+        self._discarded = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    # -----------------------
+    # Borrow / return
+    # -----------------------
+    def acquire(self):
+        started = time.monotonic()
+        while True:
+            conn = self._reserve(started + self.timeout)
+            if conn is None:
+                return self._create(started)
+            if self._expired(conn):
+                self._discard(conn, recycled=True)
+            elif not self._is_healthy(conn):
+                self._discard(conn)
+            else:
+                self._record_checkout(started)
+                return conn
+
+    def release(self, conn, reusable=True):
+        if not reusable or self._expired(conn):
+            self._discard(conn, recycled=reusable)
+            return
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+        for conn in idle:
+            self._discard(conn)
+
+    def forget(self):
+        """Drops every connection without closing it; for a child after fork()."""
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._born = {}
+        self._size = 0
+
+    def stats(self):
+        with self._cond:
+            in_use = self._size - len(self._idle)
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': in_use,
+                'max_size': self.max_size,
+                'utilization': round(in_use / self.max_size, 3) if self.max_size else 0,
+                'checkouts': self._checkouts,
+                'checkout_failures': self._checkout_failures,
+                'timeouts': self._timeouts,
+                'created': self._created,
+                'recycled': self._recycled,
+                'discarded': self._discarded,
+                'wait_ms_total': round(self._wait_total * 1000, 3),
+                'wait_ms_max': round(self._wait_max * 1000, 3),
+                'wait_ms_avg': round(self._wait_total * 1000 / self._checkouts, 3) if self._checkouts else 0,
+            }
+
+    # -----------------------
+    # Internals
+    # -----------------------
+    def _reserve(self, deadline):
+        """
+        Pops an idle connection, or returns None after reserving a slot for a
+        new one. Waits for a release while the pool is exhausted.
+        """
+        with self._cond:
+            while True:
+                if self._idle:
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    self._checkout_failures += 1
+                    raise PoolTimeout(
+                        f"Timed out after {self.timeout}s waiting for one of {self.max_size} pooled connections"
+                    )
+                self._cond.wait(remaining)
+
+    def _create(self, started):
+        try:
+            conn = self._factory()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._checkout_failures += 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._born[id(conn)] = time.monotonic()
+            self._created += 1
+        self._record_checkout(started)
+        return conn
+
+    def _discard(self, conn, recycled=False):
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._born.pop(id(conn), None)
+            self._size -= 1
+            if recycled:
+                self._recycled += 1
+            else:
+                self._discarded += 1
+            self._cond.notify()
+
+    def _expired(self, conn):
+        born = self._born.get(id(conn))
+        return born is None or (self.max_lifetime and time.monotonic() - born > self.max_lifetime)
+
+    def _is_healthy(self, conn):
+        if self._validate is None:
+            return True
+        try:
+            return self._validate(conn) is not False
+        except Exception:
+            return False
+
+    def _record_checkout(self, started):
+        waited = time.monotonic() - started
+        with self._cond:
+            self._checkouts += 1
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(name, **kwargs):
+    """Returns the process-wide pool called ``name``, creating it on first use."""
+    with _pools_lock:
+        if name not in _pools:
+            _pools[name] = ConnectionPool(**kwargs)
+        return _pools[name]
+
+
+def pool_stats():
+    with _pools_lock:
+        pools = dict(_pools)
+    return {name: pool.stats() for name, pool in pools.items()}
+
+
+def _forget_inherited_connections():
+    global _pools_lock
+    _pools_lock = threading.Lock()
+    for pool in _pools.values():
+        pool.forget()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_inherited_connections)
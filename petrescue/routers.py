@@ -0,0 +1,174 @@
+"""
+Primary/replica database routing.
+
+Reads made while handling a request go to one of the replicas listed in
+DATABASE_REPLICAS (alias -> weight), picked at random by weight among the
+replicas that passed their last health check. Everything else goes to the
+primary: writes, reads inside a transaction, reads after the request has
+written, every read in a POST/PUT/PATCH/DELETE request, and all reads outside
+a request (management commands, scheduled jobs). After a request writes, the
+user's session is pinned to the primary for REPLICA_PIN_SECONDS so they see
+their own changes on the next pages.
+
+A replica that fails to connect when a request picks it, or raises an
+OperationalError mid-request, is ejected at once; it is checked again after
+REPLICA_HEALTH_CHECK_INTERVAL seconds.
+"""
+import contextvars
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+logger = logging.getLogger(__name__)
+
+PIN_SESSION_KEY = '_db_pin_primary_until'
+
+SAFE_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+WRITE_STATEMENTS = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+# Writes to these tables do not count as user writes (the session save itself).
+UNPINNED_TABLES = ('django_session',)
+
+_request_state = contextvars.ContextVar('db_routing_state', default=None)
+
+
+class ReplicaHealth:
+    """Remembers which replicas answered their last connection check."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._status = {}  # alias -> (healthy, checked_at)
+
+    def is_healthy(self, alias):
+        interval = getattr(settings, 'REPLICA_HEALTH_CHECK_INTERVAL', 30)
+        with self._lock:
+            healthy, checked_at = self._status.get(alias, (True, None))
+        if checked_at is not None and time.monotonic() - checked_at < interval:
+            return healthy
+        healthy = self._check(alias)
+        with self._lock:
+            self._status[alias] = (healthy, time.monotonic())
+        return healthy
+
+    def eject(self, alias):
+        logger.warning("Replica %s failed; ejecting it", alias)
+        with self._lock:
+            self._status[alias] = (False, time.monotonic())
+
+    def connect(self, alias):
+        """Opens the replica's connection if needed; ejects it if that fails."""
+        if self._check(alias):
+            return True
+        self.eject(alias)
+        return False
+
+    def _check(self, alias):
+        try:
+            connections[alias].ensure_connection()
+            return True
+        except Exception:
+            logger.warning("Replica %s failed its health check", alias)
+            return False
+
+
+health = ReplicaHealth()
+
+
+def choose_replica():
+    replicas = {
+        alias: weight
+        for alias, weight in getattr(settings, 'DATABASE_REPLICAS', {}).items()
+        if weight > 0 and health.is_healthy(alias)
+    }
+    while replicas:
+        alias = random.choices(list(replicas), weights=list(replicas.values()))[0]
+        if health.connect(alias):
+            return alias
+        del replicas[alias]
+    return None
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _request_state.get()
+        if state is None or state['pinned'] or state['wrote']:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        if state['replica'] is None:
+            state['replica'] = choose_replica() or DEFAULT_DB_ALIAS
+        return state['replica']
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+def _track_writes(execute, sql, params, many, context):
+    # db_for_write() is also consulted when related objects are merely
+    # assigned, so writes are detected from the statements actually executed.
+    state = _request_state.get()
+    if state is not None and not state['wrote']:
+        if sql.lstrip()[:7].upper().startswith(WRITE_STATEMENTS) and not any(
+            table in sql for table in UNPINNED_TABLES
+        ):
+            state['wrote'] = True
+    return execute(sql, params, many, context)
+
+
+def _eject_on_error(execute, sql, params, many, context):
+    try:
+        return execute(sql, params, many, context)
+    except OperationalError:
+        health.eject(context['connection'].alias)
+        raise
+
+
+@receiver(connection_created)
+def install_execute_wrappers(sender, connection, **kwargs):
+    if connection.alias == DEFAULT_DB_ALIAS:
+        wrapper = _track_writes
+    elif connection.alias in getattr(settings, 'DATABASE_REPLICAS', {}):
+        wrapper = _eject_on_error
+    else:
+        return
+    if wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(wrapper)
+
+
+class ReadYourWritesMiddleware:
+    """
+    Sets up per-request routing state and pins the session to the primary
+    for a while after the request writes. Must come after SessionMiddleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        session = getattr(request, 'session', None)
+        pinned_until = session.get(PIN_SESSION_KEY, 0) if session is not None else 0
+        # Unsafe methods are write requests: read from the primary throughout.
+        pinned = request.method not in SAFE_METHODS or pinned_until > time.time()
+        state = {'pinned': pinned, 'wrote': False, 'replica': None}
+        token = _request_state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_state.reset(token)
+        if state['wrote'] and session is not None:
+            session[PIN_SESSION_KEY] = time.time() + getattr(settings, 'REPLICA_PIN_SECONDS', 15)
+        return response
@@ -45,11 +45,13 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
    'django.middleware.security.SecurityMiddleware',
+    'petrescue.assets.PrecompressedStaticMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
+    'petrescue.routers.ReadYourWritesMiddleware',
     "corsheaders.middleware.CorsMiddleware",
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -67,6 +69,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'users.context_processors.unread_counts',
             ],
         },
     },
@@ -80,15 +83,104 @@ WSGI_APPLICATION = 'petrescue.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.mysql',
+        # MySQL with a per-process connection pool (petrescue/db/backends/mysql_pool).
+        'ENGINE': 'petrescue.db.backends.mysql_pool',
         'NAME': 'petrescue_db',
         'USER': 'root', 
         'PASSWORD': 'root', 
         'HOST': '127.0.0.1',
         'PORT': '3306',
+        # Connections go back to the pool at the end of each request.
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'MAX_SIZE': 10,       # per worker process; keep workers * MAX_SIZE under max_connections
+            'TIMEOUT': 5,         # seconds to wait for a free connection
+            'MAX_LIFETIME': 1800, # recycle connections older than this (seconds)
+            'HEALTH_CHECK': True, # ping before handing out an idle connection
+        },
+    }
+}
+
+# Read replicas: DATABASES alias -> selection weight. Request-time reads are
+# spread over healthy replicas; writes and anything after a write stay on the
+# primary (see petrescue/routers.py). petrescue/settings_sqlite_replica.py
+# runs the same setup locally on two SQLite files.
+DATABASE_ROUTERS = ['petrescue.routers.PrimaryReplicaRouter']
+DATABASE_REPLICAS = {}
+REPLICA_PIN_SECONDS = 15
+REPLICA_HEALTH_CHECK_INTERVAL = 30
+
+
+# Cache, sessions and authenticated-user caching
+# Sessions are read from the cache and written through to the database, and the
+# logged-in User + Profile pair is cached per user (see users/auth_cache.py).
+# LocMemCache is per process; point this at Redis/Memcached when running more
+# than one worker so invalidations are seen everywhere.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'petrescue-default',
     }
 }
 
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+AUTH_USER_CACHE_TIMEOUT = 300
+
+# Login/registration limits (users/throttling.py): (attempts, window seconds)
+# per client IP, plus a doubling per-username lockout after repeated failures.
+THROTTLE_CACHE = 'default'
+THROTTLE_RATES = {
+    'login': (20, 60),
+    'register': (5, 3600),
+}
+THROTTLE_LOCKOUT = {'threshold': 5, 'base_seconds': 2, 'max_seconds': 15 * 60}
+THROTTLE_TRUST_X_FORWARDED_FOR = False
+
+# Hot/cold archival (python manage.py archive_old_records)
+ARCHIVE_MESSAGES_AFTER_DAYS = 365
+ARCHIVE_CLOSED_REPORTS_AFTER_DAYS = 90
+ARCHIVE_BATCH_SIZE = 500
+ARCHIVE_BATCH_SLEEP = 0.5
+
+# Public Atom/JSON feeds (users/feeds.py): entries kept per cached feed
+FEED_MAX_ENTRIES = 50
+
+# Composite home API (users/home_api.py): threads shared by all requests in a
+# worker process for building sections concurrently. Each holds a database
+# connection while it runs, so at most half of POOL['MAX_SIZE'] are started;
+# sections that find no free thread are built on the request's own thread.
+HOME_API_WORKERS = 4
+
+# Worker warm-up (users/warmup.py), run by wsgi.py/asgi.py before serving:
+# imports the lazily included views, compiles templates and primes caches.
+# Measure its effect with: python manage.py profile_startup [--warm-up]
+WARMUP_ON_START = False
+
+# In-process background jobs (users/scheduler.py), started by wsgi.py/asgi.py
+SCHEDULER_ENABLED = False
+ADOPTION_SCHEDULER_INTERVAL = 60  # seconds
+# Report event consumers (users/events.py). Without the scheduler, run
+# `manage.py consume_events` from cron instead: city notifications for
+# approved reports are only sent by a consumer (users/notifications.py), and
+# the admin report counts fall back to live COUNTs (users/report_stats.py).
+EVENT_CONSUMER_INTERVAL = 30  # seconds
+LOG_SEQUENCER_INTERVAL = 15  # seconds; numbers log rows that missed their on-commit stamp (users/sequencing.py)
+
+# Moderation queue (users/triage.py): how long an admin's claim on a report
+# lasts before it goes back to the pool.
+MODERATION_LEASE_SECONDS = 10 * 60
+
+# Notification digests (users/digests.py). With a window, notifications are
+# staged and each recipient gets one digest per window from the scheduler job,
+# so SCHEDULER_ENABLED must be on; 0 delivers every notification immediately.
+NOTIFICATION_DIGEST_WINDOW = 0  # seconds
+NOTIFICATION_DIGEST_INTERVAL = 60  # seconds
+# python manage.py compact_notifications: read notifications older than this
+# are folded into one digest per recipient.
+NOTIFICATION_COMPACT_AFTER_DAYS = 30
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -133,9 +225,24 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Media is served by users.media.serve_media. Set MEDIA_SENDFILE_HEADER to
+# 'X-Sendfile' (Apache/lighttpd) or 'X-Accel-Redirect' (nginx) to let the
+# front-end server transfer the bytes; for nginx map the prefix below to an
+# internal location aliasing MEDIA_ROOT.
+MEDIA_SENDFILE_HEADER = None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+MEDIA_CACHE_MAX_AGE = 60 * 60 * 24 * 7
+
 # STATIC_ROOT is important for deployment but not strictly for development server.
-# If you are planning to deploy, you would uncomment this and run 'python manage.py collectstatic'.
-# STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+# 'python manage.py collectstatic' hashes, minifies and precompresses assets and
+# builds resized WebP/AVIF variants of raster images (see petrescue/assets.py).
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+STATIC_IMAGE_WIDTHS = (480, 960, 1600)
+
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'petrescue.assets.OptimizedStaticFilesStorage'},
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -0,0 +1,24 @@
+"""
+Local stand-in for a primary/replica setup: two SQLite files instead of the
+MySQL primary and its replicas. Copy the migrated db.sqlite3 to
+replica.sqlite3 to start the replica, or run the router tests with
+
+    python manage.py test users --settings=petrescue.settings_sqlite_replica
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'replica.sqlite3',
+        # The data migrations read through the router, which sends them to
+        # the primary; the test replica is built from the models instead.
+        'TEST': {'MIGRATE': False},
+    },
+}
+DATABASE_REPLICAS = {'replica': 1}
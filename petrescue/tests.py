@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+from unittest import mock, skipUnless
+
+from django.test import SimpleTestCase
+
+from petrescue.assets import background_overrides
+from petrescue.db.pool import ConnectionPool, PoolTimeout, get_pool
+
+
+class FakeConnection:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    def test_reuses_the_most_recently_released_connection(self):
+        pool = ConnectionPool(FakeConnection, max_size=3)
+        first, second = pool.acquire(), pool.acquire()
+        pool.release(first)
+        pool.release(second)
+        self.assertIs(pool.acquire(), second)
+        self.assertIs(pool.acquire(), first)
+        self.assertEqual(pool.stats()['created'], 2)
+
+    def test_exhausted_pool_times_out(self):
+        pool = ConnectionPool(FakeConnection, max_size=1, timeout=0.05)
+        pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        stats = pool.stats()
+        self.assertEqual((stats['timeouts'], stats['checkout_failures'], stats['size']), (1, 1, 1))
+
+    def test_waiting_borrower_gets_a_released_connection(self):
+        pool = ConnectionPool(FakeConnection, max_size=1, timeout=5)
+        conn = pool.acquire()
+        threading.Timer(0.05, pool.release, [conn]).start()
+        self.assertIs(pool.acquire(), conn)
+
+    def test_connections_past_their_lifetime_are_recycled(self):
+        pool = ConnectionPool(FakeConnection, max_size=1, max_lifetime=0.01)
+        old = pool.acquire()
+        pool.release(old)
+        time.sleep(0.02)
+        new = pool.acquire()
+        self.assertIsNot(new, old)
+        self.assertTrue(old.closed)
+        self.assertEqual(pool.stats()['recycled'], 1)
+
+    def test_connections_failing_validation_are_discarded(self):
+        pool = ConnectionPool(FakeConnection, max_size=2, validate=lambda conn: conn is not broken)
+        broken = pool.acquire()
+        pool.release(broken)
+        conn = pool.acquire()
+        self.assertIsNot(conn, broken)
+        self.assertTrue(broken.closed)
+        stats = pool.stats()
+        self.assertEqual((stats['discarded'], stats['size']), (1, 1))
+
+    def test_failed_connect_gives_back_its_slot(self):
+        factory = mock.Mock(side_effect=[OSError('refused'), FakeConnection()])
+        pool = ConnectionPool(factory, max_size=1, timeout=0.05)
+        with self.assertRaises(OSError):
+            pool.acquire()
+        self.assertEqual(pool.stats()['size'], 0)
+        self.assertIsInstance(pool.acquire(), FakeConnection)
+
+
+class ConnectionPoolForkTests(SimpleTestCase):
+    @skipUnless(hasattr(os, 'fork'), "needs os.fork()")
+    def test_child_forgets_inherited_connections_without_closing_them(self):
+        pool = get_pool('fork-test', factory=FakeConnection, max_size=2)
+        inherited = pool.acquire()
+        pool.release(inherited)
+        pid = os.fork()
+        if pid == 0:
+            fresh = pool.acquire()
+            ok = fresh is not inherited and not inherited.closed and pool.stats()['size'] == 1
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+        self.assertIs(pool.acquire(), inherited)
+
+
+class BackgroundOverrideTests(SimpleTestCase):
+    def test_background_images_get_width_variants(self):
+        css = (
+            ".hero{color:red;background:url('../images/hero.abc.jpg');background-size:cover}"
+            "@media (max-width:600px){.hero{background:none}}"
+            ".logo{background-image:url(../images/logo.def.png)}"
+        )
+        widths = {'images/hero.abc.jpg': [480, 960, 1600], 'images/logo.def.png': [120]}
+        self.assertEqual(
+            background_overrides(css, 'css/style.123.css', widths),
+            "@media (max-width:480px),(max-width:960px) and (max-resolution:1dppx)"
+            "{.hero{background:url('../images/hero.abc.960w.jpg');background-size:cover}}"
+            "@media (max-width:240px),(max-width:480px) and (max-resolution:1dppx)"
+            "{.hero{background:url('../images/hero.abc.480w.jpg');background-size:cover}}",
+        )
@@ -1,27 +1,24 @@
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, re_path
 from django.conf import settings
-from django.conf.urls.static import static
 
-from users.views import (
-    ProfileViewSet, PetReportViewSet, PetForAdoptionViewSet, NotificationViewSet, RegisterView
-)
-from users import urls as users_html_urls
+from users.media import serve_media
+
 
-from rest_framework.routers import DefaultRouter
+def lazy_include(module, app_name=None):
+    """
+    Like include(), but the URLconf module (and the views it imports) is only
+    imported when a URL under the prefix is first resolved or reversed, not
+    when this module is loaded.
+    """
+    return (module, app_name, app_name)
 
-api_router = DefaultRouter()
-api_router.register(r'profiles', ProfileViewSet)
-api_router.register(r'petreports', PetReportViewSet)
-api_router.register(r'petsforadoption', PetForAdoptionViewSet)
-api_router.register(r'notifications', NotificationViewSet)
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/', include(api_router.urls), name='api_root'), 
-    path('api/register/', RegisterView.as_view(), name='api_register'),
-    path('', include('users.urls')),
+    path('api/', lazy_include('users.api_urls')),
+    re_path(r'^%s(?P<path>.+)$' % re.escape(settings.MEDIA_URL.lstrip('/')), serve_media, name='media'),
+    path('', lazy_include('users.urls', 'users')),
 ]
-
-if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -1,43 +1,106 @@
 from django.contrib import admin
-from .models import Profile, PetReport, PetForAdoption, Notification,  Message
+from django.contrib.auth.models import User
+from .admin_paging import ScalableAdmin
+from .models import Profile, PetReport, PetForAdoption, Notification,  Message, normalize_city
 
 
-class PetReportAdmin(admin.ModelAdmin):
+# The report, notification and message tables run to millions of rows:
+# search only prefixes of indexed columns (username is unique, city_key leads
+# an index), drill down by indexed dates, and page with keysets.
+class PetReportAdmin(ScalableAdmin):
     
-    list_display = ('id', 'report_type', 'pet_type', 'status', 'reporter', 'date_reported', 'location', 'health_information', 'injury')
+    list_display = ('id', 'report_type', 'pet_type', 'status', 'priority', 'reporter', 'date_reported', 'location', 'health_information', 'injury')
     list_filter = ('status', 'report_type', 'pet_type')
-    search_fields = ('location', 'breed', 'reporter__username')
-    readonly_fields = () 
+    list_select_related = ('reporter',)
+    # Shows the search box; get_search_results does the lookup.
+    search_fields = ('^city_key',)
+    search_help_text = 'A report id, a city prefix, or @ and the start of a reporter\'s username.'
+    date_hierarchy = 'date_reported'
+    keyset_ordering = ('-date_reported', '-id')
+    raw_id_fields = ('reporter',)
+    readonly_fields = ('approved_at', 'adoption_eligible_at')
     list_per_page = 25
+    # At most this many reporters match a username prefix.
+    reporter_search_limit = 100
+
+    def get_search_results(self, request, queryset, search_term):
+        # One indexed lookup per search: the primary key, the city_key index,
+        # or the reporter_id index with the usernames resolved beforehand.
+        # ORing them, or joining auth_user, would scan the table.
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        if term.isdigit():
+            return queryset.filter(pk=int(term)), False
+        if term.startswith('@'):
+            reporter_ids = list(
+                User.objects.filter(username__istartswith=term[1:].strip())
+                .order_by('username').values_list('pk', flat=True)[:self.reporter_search_limit]
+            )
+            return queryset.filter(reporter_id__in=reporter_ids), False
+        # istartswith is a plain LIKE 'term%' on MySQL, which can use the index.
+        return queryset.filter(city_key__istartswith=normalize_city(term)), False
 
 class PetForAdoptionAdmin(admin.ModelAdmin):
     list_display = ('name', 'pet_type', 'status', 'lister', 'date_listed')
     list_filter = ('status', 'pet_type', 'gender')
+    list_select_related = ('lister',)
     search_fields = ('name', 'breed', 'lister__username')
+    raw_id_fields = ('lister',)
     readonly_fields = ('date_listed',)
 
 class ProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'role', 'city', 'phone_number')
+    list_select_related = ('user',)
     search_fields = ('user__username', 'city')
 
-class NotificationAdmin(admin.ModelAdmin):
-    list_display = ('recipient', 'message_summary', 'is_read', 'created_at')
+class NotificationAdmin(ScalableAdmin):
+    list_display = ('recipient', 'message_summary', 'item_count', 'is_read', 'created_at')
     list_filter = ('is_read',)
-    search_fields = ('recipient__username', 'message')
+    list_select_related = ('recipient',)
+    search_fields = ('^recipient__username',)
+    date_hierarchy = 'created_at'
+    keyset_ordering = ('-created_at', '-id')
+    raw_id_fields = ('recipient', 'pet_report')
 
     def message_summary(self, obj):
         return obj.message[:50] + '...' if len(obj.message) > 50 else obj.message
     message_summary.short_description = 'Message'
 
-class MessageAdmin(admin.ModelAdmin):
+class MessageReadFilter(admin.SimpleListFilter):
+    title = 'read by recipient'
+    parameter_name = 'read'
+
+    def lookups(self, request, model_admin):
+        return (('1', 'Yes'), ('0', 'No'))
+
+    def queryset(self, request, queryset):
+        if self.value() in ('0', '1'):
+            return queryset.filter(is_read=self.value() == '1')
+        return queryset
+
+class MessageAdmin(ScalableAdmin):
     list_display = ('sender', 'recipient', 'content_summary', 'timestamp', 'is_read')
-    list_filter = ('is_read', 'timestamp')
-    search_fields = ('sender__username', 'recipient__username', 'content')
+    list_filter = (MessageReadFilter,)
+    list_select_related = ('sender', 'recipient')
+    search_fields = ('^sender__username', '^recipient__username')
+    date_hierarchy = 'timestamp'
+    keyset_ordering = ('-timestamp', '-id')
+    raw_id_fields = ('sender', 'recipient')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_read_state()
 
     def content_summary(self, obj):
         return obj.content[:50] + '...' if len(obj.content) > 50 else obj.content
     content_summary.short_description = 'Content'
 
+    def is_read(self, obj):
+        # Derived from the recipient's read watermark, not stored on the row.
+        return obj.is_read
+    is_read.boolean = True
+    is_read.short_description = 'Read'
+
 admin.site.register(PetReport, PetReportAdmin)
 admin.site.register(PetForAdoption, PetForAdoptionAdmin)
 admin.site.register(Profile, ProfileAdmin)
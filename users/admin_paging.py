@@ -0,0 +1,131 @@
+"""
+Changelists for the large tables (reports, messages, notifications).
+
+Django's changelist runs an exact COUNT(*) for the filtered rows and another
+for the whole table, then pages with OFFSET. ScalableAdmin replaces both:
+
+* An unfiltered table is counted from the database's table statistics
+  (information_schema.TABLES on MySQL, pg_class on PostgreSQL). These are
+  estimates, which is all a "N reports" label needs. Filtered lists, small
+  tables and backends without statistics count at most COUNT_CAP rows.
+* Pages follow ``keyset_ordering`` with users/pagination.py instead of
+  OFFSET, so the thousandth page costs the same as the first. The cursor
+  travels in the ``cursor`` query parameter. Sorting by a column header
+  falls back to Django's numbered pages over the capped count.
+"""
+from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from .pagination import InvalidCursor, KeysetPaginator
+
+CURSOR_VAR = 'cursor'
+# Below this many rows an exact count is cheap and statistics are too coarse.
+EXACT_COUNT_BELOW = 10000
+COUNT_CAP = 10000
+
+
+def estimated_count(model, using):
+    """The row count from table statistics, or None when there are none."""
+    connection = connections[using]
+    table = model._meta.db_table
+    if connection.vendor == 'mysql':
+        sql = (
+            "SELECT TABLE_ROWS FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s"
+        )
+    elif connection.vendor == 'postgresql':
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)"
+    else:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [table])
+        row = cursor.fetchone()
+    # PostgreSQL reports -1 for a table that was never analyzed.
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def approximate_count(queryset):
+    """
+    Returns ``(count, kind)`` with kind 'estimate', 'capped' or 'exact'.
+    Unfiltered big tables use the statistics; everything else counts at most
+    COUNT_CAP + 1 rows.
+    """
+    if not queryset.query.where:
+        estimate = estimated_count(queryset.model, queryset.db)
+        if estimate is not None and estimate >= EXACT_COUNT_BELOW:
+            return estimate, 'estimate'
+    count = queryset.order_by()[:COUNT_CAP + 1].count()
+    if count > COUNT_CAP:
+        return COUNT_CAP, 'capped'
+    return count, 'exact'
+
+
+class ApproximateCountPaginator(Paginator):
+    """Numbered pages over an approximate count, for column-sorted lists."""
+
+    @cached_property
+    def count(self):
+        count, self.count_kind = approximate_count(self.object_list)
+        return count
+
+
+class KeysetChangeList(ChangeList):
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = getattr(request, '_admin_cursor', None)
+        super().__init__(request, *args, **kwargs)
+
+    def get_results(self, request):
+        self.keyset = ORDER_VAR not in self.params
+        if not self.keyset:
+            super().get_results(request)
+            self.result_count_kind = self.paginator.count_kind
+            return
+        paginator = KeysetPaginator(self.queryset, self.model_admin.keyset_ordering, self.list_per_page)
+        try:
+            page = paginator.page(self.cursor)
+        except InvalidCursor:
+            self.cursor = None
+            page = paginator.page()
+        self.result_count, self.result_count_kind = approximate_count(self.queryset)
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.show_admin_actions = True
+        self.result_list = page.object_list
+        self.can_show_all = False
+        self.multi_page = bool(self.cursor or page.has_next)
+        self.paginator = paginator
+        self.next_cursor = page.next_cursor
+
+    def result_count_label(self):
+        prefix = {'estimate': 'about ', 'capped': 'more than '}.get(self.result_count_kind, '')
+        return f'{prefix}{self.result_count}'
+
+    def next_page_url(self):
+        return self.get_query_string({CURSOR_VAR: self.next_cursor})
+
+    def first_page_url(self):
+        return self.get_query_string(remove=[CURSOR_VAR])
+
+
+class ScalableAdmin(admin.ModelAdmin):
+    change_list_template = 'admin/users/keyset_change_list.html'
+    paginator = ApproximateCountPaginator
+    show_full_result_count = False
+    list_per_page = 50
+    # Must end in a unique column and match an index, like the other keyset orderings.
+    keyset_ordering = ('-id',)
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
+
+    def changelist_view(self, request, extra_context=None):
+        # ChangeList treats unknown query parameters as filters, so the cursor is taken out first.
+        if CURSOR_VAR in request.GET:
+            request.GET = request.GET.copy()
+            request._admin_cursor = request.GET.pop(CURSOR_VAR)[-1]
+        return super().changelist_view(request, extra_context)
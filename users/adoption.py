@@ -0,0 +1,98 @@
+"""
+The 15-day found-pet rule: approved Found reports that nobody claims are
+turned into PetForAdoption listings once their adoption_eligible_at passes.
+"""
+import logging
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from . import events, feeds, locality, sync
+from .models import JobWatermark, PetForAdoption, PetReport
+
+logger = logging.getLogger(__name__)
+
+WATERMARK_NAME = 'adoption_due'
+
+
+def get_system_lister():
+    return User.objects.filter(is_superuser=True).order_by('pk').first()
+
+
+def list_report_for_adoption(report, lister):
+    """
+    Closes an open report and creates its adoption listing. Returns the new
+    PetForAdoption, or None if another worker closed the report first.
+    """
+    with transaction.atomic():
+        now = timezone.now()
+        closed = PetReport.objects.filter(pk=report.pk, status='Open').update(status='Closed', closed_at=now)
+        if not closed:
+            return None
+        before = {**report.lifecycle_state(), 'status': 'Open'}
+        report.status, report.closed_at = 'Closed', now
+        # The UPDATE above bypasses post_save.
+        sync.record([report])
+        events.report_changed(report, before)
+        transaction.on_commit(lambda: locality.invalidate_city(report.city_key))
+        transaction.on_commit(lambda: feeds.update_found_report(report))
+
+        pet_name = report.name if report.name else f"Friendly {report.pet_type}"
+        found_on = report.event_date or report.date_reported.date()
+        description = (
+            f"This lovely {report.pet_type} was found near {report.location} on "
+            f"{found_on.strftime('%B %d, %Y')}. After a waiting period, "
+            f"this pet is now looking for a loving forever home!"
+        )
+        return PetForAdoption.objects.create(
+            name=pet_name,
+            age=report.age or 1,
+            gender=report.gender,
+            pet_type=report.pet_type,
+            breed=report.breed,
+            color=report.color,
+            image=report.pet_image,
+            description=description,
+            lister=lister,
+            status='Available'
+        )
+
+
+def process_due_reports(since=None, until=None, lister=None):
+    """
+    Lists every report that became due in (since, until]. Returns a pair of
+    (listed report ids, failed report ids).
+    """
+    lister = lister or get_system_lister()
+    if lister is None:
+        raise RuntimeError("No superuser found to act as the lister.")
+
+    due = PetReport.objects.due_for_adoption(until).order_by('adoption_eligible_at', 'pk')
+    if since is not None:
+        due = due.filter(adoption_eligible_at__gt=since)
+
+    listed, failed = [], []
+    for report in due.iterator():
+        try:
+            if list_report_for_adoption(report, lister):
+                listed.append(report.pk)
+        except Exception:
+            logger.exception("Failed to list report %s for adoption", report.pk)
+            failed.append(report.pk)
+    return listed, failed
+
+
+def run_due_adoptions():
+    """
+    Scheduler job: handles only the reports that became due since the last
+    run. The watermark row is locked for the duration so concurrent workers
+    take turns. Failed rows stay Open; the process_found_pets command still
+    does a full sweep and picks them up.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        mark = JobWatermark.objects.select_for_update().filter(name=WATERMARK_NAME).first()
+        listed, failed = process_due_reports(since=mark.value if mark else None, until=now)
+        JobWatermark.objects.update_or_create(name=WATERMARK_NAME, defaults={'value': now})
+    return listed, failed
@@ -0,0 +1,67 @@
+"""
+The admin adoption processing queue, split into independently paged sections.
+
+``ready`` is pets waiting to be listed: reports set to 'Pending Adoption'
+plus approved Found reports past their hold. Those two sets are disjoint, so
+it is read as a UNION ALL of two index-friendly queries instead of an OR
+with DISTINCT. ``found`` is every other approved open Found report (still
+in its hold, or without a due date), and ``lost`` is approved open Lost
+reports. Section sizes come from report_stats.counter() plus one indexed
+count of overdue reports; ``found`` is exactly the open approved
+Found reports minus the overdue ones, so its count matches its rows.
+"""
+from collections import namedtuple
+
+from django.db.models import Q
+from django.utils import timezone
+
+from . import report_stats
+from .models import PetReport
+from .pagination import InvalidCursor, KeysetPaginator, UnionKeysetPaginator
+
+PAGE_SIZE = 25
+ORDERING = ('-date_reported', '-id')
+SECTIONS = ('ready', 'found', 'lost')
+
+Section = namedtuple('Section', 'name reports next_cursor')
+
+
+def _paginator(name, now):
+    if name == 'ready':
+        return UnionKeysetPaginator(
+            [
+                PetReport.objects.cards().filter(status='Pending Adoption'),
+                PetReport.objects.cards().due_for_adoption(now),
+            ],
+            ORDERING, PAGE_SIZE,
+        )
+    if name == 'found':
+        queryset = PetReport.objects.with_days_remaining(now).cards(reporter=True).filter(
+            Q(adoption_eligible_at__gt=now) | Q(adoption_eligible_at__isnull=True),
+            report_type='Found', status='Open', is_approved=True,
+        )
+    else:
+        queryset = PetReport.objects.cards(reporter=True).filter(
+            report_type='Lost', status='Open', is_approved=True,
+        )
+    return KeysetPaginator(queryset, ORDERING, PAGE_SIZE)
+
+
+def section_page(name, cursor=None, now=None):
+    """One page of a section; an invalid cursor gives the first page."""
+    paginator = _paginator(name, now or timezone.now())
+    try:
+        page = paginator.page(cursor)
+    except InvalidCursor:
+        page = paginator.page()
+    return Section(name, page.object_list, page.next_cursor)
+
+
+def section_counts(now=None):
+    overdue = PetReport.objects.due_for_adoption(now).count()
+    count = report_stats.counter(now)
+    return {
+        'ready': count(status='Pending Adoption') + overdue,
+        'found': max(count(report_type='Found', status='Open', is_approved=True) - overdue, 0),
+        'lost': count(report_type='Lost', status='Open', is_approved=True),
+    }
@@ -0,0 +1,21 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from .api_views import (
+    HomeView, NotificationViewSet, PetForAdoptionViewSet, PetReportViewSet, PetSearchView, ProfileViewSet,
+    RegisterView, SyncView,
+)
+
+api_router = DefaultRouter()
+api_router.register(r'profiles', ProfileViewSet)
+api_router.register(r'petreports', PetReportViewSet)
+api_router.register(r'petsforadoption', PetForAdoptionViewSet)
+api_router.register(r'notifications', NotificationViewSet)
+
+urlpatterns = [
+    path('home/', HomeView.as_view(), name='api_home'),
+    path('sync/', SyncView.as_view(), name='api_sync'),
+    path('pets/search/', PetSearchView.as_view(), name='api_pet_search'),
+    path('', include(api_router.urls)),
+    path('register/', RegisterView.as_view(), name='api_register'),
+]
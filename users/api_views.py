@@ -0,0 +1,186 @@
+"""
+The REST API views. They live apart from the HTML views so that neither
+module, nor DRF's views and serializers, is imported until a URL under it
+is resolved (see petrescue/urls.py).
+"""
+from django.contrib.auth.models import User
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.pagination import CursorPagination
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import home_api, notifications, search, sync, throttling, unread
+from .fast_read import FastListMixin
+from .models import Notification, PetForAdoption, PetReport, Profile
+from .serializers import (
+    NotificationSerializer,
+    PetForAdoptionSerializer,
+    PetReportSerializer,
+    ProfileSerializer,
+    UserSerializer,
+)
+
+
+class NewestFirstCursorPagination(CursorPagination):
+    """DRF cursor pagination over ``created_at``, newest first."""
+    ordering = ('-created_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+# -----------------------
+# REST viewsets / APIView
+# -----------------------
+class ProfileViewSet(viewsets.ModelViewSet):
+    queryset = Profile.objects.all()
+    serializer_class = ProfileSerializer
+
+
+class PetReportViewSet(FastListMixin, viewsets.ModelViewSet):
+    queryset = PetReport.objects.order_by("pk")
+    serializer_class = PetReportSerializer
+
+
+class PetForAdoptionViewSet(FastListMixin, viewsets.ModelViewSet):
+    queryset = PetForAdoption.objects.order_by("pk")
+    serializer_class = PetForAdoptionSerializer
+
+
+class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    The requesting user's notifications, newest first. ``?unread=1`` limits
+    the list to unread ones. POST ``mark_read/`` with ``{"ids": [...]}``
+    marks those read, or all of them when ``ids`` is omitted.
+    """
+    queryset = Notification.objects.all()
+    serializer_class = NotificationSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = NewestFirstCursorPagination
+
+    def get_queryset(self):
+        queryset = Notification.objects.filter(recipient=self.request.user)
+        if self.request.query_params.get("unread") in ("1", "true"):
+            queryset = queryset.filter(is_read=False)
+        return queryset
+
+    @action(detail=False, methods=["post"])
+    def mark_read(self, request):
+        ids = request.data.get("ids")
+        if ids is not None and (
+            not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids)
+        ):
+            return Response({"error": "ids must be a list of integers."}, status=status.HTTP_400_BAD_REQUEST)
+        updated = notifications.mark_read(request.user, ids)
+        return Response({"updated": updated, "unread": unread.get_counts(request.user).unread_notifications})
+
+
+class HomeView(APIView):
+    """
+    The signed-in user's home screen in one response; see users/home_api.py
+    for ``?fields=`` and the per-section ``?<section>_cursor=`` parameters.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        cursors = {
+            name: request.query_params[f"{name}_cursor"]
+            for name in home_api.PAGED_SECTIONS
+            if request.query_params.get(f"{name}_cursor")
+        }
+        try:
+            data = home_api.build(request, request.query_params.get("fields"), cursors)
+        except home_api.InvalidHomeQuery as exc:
+            return Response({"error": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(data)
+
+
+class SyncView(APIView):
+    """
+    Changes after ``?since=<seq>`` visible to the requesting user, oldest
+    first, in pages of ``?limit=`` (see users/sync.py). ``?types=`` limits
+    the page to some of report, adoption, message and notification.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        try:
+            since = int(request.query_params.get("since", 0))
+            limit = int(request.query_params.get("limit", sync.PAGE_SIZE))
+        except ValueError:
+            return Response({"error": "since and limit must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+        if since < 0 or not 1 <= limit <= sync.MAX_PAGE_SIZE:
+            return Response(
+                {"error": f"since must be >= 0 and limit between 1 and {sync.MAX_PAGE_SIZE}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        kinds = [kind for kind in request.query_params.get("types", "").split(",") if kind]
+        unknown = set(kinds) - set(sync.SYNCED)
+        if unknown:
+            return Response(
+                {"error": f"Unknown types: {', '.join(sorted(unknown))}."}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        page = sync.changes_since(request.user, since, limit, kinds, context={"request": request})
+        return Response({
+            "changes": page.changes,
+            "deleted": page.deleted,
+            "next_since": page.next_since,
+            "has_more": page.has_more,
+        })
+
+
+class RegisterView(APIView):
+    permission_classes = [AllowAny]
+
+    def post(self, request):
+        decision = throttling.check(request, "register")
+        if not decision.allowed:
+            return Response(
+                {"error": "Too many registration attempts. Please try again later."},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(decision.retry_after)},
+            )
+
+        username = request.data.get("username")
+        email = request.data.get("email")
+        password = request.data.get("password")
+
+        if not username or not password or not email:
+            return Response(
+                {"error": "Username, email, and password are required."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if User.objects.filter(username=username).exists():
+            return Response({"error": "Username already exists."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if User.objects.filter(email=email).exists():
+            return Response({"error": "Email already exists."}, status=status.HTTP_400_BAD_REQUEST)
+
+        user = User.objects.create_user(username=username, email=email, password=password)
+        Profile.objects.create(user=user)
+        return Response(UserSerializer(user).data, status=status.HTTP_201_CREATED)
+
+
+class PetSearchView(APIView):
+    """JSON variant of the faceted adoption listing; takes the same query parameters."""
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        result = search.search_pets(request.query_params)
+        return Response({
+            "results": PetForAdoptionSerializer(result.pets, many=True, context={"request": request}).data,
+            "next_cursor": result.next_cursor,
+            "sort": result.sort,
+            "facets": [
+                {
+                    "field": facet.field,
+                    "label": facet.label,
+                    "options": [option._asdict() for option in facet.options],
+                }
+                for facet in result.facets
+            ],
+        })
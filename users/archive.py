@@ -0,0 +1,189 @@
+"""
+Hot/cold archival for Message and closed PetReport rows.
+
+Rows are copied into the Archived* tables and removed from the hot tables in
+small batches (see the archive_old_records command). The read helpers below
+merge both sides so history views keep showing the full record.
+
+Archiving is not deletion: while a batch is removed, archiving() is true and
+the delete signals record no sync tombstones and log the report lifecycle
+event as "archived" instead of "deleted".
+"""
+import contextvars
+import datetime
+from contextlib import contextmanager
+from itertools import chain
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils.dateparse import parse_datetime
+from django.utils import timezone
+
+from . import sync
+from .models import ArchivedMessage, ArchivedPetReport, Message, Notification, PetReport
+
+_archiving = contextvars.ContextVar('archiving', default=False)
+
+REPORT_FIELDS = [
+    'report_type', 'reporter_id', 'name', 'age', 'gender', 'pet_type', 'breed',
+    'color', 'location', 'status', 'date_reported', 'event_date', 'closed_at',
+]
+
+
+def archiving():
+    """True while archive batches are removing hot rows."""
+    return _archiving.get()
+
+
+@contextmanager
+def _removing_archived_rows():
+    token = _archiving.set(True)
+    try:
+        yield
+    finally:
+        _archiving.reset(token)
+
+
+def messages_due(age_days, now=None):
+    cutoff = (now or timezone.now()) - datetime.timedelta(days=age_days)
+    return Message.objects.filter(timestamp__lt=cutoff)
+
+
+def reports_due(age_days, now=None):
+    cutoff = (now or timezone.now()) - datetime.timedelta(days=age_days)
+    # Reports closed before closed_at existed fall back to their report date.
+    return PetReport.objects.filter(status='Closed').filter(
+        Q(closed_at__lt=cutoff) | Q(closed_at__isnull=True, date_reported__lt=cutoff)
+    )
+
+
+def archive_message_batch(queryset, batch_size):
+    """Moves up to batch_size messages from queryset. Returns the number moved."""
+    with transaction.atomic():
+        batch = list(queryset.order_by('pk')[:batch_size])
+        if not batch:
+            return 0
+        ArchivedMessage.objects.bulk_create(
+            [
+                ArchivedMessage(
+                    original_id=m.pk,
+                    sender_id=m.sender_id,
+                    recipient_id=m.recipient_id,
+                    content=m.content,
+                    timestamp=m.timestamp,
+                )
+                for m in batch
+            ],
+            ignore_conflicts=True,
+        )
+        with _removing_archived_rows():
+            Message.objects.filter(pk__in=[m.pk for m in batch]).delete()
+    return len(batch)
+
+
+def archive_report_batch(queryset, batch_size):
+    """Moves up to batch_size closed reports from queryset. Returns the number moved."""
+    with transaction.atomic():
+        batch = list(queryset.order_by('pk').only('pk', 'pet_image', *REPORT_FIELDS)[:batch_size])
+        if not batch:
+            return 0
+        ids = [r.pk for r in batch]
+        ArchivedPetReport.objects.bulk_create(
+            [
+                ArchivedPetReport(
+                    original_id=r.pk,
+                    pet_image=r.pet_image.name or '',
+                    **{field: getattr(r, field) for field in REPORT_FIELDS},
+                )
+                for r in batch
+            ],
+            ignore_conflicts=True,
+        )
+        # Keep notifications that referenced the report instead of cascading.
+        referencing = Notification.objects.filter(pet_report_id__in=ids)
+        sync.record_rows('notification', [
+            (pk, [recipient_id]) for pk, recipient_id in referencing.values_list('pk', 'recipient_id')
+        ])
+        referencing.update(pet_report=None)
+        with _removing_archived_rows():
+            PetReport.objects.filter(pk__in=ids).delete()
+    return len(batch)
+
+
+# -----------------------
+# Read-through helpers
+# -----------------------
+def conversation_messages(user, participant):
+    """
+    All messages between two users, archived ones first, in timestamp order.
+    """
+    pair_q = Q(sender=user, recipient=participant) | Q(sender=participant, recipient=user)
+    archived = ArchivedMessage.objects.filter(pair_q).select_related('sender', 'recipient').order_by('timestamp')
+    hot = Message.objects.filter(pair_q).select_related('sender', 'recipient').order_by('timestamp')
+    return list(chain(archived, hot))
+
+
+def _history_after(cursor, source):
+    """
+    Rows of ``source`` (0 = live, 1 = archived) that come after ``cursor`` in
+    the merged (date_reported, source, id) descending order.
+    """
+    date, cursor_source, cursor_id = cursor
+    if source < cursor_source:
+        return Q(date_reported__lte=date)
+    if source > cursor_source:
+        return Q(date_reported__lt=date)
+    return Q(date_reported__lt=date) | Q(date_reported=date, pk__lt=cursor_id)
+
+
+def encode_history_cursor(cursor):
+    date, source, pk = cursor
+    return f"{date.isoformat()}~{source}~{pk}"
+
+
+def decode_history_cursor(value):
+    """The cursor tuple from encode_history_cursor, or None if malformed."""
+    try:
+        date, source, pk = value.split('~')
+        date = parse_datetime(date.replace(' ', '+'))
+        if date is None:
+            return None
+        return date, int(source), int(pk)
+    except (AttributeError, ValueError):
+        return None
+
+
+def report_history_page(user, cursor=None, per_page=20):
+    """
+    One page of a user's reports, live and archived, newest first, read with
+    a keyset over both tables. ``cursor`` is the ``(date_reported, source, id)`` of the last row already
+    shown; returns ``(reports, next_cursor)``.
+    """
+    sides = []
+    for source, queryset in enumerate((PetReport.objects.cards(), ArchivedPetReport.objects.all())):
+        queryset = queryset.filter(reporter=user)
+        if cursor:
+            queryset = queryset.filter(_history_after(cursor, source))
+        rows = queryset.order_by('-date_reported', '-pk')[:per_page + 1]
+        sides.extend(((row.date_reported, source, row.pk), row) for row in rows)
+    sides.sort(key=lambda item: item[0], reverse=True)
+    page = sides[:per_page]
+    next_cursor = page[-1][0] if len(sides) > per_page else None
+    return [row for _, row in page], next_cursor
+
+
+def report_summary(user):
+    """
+    Report counts per (report_type, status) across live and archived reports,
+    from one UNION ALL of two grouped aggregates.
+    """
+    def grouped(model):
+        return (model.objects.filter(reporter=user).order_by()
+                .values('report_type', 'status').annotate(n=Count('pk')))
+
+    by_type, by_status, total = {}, {}, 0
+    for row in grouped(PetReport).union(grouped(ArchivedPetReport), all=True):
+        by_type[row['report_type']] = by_type.get(row['report_type'], 0) + row['n']
+        by_status[row['status']] = by_status.get(row['status'], 0) + row['n']
+        total += row['n']
+    return {'total': total, 'by_type': by_type, 'by_status': by_status}
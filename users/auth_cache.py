@@ -0,0 +1,101 @@
+"""
+Per-session caching of the authenticated User together with its Profile.
+
+AuthenticationMiddleware normally costs one query for the User row on every
+request, and templates touching ``user.profile`` add another. The cached copy
+is keyed by user id and dropped whenever the User or Profile row is saved or
+deleted (see users/signals.py), so promotions and removals take effect on the
+next request. QuerySet.update() sends no signals: code that deactivates or
+edits users in bulk must call invalidate_user() for each id it touched.
+
+Users the session's backend would refuse (ModelBackend refuses inactive
+accounts) are never served from or stored in the cache.
+"""
+from django.conf import settings
+from django.contrib.auth import (
+    BACKEND_SESSION_KEY,
+    HASH_SESSION_KEY,
+    SESSION_KEY,
+    get_user,
+    load_backend,
+)
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+
+from . import metrics
+
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def invalidate_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+def _load_user(user_id):
+    return User.objects.select_related("profile").filter(pk=user_id).first()
+
+
+class _ProfileAccessCounter(dict):
+    """
+    Fields cache of a User served from the cache. The stock path loads the
+    Profile only when something reads ``user.profile``, so its query counts
+    as saved on the first read.
+    """
+
+    counted = False
+
+    def __getitem__(self, key):
+        if key == "profile" and not self.counted:
+            self.counted = True
+            metrics.incr("auth_cache.queries_saved")
+        return super().__getitem__(key)
+
+
+def _can_authenticate(backend_path, user):
+    # Same rule ModelBackend.get_user() applies; backends without it accept everyone.
+    check = getattr(load_backend(backend_path), "user_can_authenticate", None)
+    return check is None or check(user)
+
+
+def get_cached_user(request):
+    """
+    Drop-in replacement for django.contrib.auth.get_user() that serves the
+    User (with its Profile pre-attached) from the cache when possible. Any
+    unusual situation falls back to the stock implementation.
+    """
+    try:
+        user_id = request.session[SESSION_KEY]
+        backend_path = request.session[BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return get_user(request)
+
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        metrics.incr("auth_cache.misses")
+        user = _load_user(user_id)
+        if user is None or not _can_authenticate(backend_path, user):
+            return get_user(request)
+        cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+    else:
+        if not _can_authenticate(backend_path, user):
+            invalidate_user(user_id)
+            return get_user(request)
+        metrics.incr("auth_cache.hits")
+        # The User row query is always saved; the Profile one only if it is read.
+        metrics.incr("auth_cache.queries_saved")
+        user._state.fields_cache = _ProfileAccessCounter(user._state.fields_cache)
+
+    session_hash = request.session.get(HASH_SESSION_KEY)
+    if not session_hash or not constant_time_compare(session_hash, user.get_session_auth_hash()):
+        # Password changed or the hash uses a fallback key: let Django decide.
+        return get_user(request)
+
+    user.backend = backend_path
+    return user
@@ -0,0 +1,100 @@
+"""
+Load-aware routing of "chat with an admin" requests.
+
+Each staff member has an AdminLoad row holding how many open conversations
+are assigned to them and how many messages they have not read yet. A
+conversation opens when it is assigned or the user writes again and closes
+when the admin reads it out (ChatAssignment.is_open). Those counters are
+updated incrementally as messages arrive and are read, so picking an admin is
+a single ordered query over AdminLoad rather than counting Message rows.
+"""
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import AdminLoad, ChatAssignment
+
+
+def sync_admin_load(user):
+    """Creates or removes the AdminLoad row to match the user's staff flag."""
+    if user.is_staff and user.is_active:
+        AdminLoad.objects.get_or_create(
+            admin=user,
+            defaults={'open_conversations': ChatAssignment.objects.filter(admin=user, is_open=True).count()},
+        )
+    else:
+        AdminLoad.objects.filter(admin=user).delete()
+
+
+def _opened(admin_id):
+    AdminLoad.objects.filter(admin_id=admin_id).update(open_conversations=F('open_conversations') + 1)
+
+
+def record_incoming_message(message):
+    AdminLoad.objects.filter(admin_id=message.recipient_id).update(
+        unread_messages=F('unread_messages') + 1
+    )
+    # A user writing to their admin reopens a conversation that was read out.
+    if ChatAssignment.objects.filter(
+        user_id=message.sender_id, admin_id=message.recipient_id, is_open=False,
+    ).update(is_open=True):
+        _opened(message.recipient_id)
+
+
+def record_conversation_read(admin, user, count):
+    """The admin has read the conversation with ``user`` up to its last message."""
+    if count:
+        AdminLoad.objects.filter(admin=admin).update(
+            unread_messages=Greatest(F('unread_messages') - Value(count), Value(0))
+        )
+    if ChatAssignment.objects.filter(user=user, admin=admin, is_open=True).update(is_open=False):
+        record_assignment_removed(admin.pk)
+
+
+def record_assignment_removed(admin_id):
+    AdminLoad.objects.filter(admin_id=admin_id).update(
+        open_conversations=Greatest(F('open_conversations') - Value(1), Value(0))
+    )
+
+
+def assign_admin(user):
+    """
+    Returns the admin who should handle a chat with ``user``, or None.
+
+    The user's previous admin wins while they are still available; otherwise
+    the least-loaded available admin is chosen and the assignment moves.
+    """
+    # The previous admin is a lookup by the unique user column; the rest is
+    # one query in the order of the AdminLoad index.
+    previous = (
+        ChatAssignment.objects.filter(user=user, admin__is_active=True, admin__chat_load__is_available=True)
+        .select_related('admin').first()
+    )
+    if previous is not None:
+        if ChatAssignment.objects.filter(pk=previous.pk, is_open=False).update(is_open=True):
+            _opened(previous.admin_id)
+        return previous.admin
+    load = (
+        AdminLoad.objects.filter(is_available=True, admin__is_active=True)
+        .exclude(admin=user)
+        .select_related('admin')
+        .order_by('open_conversations', 'unread_messages', F('last_assigned_at').asc(nulls_first=True))
+        .first()
+    )
+    if load is None:
+        return None
+
+    with transaction.atomic():
+        old = (
+            ChatAssignment.objects.select_for_update().filter(user=user)
+            .values_list('admin_id', 'is_open').first()
+        )
+        ChatAssignment.objects.update_or_create(user=user, defaults={'admin': load.admin, 'is_open': True})
+        if old is not None and old[1]:
+            record_assignment_removed(old[0])
+        AdminLoad.objects.filter(pk=load.pk).update(
+            open_conversations=F('open_conversations') + 1,
+            last_assigned_at=timezone.now(),
+        )
+    return load.admin
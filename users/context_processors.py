@@ -0,0 +1,12 @@
+from . import unread
+
+
+def unread_counts(request):
+    """
+    Adds ``unread`` (the user's UnreadCounter) for the nav badge. A single
+    primary-key lookup; nothing is counted at render time.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {'unread': unread.get_counts(user)}
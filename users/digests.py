@@ -0,0 +1,168 @@
+"""
+Notification digests.
+
+With NOTIFICATION_DIGEST_WINDOW set, notifications.fan_out stages one
+PendingNotification per recipient and event. deliver_digests() (a scheduler
+job) waits until a recipient's oldest pending event is a window old, then
+delivers all of their pending events as one notification: the event itself
+if there is only one, otherwise a digest whose ``items`` list the newest
+DIGEST_MAX_ITEMS events and whose ``item_count`` has the total.
+
+compact_batch() folds each recipient's read notifications older than a cutoff into
+one read digest (the compact_notifications command), so the table and the
+(recipient, is_read, created_at) index stop growing with every event.
+"""
+import datetime
+from itertools import groupby
+from operator import attrgetter
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from . import metrics, notifications, sync
+from .models import JobWatermark, Notification, PendingNotification
+
+WATERMARK_NAME = 'notification_digests'
+BATCH_SIZE = 500  # recipients per transaction
+DIGEST_MAX_ITEMS = 50
+
+
+def _item(message, pet_report_id, created_at):
+    return {'message': message, 'pet_report': pet_report_id, 'created_at': created_at.isoformat()}
+
+
+def _expand(notification):
+    """The items a notification stands for; a plain notification is its own item."""
+    if notification.items:
+        return notification.items
+    return [_item(notification.message, notification.pet_report_id, notification.created_at)]
+
+
+def _digest(recipient_id, message, items, item_count, created_at, is_read=False):
+    return Notification(
+        recipient_id=recipient_id,
+        message=message,
+        items=items[:DIGEST_MAX_ITEMS],
+        item_count=item_count,
+        created_at=created_at,
+        is_read=is_read,
+    )
+
+
+def _insert(rows):
+    """
+    bulk_create plus delta sync records. MySQL returns no ids from bulk
+    inserts, so there the recipients' rows above the previous maximum id are
+    read back (recording a concurrent insert as well is harmless).
+    """
+    floor = Notification.objects.aggregate(top=Max('pk'))['top'] or 0
+    created = Notification.objects.bulk_create(rows)
+    if all(n.pk is not None for n in created):
+        sync.record(created)
+    else:
+        sync.record_rows('notification', [
+            (pk, [recipient_id]) for pk, recipient_id in Notification.objects.filter(
+                recipient_id__in={n.recipient_id for n in rows}, pk__gt=floor,
+            ).values_list('pk', 'recipient_id')
+        ])
+    return created
+
+
+# -----------------------
+# Delivery
+# -----------------------
+def deliver_digests(now=None, window=None, batch_size=BATCH_SIZE):
+    """
+    Delivers the pending events of up to batch_size recipients whose oldest
+    event has waited ``window`` seconds. Returns how many recipients got one.
+    The watermark row is locked for the duration so workers take turns.
+    """
+    now = now or timezone.now()
+    window = settings.NOTIFICATION_DIGEST_WINDOW if window is None else window
+    cutoff = now - datetime.timedelta(seconds=window)
+    with transaction.atomic():
+        JobWatermark.objects.get_or_create(name=WATERMARK_NAME, defaults={'value': now})
+        mark = JobWatermark.objects.select_for_update().get(name=WATERMARK_NAME)
+        mark.value = now
+        mark.save(update_fields=['value'])
+        recipients = list(
+            PendingNotification.objects.filter(created_at__lte=cutoff)
+            .order_by().values_list('recipient_id', flat=True).distinct()[:batch_size]
+        )
+        if not recipients:
+            return 0
+        pending = list(
+            PendingNotification.objects.filter(recipient_id__in=recipients).order_by('recipient_id', '-created_at', '-id')
+        )
+        delivered = []
+        for recipient_id, events in groupby(pending, key=attrgetter('recipient_id')):
+            events = list(events)
+            newest = events[0]
+            if len(events) == 1:
+                delivered.append(Notification(
+                    recipient_id=recipient_id, pet_report_id=newest.pet_report_id,
+                    message=newest.message, created_at=newest.created_at,
+                ))
+            else:
+                items = [_item(e.message, e.pet_report_id, e.created_at) for e in events]
+                delivered.append(_digest(
+                    recipient_id, f"You have {len(events)} new notifications.", items, len(events), newest.created_at,
+                ))
+        _insert(delivered)
+        notifications.add_unread([n.recipient_id for n in delivered])
+        PendingNotification.objects.filter(pk__in=[e.pk for e in pending]).delete()
+    metrics.incr('notifications.digests_delivered', len(delivered))
+    metrics.incr('notifications.events_digested', len(pending))
+    return len(delivered)
+
+
+def run_digests():
+    """Scheduler job: delivers every due digest."""
+    if not settings.NOTIFICATION_DIGEST_WINDOW:
+        return 0
+    total = 0
+    while True:
+        count = deliver_digests()
+        total += count
+        if count < BATCH_SIZE:
+            return total
+
+
+# -----------------------
+# Compaction
+# -----------------------
+def compaction_due(age_days, now=None):
+    cutoff = (now or timezone.now()) - datetime.timedelta(days=age_days)
+    return Notification.objects.filter(is_read=True, created_at__lt=cutoff)
+
+
+def compact_batch(queryset, batch_size=BATCH_SIZE):
+    """
+    Folds the rows of ``queryset`` into one read digest per recipient, for up
+    to batch_size recipients that have more than one row. Returns how many
+    rows were removed.
+    """
+    with transaction.atomic():
+        recipients = list(
+            queryset.order_by().values('recipient_id').annotate(n=Count('pk')).filter(n__gt=1)
+            .values_list('recipient_id', flat=True)[:batch_size]
+        )
+        if not recipients:
+            return 0
+        rows = list(queryset.filter(recipient_id__in=recipients).order_by('recipient_id', '-created_at', '-id'))
+        digests = []
+        for recipient_id, group in groupby(rows, key=attrgetter('recipient_id')):
+            group = list(group)
+            items = [item for row in group for item in _expand(row)][:DIGEST_MAX_ITEMS]
+            total = sum(row.item_count for row in group)
+            digests.append(_digest(
+                recipient_id, f"{total} earlier notifications.", items, total, group[0].created_at, is_read=True,
+            ))
+        _insert(digests)
+        # post_delete records the tombstones for delta sync.
+        Notification.objects.filter(pk__in=[row.pk for row in rows]).delete()
+    removed = len(rows) - len(digests)
+    metrics.incr('notifications.compacted', removed)
+    return removed
@@ -0,0 +1,138 @@
+"""
+Report lifecycle events and their consumers.
+
+Each lifecycle change of a PetReport appends a ReportEvent: creation, an
+approval, closing, another change to a LIFECYCLE_FIELDS column, deletion, or
+a move to the archive (the report leaves the hot table but is not deleted).
+Saves and deletes are picked up by signals (users/signals.py). A save is
+compared with the state the report was loaded with. Code that changes
+reports with QuerySet.update() calls report_changed() itself. Callers wrap the change
+in transaction.atomic() so the event commits or rolls back with it.
+
+A consumer is a function that takes a list of events. It is registered under
+a name with a ConsumerOffset row. process() locks that row, hands the next
+batch to the consumer and moves the offset in one transaction, so the
+consumer's own database writes are applied exactly once. Replaying resets
+the consumer's derived data and starts it again from offset 0. Offsets are
+event ``seq`` numbers, given out in commit order (users/sequencing.py), so an
+event committed late by a long transaction still lands after every offset.
+"""
+import logging
+from collections import namedtuple
+
+from django.db import transaction
+
+from . import metrics, sequencing
+from .models import ConsumerOffset, ReportEvent
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+
+Consumer = namedtuple('Consumer', 'name handle reset')
+CONSUMERS = {}
+
+
+def register(name, handle, reset=None):
+    """Registers ``handle(events)``; ``reset()`` clears its derived data before a replay."""
+    CONSUMERS[name] = Consumer(name, handle, reset)
+
+
+# -----------------------
+# Producing
+# -----------------------
+def emit(event_type, report, before, after):
+    metrics.incr(f'events.{event_type}')
+    event = ReportEvent.objects.create(
+        event_type=event_type,
+        report_id=report.pk,
+        payload={'before': before, 'after': after, 'city_key': report.city_key},
+    )
+    sequencing.stamp_on_commit(ReportEvent)
+    return event
+
+
+def _event_type(before, after):
+    if after['is_approved'] and not before['is_approved']:
+        return 'approved'
+    if after['status'] == 'Closed' and before['status'] != 'Closed':
+        return 'closed'
+    return 'updated'
+
+
+def report_changed(report, before):
+    """Emits the event for a report that moved from ``before`` to its current state."""
+    after = report.lifecycle_state()
+    if before != after:
+        emit(_event_type(before, after), report, before, after)
+        report._loaded_lifecycle = after
+
+
+def report_saved(report, created):
+    if created:
+        report._loaded_lifecycle = report.lifecycle_state()
+        emit('created', report, None, report._loaded_lifecycle)
+        return
+    # Instances loaded without the lifecycle columns (.only()/.defer()) cannot be compared.
+    before = getattr(report, '_loaded_lifecycle', None)
+    if before is not None:
+        report_changed(report, before)
+
+
+def report_deleted(report):
+    emit('deleted', report, report.lifecycle_state(), None)
+
+
+def report_archived(report):
+    emit('archived', report, report.lifecycle_state(), None)
+
+
+# -----------------------
+# Consuming
+# -----------------------
+def process(name, batch_size=BATCH_SIZE):
+    """Feeds the consumer its next batch of numbered events. Returns how many it got."""
+    consumer = CONSUMERS[name]
+    with transaction.atomic():
+        ConsumerOffset.objects.get_or_create(name=name)
+        offset = ConsumerOffset.objects.select_for_update().get(name=name)
+        events = list(ReportEvent.objects.filter(seq__gt=offset.position).order_by('seq')[:batch_size])
+        if not events:
+            return 0
+        consumer.handle(events)
+        offset.position = events[-1].seq
+        offset.save(update_fields=['position', 'updated_at'])
+    metrics.incr(f'events.consumed.{name}', len(events))
+    return len(events)
+
+
+def catch_up(name, batch_size=BATCH_SIZE, max_batches=None):
+    """Runs batches until the consumer is up to date. Returns how many events it processed."""
+    # Numbers any events whose writer stopped before its on-commit stamp.
+    sequencing.stamp(ReportEvent)
+    total = batches = 0
+    while max_batches is None or batches < max_batches:
+        count = process(name, batch_size)
+        if not count:
+            break
+        total += count
+        batches += 1
+    return total
+
+
+def replay(name):
+    """Clears the consumer's derived data and rewinds it to the first event."""
+    consumer = CONSUMERS[name]
+    with transaction.atomic():
+        ConsumerOffset.objects.update_or_create(name=name, defaults={'position': 0})
+        if consumer.reset is not None:
+            consumer.reset()
+
+
+def run_all():
+    """Scheduler job: catches every registered consumer up."""
+    for name in CONSUMERS:
+        try:
+            catch_up(name)
+        except Exception:
+            logger.exception("Event consumer %s failed", name)
@@ -0,0 +1,178 @@
+"""
+Fast read path for API list endpoints.
+
+``RowEncoder`` is compiled once from a ModelSerializer. It walks the
+serializer's bound fields in order and turns each into a ``values_list()``
+lookup plus a converter, and nested serializers become joined lookups. A
+list response then needs one query and no model or serializer instances per
+row. Converters reuse DRF's own field logic wherever formatting is involved
+(dates, datetimes, file URLs), so the output is byte-identical to
+``Serializer(queryset, many=True).data`` rendered by JSONRenderer.
+Serializers with field types the encoder does not know raise
+UnsupportedSerializer, and callers fall back to the regular path.
+
+``FastJSONRenderer`` renders those rows with orjson when it is installed.
+orjson would format datetimes, decimals and the like differently from DRF's
+encoder, so it is only used for PrimitiveResponse bodies, which hold nothing
+but str/int/bool/None, lists and dicts.
+"""
+import re
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.functional import LazyObject
+from rest_framework import fields as drf_fields
+from rest_framework import relations, serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+# Fields whose to_representation leaves database values unchanged.
+PASSTHROUGH_FIELDS = (
+    drf_fields.BooleanField,
+    drf_fields.CharField,  # includes EmailField, SlugField, URLField, RegexField
+    drf_fields.ChoiceField,
+    drf_fields.IntegerField,
+    drf_fields.ReadOnlyField,
+    relations.PrimaryKeyRelatedField,
+)
+FORMATTED_FIELDS = (drf_fields.DateTimeField, drf_fields.DateField, drf_fields.TimeField)
+# Upload names that need no quoting and contain no '.'/'..' segments or '//'.
+PLAIN_NAME_RE = re.compile(r'^(?:[A-Za-z0-9_-][A-Za-z0-9_.-]*/)*[A-Za-z0-9_-][A-Za-z0-9_.-]*$')
+
+
+class UnsupportedSerializer(Exception):
+    pass
+
+
+def _file_url(field, model_field, request):
+    storage = model_field.storage
+    use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+
+    # For plain names on local storage, storage.url() and build_absolute_uri()
+    # reduce to string concatenation; urljoin/urlsplit/iri_to_uri are the bulk
+    # of the per-row cost otherwise.
+    prefix = None
+    base_url = getattr(storage, 'base_url', None) or ''
+    # Fields on the default storage hold the DefaultStorage proxy, which
+    # reading base_url has just set up.
+    backend = storage._wrapped if isinstance(storage, LazyObject) else storage
+    if type(backend) is FileSystemStorage and base_url.startswith('/') and base_url.endswith('/') \
+            and not base_url.startswith('//'):
+        prefix = (request.build_absolute_uri('/')[:-1] if request is not None else '') + base_url
+
+    def convert(name):
+        if not name:
+            return None
+        if not use_url:
+            return name
+        if prefix is not None and PLAIN_NAME_RE.match(name):
+            return prefix + name
+        url = storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+    return convert
+
+
+class RowEncoder:
+    """
+    ``encoder.lookups`` are the values_list() arguments; ``encoder.encode(rows)``
+    turns the resulting tuples into serializer-shaped dicts.
+    """
+
+    def __init__(self, serializer_class, context=None):
+        self.context = context or {}
+        self.lookups = []
+        self._plan = self._compile(serializer_class(context=self.context), prefix='')
+
+    def _compile(self, serializer, prefix):
+        model = serializer.Meta.model
+        plan = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if field.source == '*' or '.' in field.source:
+                raise UnsupportedSerializer(f'{model.__name__}.{name}: source {field.source!r}')
+            lookup = prefix + field.source
+
+            if isinstance(field, serializers.BaseSerializer):
+                if getattr(field, 'many', False) or not isinstance(field, serializers.ModelSerializer):
+                    raise UnsupportedSerializer(f'{model.__name__}.{name}: nested {type(field).__name__}')
+                # DRF renders a missing related object as None; detect it by its pk.
+                pk_index = len(self.lookups)
+                self.lookups.append(f'{lookup}__pk')
+                plan.append((name, 'nested', pk_index, self._compile(field, prefix=f'{lookup}__')))
+                continue
+
+            index = len(self.lookups)
+            self.lookups.append(lookup)
+            if isinstance(field, drf_fields.FileField):
+                model_field = model._meta.get_field(field.source)
+                plan.append((name, 'value', index, _file_url(field, model_field, self.context.get('request'))))
+            elif isinstance(field, FORMATTED_FIELDS):
+                plan.append((name, 'value', index, field.to_representation))
+            elif isinstance(field, PASSTHROUGH_FIELDS):
+                plan.append((name, 'value', index, None))
+            else:
+                raise UnsupportedSerializer(f'{model.__name__}.{name}: {type(field).__name__}')
+        return plan
+
+    def _encode_row(self, row, plan):
+        out = {}
+        for name, kind, index, convert in plan:
+            value = row[index]
+            if kind == 'nested':
+                out[name] = None if value is None else self._encode_row(row, convert)
+            elif value is None or convert is None:
+                out[name] = value
+            else:
+                out[name] = convert(value)
+        return out
+
+    def encode(self, rows):
+        plan = self._plan
+        return [self._encode_row(row, plan) for row in rows]
+
+    def serialize(self, queryset):
+        return self.encode(queryset.values_list(*self.lookups))
+
+
+class PrimitiveResponse(Response):
+    """A Response whose data is known to hold only JSON primitives."""
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        renderer_context = renderer_context or {}
+        if (
+            orjson is None
+            or not isinstance(renderer_context.get('response'), PrimitiveResponse)
+            or self.get_indent(accepted_media_type, renderer_context) is not None
+            or self.ensure_ascii or not self.compact or not self.strict
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping JSONRenderer applies for JavaScript compatibility.
+        return orjson.dumps(data).replace('\u2028'.encode(), b'\\u2028').replace('\u2029'.encode(), b'\\u2029')
+
+
+class FastListMixin:
+    """
+    Serves ``list`` through RowEncoder when the serializer allows it. The
+    encoder is compiled per request because file URLs depend on the request.
+    """
+    renderer_classes = [FastJSONRenderer] + [
+        renderer for renderer in api_settings.DEFAULT_RENDERER_CLASSES if renderer is not JSONRenderer
+    ]
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.paginator is not None:
+            return super().list(request, *args, **kwargs)
+        try:
+            encoder = RowEncoder(self.get_serializer_class(), self.get_serializer_context())
+        except UnsupportedSerializer:
+            return super().list(request, *args, **kwargs)
+        return PrimitiveResponse(encoder.serialize(queryset))
@@ -0,0 +1,227 @@
+"""
+Public Atom and JSON feeds of newly approved Found reports and new adoption
+listings.
+
+Each feed is kept in the cache as a small document of its newest
+FEED_MAX_ENTRIES entries: approved, open Found reports and available
+listings. Saves prepend to it (see users/signals.py), so serving a feed never
+queries the database. A report or listing that leaves the feed (rejected,
+deleted, archived, closed, adopted) drops the document if it is listed there.
+The document is rebuilt from the database only when it is missing from the
+cache. If two workers race on the same update, the document is dropped so
+the next read rebuilds it.
+
+Feeds are filtered in memory by ``pet_type`` and ``city``. The city filter
+is a case-insensitive match against the report location; adoption listings
+carry no location, so ``city`` does not filter them. Responses carry an ETag
+derived from the document and the filters. A ``since`` parameter (ISO 8601,
+the newest ``published`` value seen) limits the feed to later entries and
+returns 304 when there are none; a ``since`` that is not a valid date is a
+400.
+"""
+import datetime
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.feedgenerator import Atom1Feed
+
+from . import metrics
+from .models import PetForAdoption, PetReport
+
+FEED_KINDS = {
+    'found': 'Newly found pets',
+    'adoptions': 'Pets available for adoption',
+}
+CACHE_TIMEOUT = 60 * 60 * 24
+LOCK_TIMEOUT = 5
+
+
+def _doc_key(kind):
+    return f'feed:{kind}'
+
+
+def _max_entries():
+    return getattr(settings, 'FEED_MAX_ENTRIES', 50)
+
+
+def found_report_entry(report):
+    published = report.approved_at or report.date_reported
+    return {
+        'id': f'found-{report.pk}',
+        'title': f"Found {report.pet_type}" + (f": {report.name}" if report.name else ''),
+        'path': reverse('users:found_report', args=[report.pk]),
+        'image': report.pet_image.url if report.pet_image else None,
+        'summary': f"{report.color} {report.breed or report.pet_type} found near {report.location}.",
+        'pet_type': report.pet_type,
+        'location': report.location,
+        'published': published.isoformat(),
+    }
+
+
+def adoption_entry(pet):
+    return {
+        'id': f'adoption-{pet.pk}',
+        'title': f"{pet.name} the {pet.pet_type} is looking for a home",
+        'path': reverse('users:pet_detail', args=[pet.pk]),
+        'image': pet.image.url if pet.image else None,
+        'summary': pet.description,
+        'pet_type': pet.pet_type,
+        'location': None,
+        'published': pet.date_listed.isoformat(),
+    }
+
+
+def _build_entries(kind):
+    limit = _max_entries()
+    if kind == 'found':
+        reports = (PetReport.objects.filter(report_type='Found', is_approved=True, status='Open')
+                   .order_by('-approved_at', '-id')[:limit])
+        return [found_report_entry(report) for report in reports]
+    pets = PetForAdoption.objects.filter(status='Available').order_by('-date_listed', '-id')[:limit]
+    return [adoption_entry(pet) for pet in pets]
+
+
+def get_document(kind):
+    doc = cache.get(_doc_key(kind))
+    if doc is None:
+        metrics.incr(f'feeds.{kind}.rebuilds')
+        entries = _build_entries(kind)
+        doc = {
+            'entries': entries,
+            'updated': entries[0]['published'] if entries else timezone.now().isoformat(),
+        }
+        cache.set(_doc_key(kind), doc, CACHE_TIMEOUT)
+    return doc
+
+
+def publish(kind, entry):
+    """Prepend ``entry`` to the cached feed document."""
+    key = _doc_key(kind)
+    lock_key, dirty_key = key + ':lock', key + ':dirty'
+    if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        # Someone else is updating; make sure their write does not stick.
+        cache.set(dirty_key, 1, LOCK_TIMEOUT)
+        cache.delete(key)
+        return
+    try:
+        doc = cache.get(key)
+        if doc is None:
+            return  # rebuilt, including this entry, on the next read
+        entries = [entry] + [e for e in doc['entries'] if e['id'] != entry['id']]
+        entries.sort(key=lambda e: e['published'], reverse=True)
+        doc = {'entries': entries[:_max_entries()], 'updated': entries[0]['published']}
+        cache.set(key, doc, CACHE_TIMEOUT)
+        metrics.incr(f'feeds.{kind}.appends')
+        if cache.get(dirty_key):
+            cache.delete_many([key, dirty_key])
+    finally:
+        cache.delete(lock_key)
+
+
+def withdraw(kind, entry_id):
+    """Drops the cached document if it lists ``entry_id``; the next read rebuilds it."""
+    key = _doc_key(kind)
+    doc = cache.get(key)
+    if doc is None or not any(e['id'] == entry_id for e in doc['entries']):
+        return
+    # A publish() in flight may write back the copy it read; it drops it again on seeing this.
+    cache.set(key + ':dirty', 1, LOCK_TIMEOUT)
+    cache.delete(key)
+    metrics.incr(f'feeds.{kind}.withdrawals')
+
+
+def update_found_report(report):
+    if report.report_type == 'Found' and report.is_approved and report.status == 'Open':
+        publish('found', found_report_entry(report))
+    else:
+        withdraw('found', f'found-{report.pk}')
+
+
+def update_adoption_listing(pet):
+    if pet.status == 'Available':
+        publish('adoptions', adoption_entry(pet))
+    else:
+        withdraw('adoptions', f'adoption-{pet.pk}')
+
+
+def parse_since(value):
+    """
+    ``since`` as an aware datetime, or None when absent; tolerates a '+'
+    offset decoded to a space. Raises ValueError for anything else.
+    """
+    if not value:
+        return None
+    since = parse_datetime(value.replace(' ', '+'))
+    if since is None:
+        raise ValueError(value)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since, datetime.timezone.utc)
+    return since
+
+
+def filter_entries(entries, pet_type=None, city=None, since=None):
+    if pet_type:
+        pet_type = pet_type.strip().lower()
+        entries = [e for e in entries if e['pet_type'].lower() == pet_type]
+    if city:
+        city = city.strip().lower()
+        entries = [e for e in entries if e['location'] is None or city in e['location'].lower()]
+    if since:
+        entries = [e for e in entries if parse_datetime(e['published']) > since]
+    return entries
+
+
+def feed_etag(doc, fmt, params):
+    newest = doc['entries'][0]['id'] if doc['entries'] else ''
+    raw = json.dumps([fmt, doc['updated'], newest, len(doc['entries']), sorted(params.items())])
+    return '"%s"' % hashlib.md5(raw.encode()).hexdigest()
+
+
+def render_atom(request, kind, entries):
+    feed = Atom1Feed(
+        title=f"PurPaws: {FEED_KINDS[kind]}",
+        link=request.build_absolute_uri(reverse('users:home')),
+        description=FEED_KINDS[kind],
+        feed_url=request.build_absolute_uri(),
+        language='en',
+    )
+    for entry in entries:
+        link = request.build_absolute_uri(entry['path'])
+        feed.add_item(
+            title=entry['title'],
+            link=link,
+            description=entry['summary'],
+            unique_id=link,
+            pubdate=parse_datetime(entry['published']),
+            categories=[entry['pet_type']],
+        )
+    return feed.writeString('utf-8'), feed.content_type
+
+
+def render_json(request, kind, entries, updated):
+    items = []
+    for entry in entries:
+        items.append({
+            'id': entry['id'],
+            'url': request.build_absolute_uri(entry['path']),
+            'title': entry['title'],
+            'content_text': entry['summary'],
+            'image': request.build_absolute_uri(entry['image']) if entry['image'] else None,
+            'date_published': entry['published'],
+            'tags': [entry['pet_type']],
+        })
+    body = {
+        'version': 'https://jsonfeed.org/version/1.1',
+        'title': f"PurPaws: {FEED_KINDS[kind]}",
+        'home_page_url': request.build_absolute_uri(reverse('users:home')),
+        'feed_url': request.build_absolute_uri(),
+        'items': items,
+        # Pass back as ?since= to receive only newer entries.
+        '_petrescue': {'next_since': entries[0]['published'] if entries else None, 'updated': updated},
+    }
+    return json.dumps(body), 'application/feed+json'
@@ -0,0 +1,215 @@
+"""
+The composite home screen API (GET /api/home/).
+
+One response carries the sections a client needs to draw its home screen:
+the user's profile, the first page of open reports near them, the newest
+adoptable pets, unread counts and recent notifications. Sections are
+independent, so they are built concurrently on a small shared thread pool.
+Each task runs in a copy of the request's context, so replica routing
+(petrescue/routers.py) applies to it, and it closes its own database
+connections when it finishes, which returns them to the pool.
+
+A request never waits behind another request's sections: it hands a section
+to the pool only when it can take one of the pool's free slots, and builds
+the rest on its own thread. The pool is capped at half of the database
+pool's MAX_SIZE, so request threads always keep connections of their own.
+
+``?fields=`` selects a partial response: a comma-separated list of sections
+or dotted paths into them, e.g. ``fields=unread,reports.id,reports.name``.
+Sections that are not selected are not queried. Paged sections take their
+own cursor as ``?<section>_cursor=``, using the ``next_cursor`` of the
+previous response.
+"""
+import contextvars
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import prefetch_related_objects
+
+from . import locality, metrics, search, unread
+from .models import Notification, Profile
+from .pagination import InvalidCursor, KeysetPaginator
+from .serializers import (
+    NotificationSerializer, PetForAdoptionSerializer, PetReportSerializer, ProfileSerializer,
+)
+
+SECTION_SIZE = 10
+PAGED_SECTIONS = ('reports', 'adoptions', 'notifications')
+
+HomeQuery = namedtuple('HomeQuery', 'request user cursors')
+
+
+class InvalidHomeQuery(ValueError):
+    pass
+
+
+def _paged(page, serializer_class, request):
+    return {
+        'results': serializer_class(page.object_list, many=True, context={'request': request}).data,
+        'next_cursor': page.next_cursor,
+    }
+
+
+def profile_section(query):
+    profile = Profile.objects.select_related('user').filter(user=query.user).first()
+    return ProfileSerializer(profile, context={'request': query.request}).data if profile else None
+
+
+def reports_section(query):
+    city_key = locality.user_city_key(query.user)
+    cursor = query.cursors.get('reports')
+    if cursor:
+        page = KeysetPaginator(locality.open_reports(city_key), locality.ORDERING, locality.PAGE_SIZE).page(cursor)
+        reports, next_cursor = page.object_list, page.next_cursor
+    else:
+        reports, next_cursor = locality.dashboard_page(city_key, cards=False)
+    prefetch_related_objects(reports, 'reporter')
+    return {
+        'city': city_key or None,
+        'results': PetReportSerializer(reports, many=True, context={'request': query.request}).data,
+        'next_cursor': next_cursor,
+    }
+
+
+def adoptions_section(query):
+    _, ordering = search.SORTS['newest']
+    page = KeysetPaginator(search.available_pets(), ordering, SECTION_SIZE).page(query.cursors.get('adoptions'))
+    return _paged(page, PetForAdoptionSerializer, query.request)
+
+
+def unread_section(query):
+    counts = unread.get_counts(query.user)
+    return {'notifications': counts.unread_notifications, 'messages': counts.unread_messages}
+
+
+def notifications_section(query):
+    paginator = KeysetPaginator(
+        Notification.objects.filter(recipient=query.user), ('-created_at', '-id'), SECTION_SIZE
+    )
+    return _paged(paginator.page(query.cursors.get('notifications')), NotificationSerializer, query.request)
+
+
+SECTIONS = {
+    'profile': profile_section,
+    'reports': reports_section,
+    'adoptions': adoptions_section,
+    'unread': unread_section,
+    'notifications': notifications_section,
+}
+
+
+def parse_fields(value):
+    """
+    Turns ``"unread,reports.id,reports.reporter.username"`` into
+    ``{'unread': None, 'reports': {'id': None, 'reporter': {'username': None}}}``.
+    None means "everything below here". No value selects every section.
+    """
+    if not value:
+        return dict.fromkeys(SECTIONS)
+    tree = {}
+    for path in value.split(','):
+        parts = [part.strip() for part in path.split('.')]
+        if not all(parts):
+            raise InvalidHomeQuery(f'Invalid field path {path!r}.')
+        if parts[0] not in SECTIONS:
+            raise InvalidHomeQuery(f'Unknown section {parts[0]!r}.')
+        node = tree
+        for part in parts[:-1]:
+            if part in node and node[part] is None:
+                break
+            node = node.setdefault(part, {})
+        else:
+            node[parts[-1]] = None
+    return tree
+
+
+def prune(data, tree):
+    """Keeps only the selected keys; list items are pruned one by one."""
+    if tree is None:
+        return data
+    if isinstance(data, list):
+        return [prune(item, tree) for item in data]
+    if isinstance(data, dict):
+        return {key: prune(data[key], subtree) for key, subtree in tree.items() if key in data}
+    return data
+
+
+def _prune_section(name, data, tree):
+    if tree is None or data is None:
+        return data
+    if name in PAGED_SECTIONS:
+        # Paging keys stay so the client can continue; field paths apply to the items.
+        return {key: (prune(value, tree) if key == 'results' else value) for key, value in data.items()}
+    return prune(data, tree)
+
+
+_executor = None
+_slots = None
+_executor_lock = threading.Lock()
+
+
+def worker_count():
+    """HOME_API_WORKERS, capped at half of the default database's connection pool."""
+    workers = settings.HOME_API_WORKERS
+    pool_size = settings.DATABASES[DEFAULT_DB_ALIAS].get('POOL', {}).get('MAX_SIZE')
+    if pool_size:
+        workers = min(workers, pool_size // 2)
+    return workers
+
+
+def _get_executor(workers):
+    """The shared pool and a semaphore with one slot per thread."""
+    global _executor, _slots
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='petrescue-home')
+            _slots = threading.BoundedSemaphore(workers)
+        return _executor, _slots
+
+
+def _run_section(builder, query, slots):
+    try:
+        return builder(query)
+    finally:
+        connections.close_all()
+        slots.release()
+
+
+def build(request, fields=None, cursors=None):
+    """Builds the selected sections, concurrently when more than one is asked for."""
+    tree = parse_fields(fields)
+    query = HomeQuery(request, request.user, cursors or {})
+    names = [name for name in SECTIONS if name in tree]
+    metrics.incr('home_api.requests')
+
+    # Worker threads have their own connections, so they would not see an
+    # open transaction's writes; build inline in that case.
+    workers = worker_count()
+    futures = {}
+    if len(names) > 1 and workers > 1 and not connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        executor, slots = _get_executor(workers)
+        # The request thread builds the first section itself; the others go
+        # to the pool only while a thread is free, so none of them queue.
+        for name in names[1:]:
+            if not slots.acquire(blocking=False):
+                break
+            futures[name] = executor.submit(
+                contextvars.copy_context().run, _run_section, SECTIONS[name], query, slots
+            )
+        metrics.incr('home_api.sections_offloaded', len(futures))
+    results = {
+        name: _call(name, partial(SECTIONS[name], query)) for name in names if name not in futures
+    }
+    results.update((name, _call(name, future.result)) for name, future in futures.items())
+    return {name: _prune_section(name, results[name], tree[name]) for name in names}
+
+
+def _call(name, fn):
+    try:
+        return fn()
+    except InvalidCursor:
+        raise InvalidHomeQuery(f'Invalid cursor for {name}.') from None
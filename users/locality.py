@@ -0,0 +1,78 @@
+"""
+Per-city dashboard feeds.
+
+Open approved reports are read through the (city_key, status, is_approved,
+date_reported) index, one keyset page at a time. Users without a city get
+the global feed instead. First pages are the hot ones and are cached per
+(city, filter). Any save or delete of a report in a city drops that city's
+entries and the global ones (users/signals.py).
+"""
+from django.core.cache import cache
+
+from . import metrics
+from .models import PetReport
+from .pagination import InvalidCursor, KeysetPaginator
+
+GLOBAL = '_all'
+VIEWS = ('all', 'lost', 'found')
+PAGE_SIZE = 12
+CACHE_TIMEOUT = 300
+ORDERING = ('-date_reported', '-id')
+
+
+def _cache_key(city_key, view, cards):
+    return f"dashboard:{city_key or GLOBAL}:{view}{':cards' if cards else ''}"
+
+
+def user_city_key(user):
+    profile = getattr(user, 'profile', None) if user.is_authenticated else None
+    return profile.city_key if profile else ''
+
+
+def open_reports(city_key='', view='all'):
+    queryset = PetReport.objects.filter(status='Open', is_approved=True)
+    if city_key:
+        queryset = queryset.filter(city_key=city_key)
+    if view == 'lost':
+        queryset = queryset.filter(report_type='Lost')
+    elif view == 'found':
+        queryset = queryset.filter(report_type='Found')
+    return queryset
+
+
+def dashboard_page(city_key='', view='all', cursor=None, cards=True):
+    """
+    One keyset page of open reports as ``(reports, next_cursor)``. With
+    ``cards`` (the dashboard) only the card columns are loaded; the API
+    passes False for full rows.
+    """
+    queryset = open_reports(city_key, view)
+    if cards:
+        queryset = queryset.cards()
+    paginator = KeysetPaginator(queryset, ORDERING, PAGE_SIZE)
+    if cursor:
+        try:
+            page = paginator.page(cursor)
+            return page.object_list, page.next_cursor
+        except InvalidCursor:
+            pass
+
+    key = _cache_key(city_key, view, cards)
+    cached = cache.get(key)
+    if cached is not None:
+        metrics.incr('dashboard.cache_hits')
+        return cached
+    metrics.incr('dashboard.cache_misses')
+    page = paginator.page()
+    result = (page.object_list, page.next_cursor)
+    cache.set(key, result, CACHE_TIMEOUT)
+    return result
+
+
+def invalidate_city(*city_keys):
+    """Drops the cached first pages for these cities and the global feed."""
+    keys = {
+        _cache_key(city_key, view, cards)
+        for city_key in set(city_keys) | {''} for view in VIEWS for cards in (True, False)
+    }
+    cache.delete_many(list(keys))
@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users import archive
+
+
+class Command(BaseCommand):
+    help = 'Moves old messages and long-closed pet reports into the archive tables, a batch at a time.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--message-days', type=int, default=settings.ARCHIVE_MESSAGES_AFTER_DAYS,
+                            help='Archive messages older than this many days.')
+        parser.add_argument('--report-days', type=int, default=settings.ARCHIVE_CLOSED_REPORTS_AFTER_DAYS,
+                            help="Archive reports that have been 'Closed' for longer than this many days.")
+        parser.add_argument('--batch-size', type=int, default=settings.ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--sleep', type=float, default=settings.ARCHIVE_BATCH_SLEEP,
+                            help='Seconds to pause between batches to limit load on the database.')
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help='Stop after this many batches per table (default: run until done).')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows are due.')
+
+    def handle(self, *args, **options):
+        jobs = [
+            ('messages', archive.messages_due(options['message_days']), archive.archive_message_batch),
+            ('closed reports', archive.reports_due(options['report_days']), archive.archive_report_batch),
+        ]
+        for label, queryset, move_batch in jobs:
+            if options['dry_run']:
+                self.stdout.write(f"{queryset.count()} {label} are due for archival.")
+                continue
+
+            self.stdout.write(f"Archiving {label}...")
+            moved = batches = 0
+            while options['max_batches'] is None or batches < options['max_batches']:
+                count = move_batch(queryset, options['batch_size'])
+                if not count:
+                    break
+                moved += count
+                batches += 1
+                self.stdout.write(f"  - batch {batches}: moved {count} row(s)")
+                time.sleep(options['sleep'])
+            self.stdout.write(self.style.SUCCESS(f"Archived {moved} {label}."))
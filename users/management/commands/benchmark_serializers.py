@@ -0,0 +1,96 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from users.fast_read import FastJSONRenderer, PrimitiveResponse, RowEncoder
+from users.models import Message, PetForAdoption, PetReport
+from users.serializers import MessageSerializer, PetForAdoptionSerializer, PetReportSerializer
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Compares rows/sec of the ModelSerializer list path with the users.fast_read path, '
+            'and checks that both render identical bytes. Sample rows are rolled back afterwards.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Sample rows to create per model.')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per path; the best is reported.')
+        parser.add_argument('--host', default='localhost',
+                            help='Host for absolute image URLs; must be in ALLOWED_HOSTS.')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._seed(options['rows'])
+                request = Request(RequestFactory().get('/api/', HTTP_HOST=options['host']))
+                for label, queryset, serializer_class in (
+                    ('PetReport', PetReport.objects.order_by('pk'), PetReportSerializer),
+                    ('PetForAdoption', PetForAdoption.objects.order_by('pk'), PetForAdoptionSerializer),
+                    ('Message', Message.objects.with_read_state().order_by('pk'), MessageSerializer),
+                ):
+                    self._compare(label, queryset, serializer_class, request, options['repeat'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _seed(self, rows):
+        users = User.objects.bulk_create(
+            [User(username=f'bench-{i}-{time.time_ns()}', email=f'bench{i}@example.com') for i in range(2)]
+        )
+        now = timezone.now()
+        PetReport.objects.bulk_create([
+            PetReport(report_type='Found', reporter=users[i % 2], name=f'Pet {i}', pet_type='Dog',
+                      color='Brown', pet_image=f'pet_images/bench_{i}.jpg', location='Springfield',
+                      contact_info='555-0100', date_reported=now, event_date=now.date())
+            for i in range(rows)
+        ])
+        PetForAdoption.objects.bulk_create([
+            PetForAdoption(name=f'Pet {i}', age=i % 12, pet_type='Cat', color='Black',
+                           image=f'adoption_images/bench_{i}.jpg', description='Friendly   cat.',
+                           lister=users[0])
+            for i in range(rows)
+        ])
+        Message.objects.bulk_create([
+            Message(sender=users[i % 2], recipient=users[(i + 1) % 2], content=f'Hello {i}')
+            for i in range(rows)
+        ])
+
+    def _compare(self, label, queryset, serializer_class, request, repeat):
+        context = {'request': request}
+
+        def drf_path():
+            data = serializer_class(queryset, many=True, context=context).data
+            return JSONRenderer().render(data)
+
+        def fast_path():
+            data = RowEncoder(serializer_class, context).serialize(queryset)
+            return FastJSONRenderer().render(data, renderer_context={'response': PrimitiveResponse(data)})
+
+        rows = queryset.count()
+        results = {}
+        for name, run in (('serializer', drf_path), ('fast', fast_path)):
+            best, body = None, None
+            for _ in range(repeat):
+                started = time.perf_counter()
+                body = run()
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            results[name] = (best, body)
+
+        if results['serializer'][1] != results['fast'][1]:
+            raise CommandError(f'{label}: fast path output differs from the serializer output.')
+
+        slow, fast = results['serializer'][0], results['fast'][0]
+        self.stdout.write(
+            f'{label:<15} {rows} rows  serializer: {rows / slow:>10,.0f} rows/s  '
+            f'fast: {rows / fast:>10,.0f} rows/s  ({slow / fast:.1f}x, identical output)'
+        )
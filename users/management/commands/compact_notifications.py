@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from users import digests
+
+
+class Command(BaseCommand):
+    help = ("Folds each user's old read notifications into one digest, a batch of users at a time, "
+            "and delivers any notification digests that are due.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.NOTIFICATION_COMPACT_AFTER_DAYS,
+                            help='Compact read notifications older than this many days.')
+        parser.add_argument('--batch-size', type=int, default=digests.BATCH_SIZE, help='Users per batch.')
+        parser.add_argument('--sleep', type=float, default=0.5,
+                            help='Seconds to pause between batches to limit load on the database.')
+        parser.add_argument('--max-batches', type=int, default=None,
+                            help='Stop after this many batches (default: run until done).')
+        parser.add_argument('--dry-run', action='store_true', help='Only report how many rows are due.')
+
+    def handle(self, *args, **options):
+        queryset = digests.compaction_due(options['days'])
+        if options['dry_run']:
+            self.stdout.write(f"{queryset.count()} read notifications are older than {options['days']} days.")
+            return
+
+        delivered = digests.run_digests()
+        if delivered:
+            self.stdout.write(f"Delivered {delivered} due digest(s).")
+
+        self.stdout.write("Compacting notifications...")
+        removed = batches = 0
+        while options['max_batches'] is None or batches < options['max_batches']:
+            count = digests.compact_batch(queryset, options['batch_size'])
+            if not count:
+                break
+            removed += count
+            batches += 1
+            self.stdout.write(f"  - batch {batches}: removed {count} row(s)")
+            time.sleep(options['sleep'])
+        self.stdout.write(self.style.SUCCESS(f"Compaction removed {removed} notification row(s)."))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users import events
+
+
+class Command(BaseCommand):
+    help = 'Runs report event consumers until they are caught up, optionally replaying them from the first event.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('consumers', nargs='*', help='Consumer names (default: all registered consumers).')
+        parser.add_argument('--batch-size', type=int, default=events.BATCH_SIZE)
+        parser.add_argument('--replay', action='store_true',
+                            help="Reset the consumers' derived data and process every event again.")
+
+    def handle(self, *args, **options):
+        names = options['consumers'] or list(events.CONSUMERS)
+        unknown = set(names) - set(events.CONSUMERS)
+        if unknown:
+            raise CommandError(f"Unknown consumer(s): {', '.join(sorted(unknown))}. "
+                               f"Registered: {', '.join(sorted(events.CONSUMERS))}.")
+        for name in names:
+            if options['replay']:
+                events.replay(name)
+                self.stdout.write(f"Rewound {name} to the first event.")
+            count = events.catch_up(name, options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f"{name}: processed {count} event(s)."))
@@ -0,0 +1,90 @@
+import json
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Runs in a fresh interpreter under -X importtime: boots the WSGI application
+# the way a worker does, optionally warms it up, then serves one request.
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+booted = time.perf_counter()
+if sys.argv[3] == "1":
+    from users.warmup import warm_up
+    warm_up()
+warmed = time.perf_counter()
+from wsgiref.util import setup_testing_defaults
+environ = {"PATH_INFO": sys.argv[1], "HTTP_HOST": sys.argv[2]}
+setup_testing_defaults(environ)
+statuses = []
+response = application(environ, lambda status, headers, exc_info=None: statuses.append(status))
+b"".join(response)
+response.close()
+served = time.perf_counter()
+print(json.dumps({
+    "boot": booted - started, "warm_up": warmed - booted, "request": served - warmed,
+    "status": statuses[0] if statuses else None,
+}))
+'''
+
+
+def parse_importtime(stderr):
+    """``-X importtime`` lines as (module, self_us, cumulative_us, depth)."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+class Command(BaseCommand):
+    help = ('Boots the WSGI application in a fresh interpreter under -X importtime and reports the '
+            'slowest imports, import time per package, and the time to the first request.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/', help='Path of the first request.')
+        parser.add_argument('--host', default='localhost', help='Host header; must be in ALLOWED_HOSTS.')
+        parser.add_argument('--top', type=int, default=25, help='How many modules to list.')
+        parser.add_argument('--warm-up', action='store_true',
+                            help='Run users.warmup.warm_up() before the first request.')
+
+    def handle(self, *args, **options):
+        env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE}
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', PROBE,
+             options['path'], options['host'], '1' if options['warm_up'] else '0'],
+            capture_output=True, text=True, env=env, cwd=settings.BASE_DIR,
+        )
+        if result.returncode:
+            raise CommandError(f"The probe process failed:\n{result.stderr[-2000:]}")
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        rows = parse_importtime(result.stderr)
+
+        self.stdout.write(self.style.MIGRATE_HEADING('Startup'))
+        self.stdout.write(f"  imports + django.setup()  {timings['boot'] * 1000:8.1f} ms")
+        if options['warm_up']:
+            self.stdout.write(f"  warm-up                   {timings['warm_up'] * 1000:8.1f} ms")
+        self.stdout.write(f"  first request             {timings['request'] * 1000:8.1f} ms  "
+                          f"({options['path']} -> {timings['status']})")
+        total = timings['boot'] + timings['warm_up'] + timings['request']
+        self.stdout.write(f"  time to first response    {total * 1000:8.1f} ms")
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"Slowest imports (cumulative, top {options['top']})"))
+        for name, _, cumulative_us, depth in sorted(rows, key=lambda row: -row[2])[:options['top']]:
+            self.stdout.write(f"  {cumulative_us / 1000:8.1f} ms  {'  ' * min(depth, 6)}{name}")
+
+        packages = defaultdict(int)
+        for name, self_us, _, _ in rows:
+            packages[name.split('.')[0]] += self_us
+        self.stdout.write(self.style.MIGRATE_HEADING('Import time by top-level package (self)'))
+        for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f"  {self_us / 1000:8.1f} ms  {package}")
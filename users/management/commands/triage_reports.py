@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from users import triage
+from users.models import PetReport
+
+
+class Command(BaseCommand):
+    help = ('Recomputes the triage priority of every report awaiting approval, e.g. for reports '
+            'submitted before triage existed or after the scoring weights change.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch, changed = [], 0
+        for report in PetReport.objects.filter(is_approved=False).order_by('pk').iterator(options['batch_size']):
+            score = triage.priority(report)
+            if score != report.priority:
+                report.priority = score
+                batch.append(report)
+            if len(batch) >= options['batch_size']:
+                changed += PetReport.objects.bulk_update(batch, ['priority'])
+                batch = []
+        if batch:
+            changed += PetReport.objects.bulk_update(batch, ['priority'])
+        self.stdout.write(self.style.SUCCESS(f"Rescored {changed} pending report(s)."))
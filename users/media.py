@@ -0,0 +1,191 @@
+"""
+Production serving for files under MEDIA_ROOT.
+
+serve_media answers conditional requests (If-None-Match / If-Modified-Since)
+with 304s, honours single byte ranges (with If-Range) and sets long-lived
+cache headers. Images of reports that are not yet approved are only served
+to their reporter and to staff.
+
+When MEDIA_SENDFILE_HEADER is set the byte transfer is handed to the
+front-end server:
+
+* ``'X-Sendfile'`` (Apache mod_xsendfile, lighttpd) gets the absolute path;
+* ``'X-Accel-Redirect'`` (nginx) gets MEDIA_ACCEL_REDIRECT_PREFIX + the
+  relative name, which must map to an ``internal`` location aliasing
+  MEDIA_ROOT.
+
+Otherwise the file object itself is returned through FileResponse, so WSGI
+servers that implement ``wsgi.file_wrapper`` with ``sendfile()`` (gunicorn,
+uWSGI) copy it to the socket without passing through Python.
+"""
+import mimetypes
+import os
+import re
+from pathlib import PurePath
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.utils._os import safe_join
+from django.views.decorators.http import require_safe
+
+from . import metrics
+from .models import PetReport
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class _BoundedReader:
+    """Read at most ``length`` bytes from an already-positioned file."""
+
+    def __init__(self, fileobj, length):
+        self.fileobj = fileobj
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.fileobj.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.fileobj.close()
+
+
+def media_etag(stat):
+    return '"%x-%x"' % (int(stat.st_mtime), stat.st_size)
+
+
+def parse_range(header, size):
+    """
+    Return ``(start, end)`` (inclusive) for a single ``bytes=`` range, None if
+    the header should be ignored, or ``False`` if it cannot be satisfied.
+    Multi-range requests are ignored and answered with the whole file.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        suffix = int(last)
+        if suffix == 0:
+            return False
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def _if_range_matches(request, etag, mtime):
+    if_range = request.META.get('HTTP_IF_RANGE')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        return if_range == etag
+    since = parse_http_date_safe(if_range)
+    return since is not None and int(mtime) <= since
+
+
+def media_access(request, name):
+    """
+    Return ``'public'``, ``'private'`` or None (not visible) for a media file.
+    Images of unapproved reports are private to the reporter and staff.
+    """
+    if not name.startswith(PetReport.pet_image.field.upload_to):
+        return 'public'
+    report = PetReport.objects.filter(pet_image=name).values('is_approved', 'reporter_id').first()
+    if report is None or report['is_approved']:
+        return 'public'
+    user = request.user
+    if user.is_authenticated and (user.is_staff or user.pk == report['reporter_id']):
+        return 'private'
+    return None
+
+
+@require_safe
+def serve_media(request, path):
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+    except Exception:
+        raise Http404
+    if not os.path.isfile(fullpath):
+        raise Http404
+    # The access check and the offload header use the normalised name, so
+    # pet_images//a.gif or x/../pet_images/a.gif cannot dodge the lookup.
+    name = PurePath(os.path.relpath(fullpath, settings.MEDIA_ROOT)).as_posix()
+    access = media_access(request, name)
+    if access is None:
+        # 404 rather than 403 so unapproved uploads are not discoverable.
+        raise Http404
+
+    stat = os.stat(fullpath)
+    etag = media_etag(stat)
+    cache_control = (
+        'private, no-cache' if access == 'private'
+        else 'public, max-age=%d' % settings.MEDIA_CACHE_MAX_AGE
+    )
+    validators = {'ETag': etag, 'Last-Modified': http_date(stat.st_mtime), 'Cache-Control': cache_control}
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(stat.st_mtime))
+    if not_modified is not None:
+        metrics.incr('media.not_modified')
+        for header, value in validators.items():
+            not_modified[header] = value
+        return not_modified
+
+    content_type, _ = mimetypes.guess_type(fullpath)
+    content_type = content_type or 'application/octet-stream'
+
+    offload = getattr(settings, 'MEDIA_SENDFILE_HEADER', None)
+    if offload:
+        # The front-end server handles Range itself from here on.
+        response = HttpResponse(content_type=content_type)
+        if offload == 'X-Accel-Redirect':
+            response[offload] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + name
+        else:
+            response[offload] = fullpath
+        metrics.incr('media.offloaded')
+    else:
+        response = _file_response(request, fullpath, stat, etag, content_type)
+        if response.status_code == 416:
+            return response
+    for header, value in validators.items():
+        response[header] = value
+    return response
+
+
+def _file_response(request, fullpath, stat, etag, content_type):
+    size = stat.st_size
+    byte_range = None
+    if _if_range_matches(request, etag, stat.st_mtime):
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+    if byte_range is False:
+        metrics.incr('media.range_unsatisfiable')
+        return HttpResponse(status=416, headers={'Content-Range': 'bytes */%d' % size})
+
+    fileobj = open(fullpath, 'rb')
+    if byte_range is None:
+        response = FileResponse(fileobj, content_type=content_type)
+        response['Content-Length'] = size
+        metrics.incr('media.served')
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        fileobj.seek(start)
+        # An open-ended range keeps the real file object so sendfile() still
+        # applies; a bounded one must stop early and is streamed in blocks.
+        body = fileobj if end == size - 1 else _BoundedReader(fileobj, length)
+        response = FileResponse(body, status=206, content_type=content_type)
+        response['Content-Length'] = length
+        response['Content-Range'] = 'bytes %d-%d/%d' % (start, end, size)
+        metrics.incr('media.partial')
+    response['Accept-Ranges'] = 'bytes'
+    return response
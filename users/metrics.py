@@ -0,0 +1,25 @@
+import threading
+from collections import defaultdict
+
+# Process-local counters. Each worker keeps its own numbers; the admin metrics
+# view reports what the worker serving the request has seen since it started.
+_lock = threading.Lock()
+_counters = defaultdict(int)
+
+
+def incr(name, amount=1):
+    with _lock:
+        _counters[name] += amount
+
+
+def snapshot(prefix=None):
+    with _lock:
+        items = dict(_counters)
+    if prefix:
+        items = {k: v for k, v in items.items() if k.startswith(prefix)}
+    return dict(sorted(items.items()))
+
+
+def reset():
+    with _lock:
+        _counters.clear()
@@ -0,0 +1,67 @@
+# Generated by Django 4.2 on 2026-10-18 23:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('users', '0011_message'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='petreport',
+            name='closed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ArchivedPetReport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(unique=True)),
+                ('report_type', models.CharField(choices=[('Lost', 'Lost pet'), ('Found', 'Found pet')], max_length=20)),
+                ('name', models.CharField(blank=True, max_length=100, null=True)),
+                ('age', models.PositiveIntegerField(blank=True, null=True)),
+                ('gender', models.CharField(choices=[('Male', 'Male'), ('Female', 'Female'), ('Unknown', 'Unknown')], default='Unknown', max_length=10)),
+                ('pet_type', models.CharField(max_length=50)),
+                ('breed', models.CharField(blank=True, max_length=100, null=True)),
+                ('color', models.CharField(max_length=50)),
+                ('pet_image', models.CharField(blank=True, max_length=100)),
+                ('location', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('Open', 'Open'), ('Pending Adoption', 'Pending Adoption'), ('Closed', 'Closed')], default='Closed', max_length=20)),
+                ('date_reported', models.DateTimeField()),
+                ('event_date', models.DateField(blank=True, null=True)),
+                ('closed_at', models.DateTimeField(blank=True, null=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('reporter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_pet_reports', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_id', models.BigIntegerField(unique=True)),
+                ('content', models.TextField()),
+                ('timestamp', models.DateTimeField()),
+                ('is_read', models.BooleanField(default=True)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('recipient', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('sender', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['timestamp'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedpetreport',
+            index=models.Index(fields=['reporter', 'date_reported'], name='users_archi_reporte_fd9f3a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedmessage',
+            index=models.Index(fields=['sender', 'recipient', 'timestamp'], name='users_archi_sender__98a8f8_idx'),
+        ),
+    ]
@@ -0,0 +1,84 @@
+# Generated by Django 4.2 on 2026-10-18 23:19
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_chat_load(apps, schema_editor):
+    User = apps.get_model('auth', 'User')
+    Message = apps.get_model('users', 'Message')
+    AdminLoad = apps.get_model('users', 'AdminLoad')
+    ChatAssignment = apps.get_model('users', 'ChatAssignment')
+
+    staff_ids = set(User.objects.filter(is_staff=True, is_active=True).values_list('pk', flat=True))
+    unread = dict(
+        Message.objects.filter(recipient_id__in=staff_ids, is_read=False)
+        .values_list('recipient_id')
+        .annotate(n=models.Count('pk'))
+    )
+
+    # The admin a user talked to most recently becomes their assigned admin.
+    latest = {}
+    pairs = (
+        Message.objects.filter(recipient_id__in=staff_ids)
+        .exclude(sender_id__in=staff_ids)
+        .values_list('sender_id', 'recipient_id')
+        .annotate(last_id=models.Max('pk'))
+    )
+    for user_id, admin_id, last_id in pairs:
+        if user_id not in latest or last_id > latest[user_id][1]:
+            latest[user_id] = (admin_id, last_id)
+    ChatAssignment.objects.bulk_create(
+        [ChatAssignment(user_id=user_id, admin_id=admin_id) for user_id, (admin_id, _) in latest.items()]
+    )
+
+    assigned = {}
+    for admin_id, _ in latest.values():
+        assigned[admin_id] = assigned.get(admin_id, 0) + 1
+    AdminLoad.objects.bulk_create(
+        [
+            AdminLoad(
+                admin_id=admin_id,
+                open_conversations=assigned.get(admin_id, 0),
+                unread_messages=unread.get(admin_id, 0),
+            )
+            for admin_id in staff_ids
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('users', '0012_archive_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatAssignment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assigned_at', models.DateTimeField(auto_now=True)),
+                ('admin', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assigned_chats', to=settings.AUTH_USER_MODEL)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='chat_assignment', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AdminLoad',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('is_available', models.BooleanField(default=True)),
+                ('open_conversations', models.PositiveIntegerField(default=0)),
+                ('unread_messages', models.PositiveIntegerField(default=0)),
+                ('last_assigned_at', models.DateTimeField(blank=True, null=True)),
+                ('admin', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='chat_load', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='adminload',
+            index=models.Index(fields=['is_available', 'open_conversations', 'unread_messages'], name='users_admin_is_avai_3ef27b_idx'),
+        ),
+        migrations.RunPython(backfill_chat_load, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 4.2 on 2026-10-18 23:20
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_read_state(apps, schema_editor):
+    Message = apps.get_model('users', 'Message')
+    Notification = apps.get_model('users', 'Notification')
+    ConversationReadState = apps.get_model('users', 'ConversationReadState')
+    UnreadCounter = apps.get_model('users', 'UnreadCounter')
+
+    read_upto = {
+        (r, s): last
+        for r, s, last in Message.objects.filter(is_read=True)
+        .values_list('recipient_id', 'sender_id')
+        .annotate(last=models.Max('pk'))
+    }
+    unread = {
+        (r, s): n
+        for r, s, n in Message.objects.filter(is_read=False)
+        .values_list('recipient_id', 'sender_id')
+        .annotate(n=models.Count('pk'))
+    }
+    ConversationReadState.objects.bulk_create(
+        [
+            ConversationReadState(
+                user_id=r, participant_id=s,
+                last_read_message_id=read_upto.get((r, s), 0),
+                unread_count=unread.get((r, s), 0),
+            )
+            for r, s in set(read_upto) | set(unread)
+        ],
+        batch_size=1000,
+    )
+
+    messages_by_user = {}
+    for (r, _), n in unread.items():
+        messages_by_user[r] = messages_by_user.get(r, 0) + n
+    notifications_by_user = dict(
+        Notification.objects.filter(is_read=False)
+        .values_list('recipient_id')
+        .annotate(n=models.Count('pk'))
+    )
+    UnreadCounter.objects.bulk_create(
+        [
+            UnreadCounter(
+                user_id=user_id,
+                unread_messages=messages_by_user.get(user_id, 0),
+                unread_notifications=notifications_by_user.get(user_id, 0),
+            )
+            for user_id in set(messages_by_user) | set(notifications_by_user)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('users', '0013_admin_chat_load'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='unread_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('unread_messages', models.PositiveIntegerField(default=0)),
+                ('unread_notifications', models.PositiveIntegerField(default=0)),
+                ('notifications_read_upto', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ConversationReadState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_read_message_id', models.BigIntegerField(default=0)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('participant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='conversation_states', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='conversationreadstate',
+            constraint=models.UniqueConstraint(fields=('user', 'participant'), name='unique_conversation_read_state'),
+        ),
+        migrations.RunPython(backfill_read_state, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2 on 2026-10-18 23:22
+
+import datetime
+
+from django.db import migrations, models
+
+
+def backfill_adoption_eligible_at(apps, schema_editor):
+    PetReport = apps.get_model('users', 'PetReport')
+    reports = PetReport.objects.filter(report_type='Found', is_approved=True, adoption_eligible_at__isnull=True)
+    for report in reports.only('pk', 'date_reported').iterator():
+        PetReport.objects.filter(pk=report.pk).update(
+            adoption_eligible_at=report.date_reported + datetime.timedelta(days=15)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0014_read_watermarks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobWatermark',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('value', models.DateTimeField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='petreport',
+            name='adoption_eligible_at',
+            field=models.DateTimeField(blank=True, help_text='When an approved Found report may be listed for adoption.', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='petreport',
+            index=models.Index(fields=['status', 'adoption_eligible_at'], name='users_petre_status_14bf4c_idx'),
+        ),
+        migrations.RunPython(backfill_adoption_eligible_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-18 23:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0015_adoption_eligible_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='petreport',
+            name='pet_image',
+            field=models.ImageField(db_index=True, upload_to='pet_images/'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-18 23:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0016_pet_image_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='petforadoption',
+            index=models.Index(fields=['status', 'date_listed', 'id'], name='users_petfo_status_718fb9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='petforadoption',
+            index=models.Index(fields=['status', 'age', 'id'], name='users_petfo_status_932361_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='petforadoption',
+            index=models.Index(fields=['status', 'name', 'id'], name='users_petfo_status_3e82fd_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 4.2 on 2026-10-18 23:34
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_approved_at(apps, schema_editor):
+    # The approval time was never recorded; the report date is the best guess.
+    PetReport = apps.get_model('users', 'PetReport')
+    PetReport.objects.filter(is_approved=True, approved_at__isnull=True).update(approved_at=F('date_reported'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0017_adoption_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='petreport',
+            name='approved_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_approved_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-18 23:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0018_petreport_approved_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['recipient', 'is_read', 'created_at'], name='users_notif_recipie_1b64c4_idx'),
+        ),
+    ]
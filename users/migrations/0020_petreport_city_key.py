@@ -0,0 +1,36 @@
+# Generated by Django 4.2 on 2026-10-18 23:37
+
+from django.db import migrations, models
+
+
+def backfill_city_key(apps, schema_editor):
+    # Same rule as users.models.normalize_city, frozen here.
+    PetReport = apps.get_model('users', 'PetReport')
+    for report in PetReport.objects.only('pk', 'location').iterator():
+        key = ' '.join((report.location or '').rsplit(',', 1)[-1].split()).lower()[:100]
+        if key:
+            PetReport.objects.filter(pk=report.pk).update(city_key=key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0019_notification_recipient_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='petreport',
+            name='city_key',
+            field=models.CharField(blank=True, default='', editable=False, help_text='normalize_city(location), kept in sync by save().', max_length=100),
+        ),
+        migrations.RunPython(backfill_city_key, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='petreport',
+            index=models.Index(fields=['city_key', 'status', 'is_approved', 'date_reported'], name='users_petre_city_ke_7800b0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='petreport',
+            index=models.Index(fields=['status', 'is_approved', 'date_reported'], name='users_petre_status_d733ae_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2 on 2026-10-18 23:39
+
+from django.db import migrations, models
+
+# auth.User is not ours to add Meta indexes to, so the email index used by the
+# manage-users prefix search is created directly.
+AUTH_USER_EMAIL_INDEX = models.Index(fields=['email'], name='auth_user_email_prefix_idx')
+
+
+def add_auth_user_email_index(apps, schema_editor):
+    schema_editor.add_index(apps.get_model('auth', 'User'), AUTH_USER_EMAIL_INDEX)
+
+
+def remove_auth_user_email_index(apps, schema_editor):
+    schema_editor.remove_index(apps.get_model('auth', 'User'), AUTH_USER_EMAIL_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0020_petreport_city_key'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='petreport',
+            index=models.Index(fields=['reporter', 'date_reported'], name='users_petre_reporte_19955b_idx'),
+        ),
+        migrations.RunPython(add_auth_user_email_index, remove_auth_user_email_index),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.2 on 2026-10-18 23:48
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+def backfill_changelog(apps, schema_editor):
+    # Existing rows become one change each so a client syncing from 0 gets everything.
+    ChangeLog = apps.get_model('users', 'ChangeLog')
+    now = django.utils.timezone.now()
+    sources = [
+        ('report', 'PetReport', ()),
+        ('adoption', 'PetForAdoption', ()),
+        ('message', 'Message', ('sender_id', 'recipient_id')),
+        ('notification', 'Notification', ('recipient_id',)),
+    ]
+    for kind, model_name, audience in sources:
+        model = apps.get_model('users', model_name)
+        batch = []
+        for row in model.objects.order_by('pk').values('pk', *audience).iterator():
+            for user_id in dict.fromkeys(row[attr] for attr in audience) or [None]:
+                batch.append(ChangeLog(kind=kind, object_id=row['pk'], user_id=user_id, changed_at=now))
+            if len(batch) >= 1000:
+                ChangeLog.objects.bulk_create(batch)
+                batch = []
+        ChangeLog.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('users', '0021_user_management_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangeLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('report', 'Pet report'), ('adoption', 'Pet for adoption'), ('message', 'Message'), ('notification', 'Notification')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('deleted', models.BooleanField(default=False)),
+                ('changed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('user', models.ForeignKey(blank=True, db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(backfill_changelog, migrations.RunPython.noop),
+    ]
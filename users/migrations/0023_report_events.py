@@ -0,0 +1,65 @@
+# Generated by Django 4.2 on 2026-10-18 23:51
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+def backfill_created_events(apps, schema_editor):
+    # One 'created' event per existing report, so replaying a consumer from 0 sees every report.
+    PetReport = apps.get_model('users', 'PetReport')
+    ReportEvent = apps.get_model('users', 'ReportEvent')
+    fields = ('report_type', 'status', 'is_approved')
+    batch = []
+    for row in PetReport.objects.order_by('pk').values('pk', 'city_key', *fields).iterator():
+        batch.append(ReportEvent(
+            event_type='created',
+            report_id=row['pk'],
+            payload={'before': None, 'after': {f: row[f] for f in fields}, 'city_key': row['city_key']},
+        ))
+        if len(batch) >= 1000:
+            ReportEvent.objects.bulk_create(batch)
+            batch = []
+    ReportEvent.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0022_changelog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsumerOffset',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('position', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReportEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('created', 'Created'), ('approved', 'Approved'), ('closed', 'Closed'), ('updated', 'Updated'), ('deleted', 'Deleted')], max_length=20)),
+                ('report_id', models.BigIntegerField()),
+                ('payload', models.JSONField(default=dict)),
+                ('occurred_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReportStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_type', models.CharField(choices=[('Lost', 'Lost pet'), ('Found', 'Found pet')], max_length=20)),
+                ('status', models.CharField(choices=[('Open', 'Open'), ('Pending Adoption', 'Pending Adoption'), ('Closed', 'Closed')], max_length=20)),
+                ('is_approved', models.BooleanField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='reportstat',
+            constraint=models.UniqueConstraint(fields=('report_type', 'status', 'is_approved'), name='unique_report_stat'),
+        ),
+        migrations.RunPython(backfill_created_events, migrations.RunPython.noop),
+    ]
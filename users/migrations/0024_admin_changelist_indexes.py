@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-18 23:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0023_report_events'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['timestamp', 'id'], name='users_messa_timesta_47bf80_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['created_at', 'id'], name='users_notif_created_7e54f2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='petreport',
+            index=models.Index(fields=['date_reported', 'id'], name='users_petre_date_re_9f015c_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2 on 2026-10-19 00:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('users', '0025_notification_digests'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='petreport',
+            name='claim_expires_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='petreport',
+            name='claimed_by',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='petreport',
+            name='priority',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='petreport',
+            index=models.Index(fields=['is_approved', '-priority', '-date_reported', '-id'], name='users_petre_is_appr_fc1a80_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2 on 2026-10-19 00:17
+
+import datetime
+
+from django.db import migrations
+from django.db.models import F
+
+
+def backfill_approval_dates(apps, schema_editor):
+    # Reports approved through the admin or the API never had these set.
+    PetReport = apps.get_model('users', 'PetReport')
+    PetReport.objects.filter(is_approved=True, approved_at__isnull=True).update(approved_at=F('date_reported'))
+    reports = PetReport.objects.filter(report_type='Found', is_approved=True, adoption_eligible_at__isnull=True)
+    for report in reports.only('pk', 'date_reported', 'approved_at').iterator():
+        PetReport.objects.filter(pk=report.pk).update(
+            adoption_eligible_at=max(report.date_reported + datetime.timedelta(days=15), report.approved_at)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0026_moderation_triage'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_approval_dates, migrations.RunPython.noop),
+    ]
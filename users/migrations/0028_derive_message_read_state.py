@@ -0,0 +1,21 @@
+# Generated by Django 4.2 on 2026-10-19 00:20
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0027_backfill_approval_dates'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='archivedmessage',
+            name='is_read',
+        ),
+        migrations.RemoveField(
+            model_name='message',
+            name='is_read',
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-19 00:21
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0028_derive_message_read_state'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='unreadcounter',
+            name='notifications_read_upto',
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2 on 2026-10-19 00:23
+
+from django.db import migrations, models
+
+
+def backfill_city_key(apps, schema_editor):
+    # Same rule as users.models.normalize_city, frozen here.
+    Profile = apps.get_model('users', 'Profile')
+    for profile in Profile.objects.exclude(city__isnull=True).exclude(city='').only('pk', 'city').iterator():
+        key = ' '.join(profile.city.rsplit(',', 1)[-1].split()).lower()[:100]
+        if key:
+            Profile.objects.filter(pk=profile.pk).update(city_key=key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0029_remove_notifications_read_upto'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='city_key',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, help_text='normalize_city(city), kept in sync by save().', max_length=100),
+        ),
+        migrations.RunPython(backfill_city_key, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2 on 2026-10-19 00:25
+
+from django.db import migrations, models
+from django.db.models import F, Max
+
+
+def number_existing_rows(apps, schema_editor):
+    # Existing rows keep their id as their number, so clients' since values
+    # and consumer offsets stay valid; new numbers continue above them.
+    LogSequence = apps.get_model('users', 'LogSequence')
+    for model_name, label in (('ChangeLog', 'users.changelog'), ('ReportEvent', 'users.reportevent')):
+        model = apps.get_model('users', model_name)
+        model.objects.update(seq=F('pk'))
+        top = model.objects.aggregate(top=Max('pk'))['top'] or 0
+        LogSequence.objects.update_or_create(name=label, defaults={'value': top})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0030_profile_city_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LogSequence',
+            fields=[
+                ('name', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='changelog',
+            name='seq',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='reportevent',
+            name='seq',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, unique=True),
+        ),
+        migrations.RunPython(number_existing_rows, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2 on 2026-10-19 01:12
+
+from django.db import migrations, models
+
+
+def backfill_open_conversations(apps, schema_editor):
+    # An existing assignment is open while its admin has unread messages from the user.
+    AdminLoad = apps.get_model('users', 'AdminLoad')
+    ChatAssignment = apps.get_model('users', 'ChatAssignment')
+    ConversationReadState = apps.get_model('users', 'ConversationReadState')
+    unread = ConversationReadState.objects.filter(
+        user_id=models.OuterRef('admin_id'), participant_id=models.OuterRef('user_id'), unread_count__gt=0,
+    )
+    ChatAssignment.objects.exclude(models.Exists(unread)).update(is_open=False)
+    open_counts = dict(
+        ChatAssignment.objects.filter(is_open=True).values_list('admin_id').annotate(n=models.Count('pk'))
+    )
+    for load in AdminLoad.objects.only('pk', 'admin_id').iterator():
+        AdminLoad.objects.filter(pk=load.pk).update(open_conversations=open_counts.get(load.admin_id, 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0031_commit_ordered_log_sequence'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='chatassignment',
+            name='is_open',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.RunPython(backfill_open_conversations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 00:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0032_chat_assignment_is_open'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='reportevent',
+            name='event_type',
+            field=models.CharField(choices=[('created', 'Created'), ('approved', 'Approved'), ('closed', 'Closed'), ('updated', 'Updated'), ('deleted', 'Deleted'), ('archived', 'Archived')], max_length=20),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-19 00:52
+
+from django.db import migrations
+from django.db.models import Max
+
+
+def start_at_latest_event(apps, schema_editor):
+    # Approvals before this point were notified by the approving request; start after them.
+    ConsumerOffset = apps.get_model('users', 'ConsumerOffset')
+    ReportEvent = apps.get_model('users', 'ReportEvent')
+    position = ReportEvent.objects.aggregate(top=Max('seq'))['top'] or 0
+    ConsumerOffset.objects.get_or_create(name='city_notifications', defaults={'position': position})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0033_report_event_archived'),
+    ]
+
+    operations = [
+        migrations.RunPython(start_at_latest_event, migrations.RunPython.noop),
+    ]
@@ -1,22 +1,121 @@
+from django.conf import settings
 from django.db import models
+from django.db.models import Exists, ExpressionWrapper, F, OuterRef, Value
+from django.db.models.functions import Coalesce, NullIf
+from django.db.models.query import ModelIterable
 from django.contrib.auth.models import User
 from django.utils import timezone
 import datetime
 
+def normalize_city(value):
+    """
+    Locality key for a city name or a free-text location: the last
+    comma-separated part, lowercased with whitespace collapsed, so
+    "12 Main St,  Springfield " and "springfield" both give "springfield".
+    """
+    if not value:
+        return ''
+    return ' '.join(value.rsplit(',', 1)[-1].split()).lower()[:100]
+
 class Profile(models.Model):
     ROLE_CHOICES = (('admin', 'Admin'), ('user', 'User'))
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='user')
     age = models.PositiveIntegerField(null=True, blank=True)
     city = models.CharField(max_length=100, null=True, blank=True)
+    city_key = models.CharField(max_length=100, blank=True, default='', editable=False, db_index=True, help_text="normalize_city(city), kept in sync by save().")
     phone_number = models.CharField(max_length=20, null=True, blank=True)
     profile_picture = models.ImageField(default='profile_pics/default.png', upload_to='profile_pics/', null=True, blank=True)
     def __str__(self): return f"{self.user.username} Profile"
 
-class PetReport(models.Model):
+    def save(self, *args, **kwargs):
+        self.city_key = normalize_city(self.city)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'city' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | {'city_key'}
+        super().save(*args, **kwargs)
+
+# -----------------------
+# Card projections
+# -----------------------
+class DeferredFieldLoad(Exception):
+    """A card instance lazily loaded a column that cards() did not select (DEBUG only)."""
+
+
+class CardIterable(ModelIterable):
+    """Marks instances loaded by a cards() queryset."""
+
+    def __iter__(self):
+        for obj in super().__iter__():
+            obj._from_cards = True
+            yield obj
+
+
+class CardModelMixin:
+    """
+    List pages load models through ``cards()``, which selects only the small
+    columns the cards show. With DEBUG on, touching any other column on such
+    an instance raises instead of silently running one query per row.
+    """
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        if fields and settings.DEBUG and getattr(self, '_from_cards', False):
+            raise DeferredFieldLoad(
+                f"{type(self).__name__}.{', '.join(fields)} is not loaded by cards(); "
+                f"add it to {type(self).__name__}.CARD_FIELDS or load the full row."
+            )
+        return super().refresh_from_db(using=using, fields=fields, **kwargs)
+
+
+def _cards(queryset, fields):
+    clone = queryset.only(*fields)
+    clone._iterable_class = CardIterable
+    return clone
+
+
+class PetReportQuerySet(models.QuerySet):
+    def cards(self, reporter=False, extra=()):
+        """
+        CARD_FIELDS only, plus ``display_name`` (the name, or the pet type when
+        there is none). ``reporter=True`` joins the reporter's username;
+        ``extra`` names further columns a particular list needs.
+        """
+        fields = [*PetReport.CARD_FIELDS, *extra]
+        queryset = self
+        if reporter:
+            queryset = queryset.select_related('reporter')
+            fields.append('reporter__username')
+        return _cards(queryset, fields).annotate(
+            display_name=Coalesce(NullIf('name', Value('')), 'pet_type')
+        )
+
+    def due_for_adoption(self, now=None):
+        """Approved, open Found reports whose holding period has ended."""
+        return self.filter(
+            report_type='Found',
+            status='Open',
+            is_approved=True,
+            adoption_eligible_at__lte=now or timezone.now(),
+        )
+
+    def with_days_remaining(self, now=None):
+        """
+        Annotates ``adoption_time_left`` (eligible_at - now) so that
+        days_remaining_for_adoption does not recompute it per row.
+        """
+        now = Value(now or timezone.now(), output_field=models.DateTimeField())
+        return self.annotate(
+            adoption_time_left=ExpressionWrapper(
+                F('adoption_eligible_at') - now, output_field=models.DurationField()
+            )
+        )
+
+
+class PetReport(CardModelMixin, models.Model):
     REPORT_TYPE_CHOICES = (('Lost', 'Lost pet'), ('Found', 'Found pet'))
     STATUS_CHOICES = (('Open', 'Open'),('Pending Adoption', 'Pending Adoption'), ('Closed', 'Closed'))
     GENDER_CHOICES = (('Male', 'Male'), ('Female', 'Female'), ('Unknown', 'Unknown')) # Add gender choices here
+    ADOPTION_HOLD = datetime.timedelta(days=15)
 
     report_type = models.CharField(max_length=20, choices=REPORT_TYPE_CHOICES)
     reporter = models.ForeignKey(User, on_delete=models.CASCADE, related_name='pet_reports')
@@ -31,13 +130,98 @@ class PetReport(models.Model):
 
     health_information = models.TextField(blank=True, null=True, help_text="Any known health issues or required medication (Lost pet report).")
     injury = models.TextField(blank=True, null=True, help_text="Describe any injuries observed on the pet (Found pet report).")
-    pet_image = models.ImageField(upload_to='pet_images/')
+    pet_image = models.ImageField(upload_to='pet_images/', db_index=True)
     location = models.CharField(max_length=255, help_text="Area where the pet was lost or found.")
+    city_key = models.CharField(max_length=100, blank=True, default='', editable=False, help_text="normalize_city(location), kept in sync by save().")
     contact_info = models.CharField(max_length=255, help_text="Your phone or email for contact.")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Open')
     date_reported = models.DateTimeField(default=timezone.now, editable=True)
     event_date = models.DateField(null=True, blank=True, help_text="Date the pet was lost or found.")
     is_approved = models.BooleanField(default=False)
+    approved_at = models.DateTimeField(null=True, blank=True)
+    closed_at = models.DateTimeField(null=True, blank=True)
+    adoption_eligible_at = models.DateTimeField(null=True, blank=True, help_text="When an approved Found report may be listed for adoption.")
+    # Moderation triage (users/triage.py): scored on submission, worked under claim leases.
+    priority = models.PositiveSmallIntegerField(default=0, editable=False)
+    claimed_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, editable=False, related_name='+')
+    claim_expires_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    # Columns whose changes are lifecycle events (see users/events.py).
+    LIFECYCLE_FIELDS = ('report_type', 'status', 'is_approved')
+    # What list cards and tables show; no free-text or contact columns.
+    CARD_FIELDS = (
+        'id', 'report_type', 'reporter_id', 'name', 'age', 'pet_type', 'breed', 'color', 'pet_image',
+        'location', 'status', 'date_reported', 'event_date', 'is_approved', 'adoption_eligible_at',
+    )
+
+    objects = PetReportQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'adoption_eligible_at']),
+            # Dashboard feeds: per city, and the global fallback.
+            models.Index(fields=['city_key', 'status', 'is_approved', 'date_reported']),
+            models.Index(fields=['status', 'is_approved', 'date_reported']),
+            models.Index(fields=['reporter', 'date_reported']),
+            # Admin changelist: date drill-down and keyset pages.
+            models.Index(fields=['date_reported', 'id']),
+            # Moderation queue, highest priority first.
+            models.Index(fields=['is_approved', '-priority', '-date_reported', '-id']),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The lifecycle state as loaded, compared on save to emit events.
+        if all(name in field_names for name in cls.LIFECYCLE_FIELDS):
+            instance._loaded_lifecycle = instance.lifecycle_state()
+        return instance
+
+    def lifecycle_state(self):
+        return {name: getattr(self, name) for name in self.LIFECYCLE_FIELDS}
+
+    def save(self, *args, **kwargs):
+        # Remembered so a signal can invalidate the city the report moved out of.
+        self._previous_city_key = self.city_key
+        self.city_key = normalize_city(self.location)
+        derived = self._derive_approval_dates()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            extra = derived | ({'city_key'} if 'location' in update_fields else set())
+            kwargs['update_fields'] = set(update_fields) | extra
+        super().save(*args, **kwargs)
+
+    def _derive_approval_dates(self):
+        """
+        Keeps approved_at and adoption_eligible_at in step with is_approved,
+        however the report was approved (moderation view, admin, API): the
+        due date is the end of the 15-day hold, or the approval time if the
+        hold already ran out. Returns the names of the fields it changed.
+        """
+        changed = set()
+        if not self.is_approved:
+            if self.approved_at is not None or self.adoption_eligible_at is not None:
+                self.approved_at = self.adoption_eligible_at = None
+                changed = {'approved_at', 'adoption_eligible_at'}
+            return changed
+        if self.approved_at is None:
+            self.approved_at = timezone.now()
+            changed.add('approved_at')
+        if self.report_type == 'Found' and self.adoption_eligible_at is None:
+            self.adoption_eligible_at = max(self.date_reported + self.ADOPTION_HOLD, self.approved_at)
+            changed.add('adoption_eligible_at')
+        return changed
+
+    def approve(self):
+        """Marks the report approved now; the adoption due date follows from it."""
+        self.is_approved = True
+        self.approved_at = self.adoption_eligible_at = None
+        self.claimed_by = self.claim_expires_at = None
+        self._derive_approval_dates()
+
+    def close(self):
+        self.status = 'Closed'
+        self.closed_at = timezone.now()
 
     @property
     def days_remaining_for_adoption(self):
@@ -47,9 +231,10 @@ class PetReport(models.Model):
         if self.report_type != 'Found' or self.status != 'Open':
             return None # Not applicable
 
-        # 15-day holding period
-        deadline = self.date_reported + datetime.timedelta(days=15)
-        remaining_delta = deadline - timezone.now()
+        remaining_delta = getattr(self, 'adoption_time_left', None)
+        if remaining_delta is None:
+            deadline = self.adoption_eligible_at or (self.date_reported + self.ADOPTION_HOLD)
+            remaining_delta = deadline - timezone.now()
         
         if remaining_delta.total_seconds() <= 0:
             return 0
@@ -61,7 +246,13 @@ class PetReport(models.Model):
         pet_name = self.name if self.name else "Unnamed Pet"
         return f"{self.get_report_type_display()}:  ({self.pet_type}) by {self.reporter.username}"
 
-class PetForAdoption(models.Model):
+class PetForAdoptionQuerySet(models.QuerySet):
+    def cards(self):
+        """CARD_FIELDS only; the description stays unloaded."""
+        return _cards(self, PetForAdoption.CARD_FIELDS)
+
+
+class PetForAdoption(CardModelMixin, models.Model):
     GENDER_CHOICES = (('Male', 'Male'), ('Female', 'Female'), ('Unknown', 'Unknown'))
     ADOPTION_STATUS_CHOICES = (('Available', 'Available'), ('Pending', 'Adoption Pending'), ('Adopted', 'Adopted'))
     name = models.CharField(max_length=100)
@@ -75,6 +266,20 @@ class PetForAdoption(models.Model):
     lister = models.ForeignKey(User, on_delete=models.CASCADE, related_name='adoption_listings')
     status = models.CharField(max_length=10, choices=ADOPTION_STATUS_CHOICES, default='Available')
     date_listed = models.DateTimeField(auto_now_add=True)
+
+    # Everything the adoption cards, facets and sort keys use.
+    CARD_FIELDS = ('id', 'name', 'age', 'gender', 'pet_type', 'breed', 'color', 'image', 'status', 'date_listed')
+
+    objects = PetForAdoptionQuerySet.as_manager()
+
+    class Meta:
+        # One per sort order offered by users/search.py, for keyset paging.
+        indexes = [
+            models.Index(fields=['status', 'date_listed', 'id']),
+            models.Index(fields=['status', 'age', 'id']),
+            models.Index(fields=['status', 'name', 'id']),
+        ]
+
     def __str__(self): return f"{self.name} ({self.pet_type}) - {self.get_status_display()}"
 
 
@@ -83,18 +288,290 @@ class Notification(models.Model):
     pet_report = models.ForeignKey(PetReport, on_delete=models.CASCADE, null=True, blank=True)
     message = models.TextField()
     is_read = models.BooleanField(default=False)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add: compacted digests keep the time of their newest item.
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
+    # A digest (users/digests.py) lists up to DIGEST_MAX_ITEMS of the events it
+    # stands for in ``items``; ``item_count`` is how many it covers in total.
+    items = models.JSONField(default=list, blank=True)
+    item_count = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['recipient', 'is_read', 'created_at']),
+            # Admin changelist: date drill-down and keyset pages.
+            models.Index(fields=['created_at', 'id']),
+        ]
+
     def __str__(self): return f"Notification for {self.recipient.username}: {self.message[:30]}..."
+
+
+class PendingNotification(models.Model):
+    """One notification event waiting to be delivered in a digest (users/digests.py)."""
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    pet_report = models.ForeignKey(PetReport, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    message = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['created_at']), models.Index(fields=['recipient', 'id'])]
+
+    def __str__(self):
+        return f"Pending for user {self.recipient_id}: {self.message[:30]}"
     
+class MessageQuerySet(models.QuerySet):
+    def with_read_state(self):
+        """
+        Annotates ``is_read``: whether the message is at or below the
+        recipient's read watermark for the sender (see users/unread.py).
+        """
+        return self.annotate(is_read=Exists(
+            ConversationReadState.objects.filter(
+                user=OuterRef('recipient'), participant=OuterRef('sender'), last_read_message_id__gte=OuterRef('pk'),
+            )
+        ))
+
+
 class Message(models.Model):
     sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sent_messages')
     recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='received_messages')
     content = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
-    is_read = models.BooleanField(default=False)
+
+    objects = MessageQuerySet.as_manager()
 
     class Meta:
         ordering = ['timestamp']
+        # Admin changelist: date drill-down and keyset pages.
+        indexes = [models.Index(fields=['timestamp', 'id'])]
+
+    def __str__(self):
+        return f"From {self.sender.username} to {self.recipient.username}: {self.content[:50]}"
+
+
+# -----------------------
+# Admin chat routing
+# -----------------------
+class AdminLoad(models.Model):
+    """
+    Running chat load for one staff member, kept up to date by
+    users/chat_routing.py so new chats can be routed without counting messages.
+    """
+    admin = models.OneToOneField(User, on_delete=models.CASCADE, related_name='chat_load')
+    is_available = models.BooleanField(default=True)
+    open_conversations = models.PositiveIntegerField(default=0)
+    unread_messages = models.PositiveIntegerField(default=0)
+    last_assigned_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['is_available', 'open_conversations', 'unread_messages'])]
+
+    def __str__(self):
+        return f"{self.admin.username}: {self.open_conversations} open, {self.unread_messages} unread"
+
+
+class ChatAssignment(models.Model):
+    """
+    The admin currently handling a user's chat. One row per user. The chat is
+    open from assignment, or the user's next message, until the admin has
+    read it out; AdminLoad.open_conversations counts the open ones.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='chat_assignment')
+    admin = models.ForeignKey(User, on_delete=models.CASCADE, related_name='assigned_chats')
+    assigned_at = models.DateTimeField(auto_now=True)
+    is_open = models.BooleanField(default=True)
+
+    def __str__(self):
+        return f"{self.user.username} -> {self.admin.username}"
+
+
+# -----------------------
+# Read state
+# -----------------------
+class ConversationReadState(models.Model):
+    """
+    Read watermark for one side of a conversation: the id of the last message
+    from ``participant`` that ``user`` has seen, plus the unread count after it.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='conversation_states')
+    participant = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    last_read_message_id = models.BigIntegerField(default=0)
+    unread_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'participant'], name='unique_conversation_read_state'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} <- {self.participant.username}: {self.unread_count} unread"
+
+
+class UnreadCounter(models.Model):
+    """
+    Denormalised unread totals for one user, read by the nav badge. Message
+    read state lives on ConversationReadState; notifications carry their own
+    is_read flag.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='unread_counter')
+    unread_messages = models.PositiveIntegerField(default=0)
+    unread_notifications = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.unread_messages} messages, {self.unread_notifications} notifications"
+
+
+# -----------------------
+# Background jobs
+# -----------------------
+class JobWatermark(models.Model):
+    """High-water mark for an incremental background job."""
+    name = models.CharField(max_length=100, primary_key=True)
+    value = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name} @ {self.value}"
+
+
+class LogSequence(models.Model):
+    """The last sequence number handed out for an append-only log (users/sequencing.py)."""
+    name = models.CharField(max_length=100, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} @ {self.value}"
+
+
+class ReportEvent(models.Model):
+    """
+    Append-only log of report lifecycle changes, written in the same
+    transaction as the change (see users/events.py). ``seq``, numbered in
+    commit order once the change commits (users/sequencing.py), is the offset
+    consumers track. ``report_id`` is not a foreign key so events outlive the
+    report.
+    """
+    EVENT_TYPES = [
+        ('created', 'Created'),
+        ('approved', 'Approved'),
+        ('closed', 'Closed'),
+        ('updated', 'Updated'),
+        ('deleted', 'Deleted'),
+        ('archived', 'Archived'),
+    ]
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPES)
+    report_id = models.BigIntegerField()
+    # {'before': state or None, 'after': state or None, 'city_key': ...}; state is lifecycle_state().
+    payload = models.JSONField(default=dict)
+    occurred_at = models.DateTimeField(default=timezone.now)
+    seq = models.BigIntegerField(null=True, blank=True, unique=True, editable=False)
+
+    def __str__(self):
+        return f"#{self.pk}: report {self.report_id} {self.event_type}"
+
+
+class ConsumerOffset(models.Model):
+    """The last ReportEvent seq an event consumer has processed."""
+    name = models.CharField(max_length=100, primary_key=True)
+    position = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.position}"
+
+
+class ReportStat(models.Model):
+    """Report counts per lifecycle state, maintained by the report_stats consumer."""
+    report_type = models.CharField(max_length=20, choices=PetReport.REPORT_TYPE_CHOICES)
+    status = models.CharField(max_length=20, choices=PetReport.STATUS_CHOICES)
+    is_approved = models.BooleanField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['report_type', 'status', 'is_approved'], name='unique_report_stat'),
+        ]
+
+    def __str__(self):
+        return f"{self.report_type}/{self.status}/{'approved' if self.is_approved else 'pending'}: {self.count}"
+
+
+# -----------------------
+# Cold storage
+# -----------------------
+class ArchivedMessage(models.Model):
+    """
+    A Message moved out of the hot table by the archive_old_records command.
+    """
+    original_id = models.BigIntegerField(unique=True)
+    sender = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    recipient = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    content = models.TextField()
+    timestamp = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['timestamp']
+        indexes = [models.Index(fields=['sender', 'recipient', 'timestamp'])]
+
+    def __str__(self):
+        return f"Archived message {self.original_id}"
+
+
+class ArchivedPetReport(models.Model):
+    """
+    Compact copy of a closed PetReport. Free-text columns (health information,
+    injury, contact details) are not carried over.
+    """
+    original_id = models.BigIntegerField(unique=True)
+    report_type = models.CharField(max_length=20, choices=PetReport.REPORT_TYPE_CHOICES)
+    reporter = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_pet_reports')
+    name = models.CharField(max_length=100, blank=True, null=True)
+    age = models.PositiveIntegerField(null=True, blank=True)
+    gender = models.CharField(max_length=10, choices=PetReport.GENDER_CHOICES, default='Unknown')
+    pet_type = models.CharField(max_length=50)
+    breed = models.CharField(max_length=100, blank=True, null=True)
+    color = models.CharField(max_length=50)
+    pet_image = models.CharField(max_length=100, blank=True)
+    location = models.CharField(max_length=255)
+    status = models.CharField(max_length=20, choices=PetReport.STATUS_CHOICES, default='Closed')
+    date_reported = models.DateTimeField()
+    event_date = models.DateField(null=True, blank=True)
+    closed_at = models.DateTimeField(null=True, blank=True)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['reporter', 'date_reported'])]
+
+    def __str__(self):
+        return f"Archived {self.get_report_type_display()} ({self.pet_type}) #{self.original_id}"
+
+
+# -----------------------
+# Change tracking
+# -----------------------
+class ChangeLog(models.Model):
+    """
+    One row per write to a synced model (see users/sync.py). ``seq``,
+    numbered in commit order once the write commits (users/sequencing.py), is
+    the change sequence number clients sync from. ``user`` is the only user who
+    may see the change, or null for public rows. It has no database
+    constraint so tombstones can still be written while a user is being
+    deleted.
+    """
+    KIND_CHOICES = [
+        ('report', 'Pet report'),
+        ('adoption', 'Pet for adoption'),
+        ('message', 'Message'),
+        ('notification', 'Notification'),
+    ]
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    user = models.ForeignKey(
+        User, null=True, blank=True, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+'
+    )
+    deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField(default=timezone.now)
+    seq = models.BigIntegerField(null=True, blank=True, unique=True, editable=False)
 
     def __str__(self):
-        return f"From {self.sender.username} to {self.recipient.username}: {self.content[:50]}"
\ No newline at end of file
+        action = 'deleted' if self.deleted else 'changed'
+        return f"#{self.pk}: {self.kind} {self.object_id} {action}"
@@ -0,0 +1,118 @@
+"""
+Creating and reading notifications in bulk.
+
+post_save is not sent for bulk_create, so fan_out keeps UnreadCounter in step
+itself: it creates any missing counter rows, then runs one UPDATE per batch
+to add one to each recipient's count. It also records the new rows for delta
+sync, as do the bulk UPDATEs that mark notifications read.
+
+With NOTIFICATION_DIGEST_WINDOW set, fan_out only stages the events as
+PendingNotification rows; users/digests.py delivers them per recipient.
+
+City notifications for approved reports are sent by the ``city_notifications``
+event consumer (users/events.py), not by the approving request. The fan-out
+commits with the consumer's offset, so a failure part way through rolls back
+and the batch is retried whole. Approvals older than CITY_NOTIFY_MAX_AGE when
+they are consumed (after an outage or a replay) are skipped as stale.
+"""
+import datetime
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from . import events, metrics, sync, unread
+from .models import Notification, PendingNotification, PetReport, UnreadCounter
+
+BATCH_SIZE = 1000
+CITY_CONSUMER = 'city_notifications'
+CITY_NOTIFY_MAX_AGE = datetime.timedelta(days=1)
+
+
+def add_unread(recipient_ids):
+    """Adds one to each recipient's unread notification count, creating missing counters."""
+    UnreadCounter.objects.bulk_create(
+        [UnreadCounter(user_id=pk) for pk in recipient_ids], ignore_conflicts=True
+    )
+    UnreadCounter.objects.filter(user_id__in=recipient_ids).update(
+        unread_notifications=F('unread_notifications') + 1
+    )
+
+
+def fan_out(recipient_ids, message, pet_report=None, batch_size=BATCH_SIZE):
+    """
+    Creates one notification per recipient, or stages one event per recipient
+    when digests are on. Returns how many recipients there were.
+    """
+    recipient_ids = list(dict.fromkeys(recipient_ids))
+    digest = bool(settings.NOTIFICATION_DIGEST_WINDOW)
+    for start in range(0, len(recipient_ids), batch_size):
+        batch = recipient_ids[start:start + batch_size]
+        if digest:
+            PendingNotification.objects.bulk_create(
+                [PendingNotification(recipient_id=pk, pet_report=pet_report, message=message) for pk in batch]
+            )
+            continue
+        with transaction.atomic():
+            created = Notification.objects.bulk_create(
+                [Notification(recipient_id=pk, pet_report=pet_report, message=message) for pk in batch]
+            )
+            if all(n.pk is not None for n in created):
+                sync.record(created)
+            else:
+                # MySQL does not return ids from bulk inserts; read back each recipient's newest match.
+                sync.record_rows('notification', [
+                    (row['last'], [row['recipient_id']])
+                    for row in Notification.objects.filter(
+                        recipient_id__in=batch, pet_report=pet_report, message=message
+                    ).values('recipient_id').annotate(last=Max('pk')).order_by()
+                ])
+            add_unread(batch)
+    metrics.incr('notifications.staged' if digest else 'notifications.fanned_out', len(recipient_ids))
+    return len(recipient_ids)
+
+
+def notify_report_city(report):
+    """Tells active users whose profile city_key matches the report's, as the dashboard does."""
+    if not report.city_key:
+        return 0
+    recipients = (
+        User.objects.filter(is_active=True, profile__city_key=report.city_key)
+        .exclude(pk=report.reporter_id)
+        .values_list('pk', flat=True)
+    )
+    if report.report_type == 'Found':
+        message = f"A {report.pet_type.lower()} was found near {report.location}. Is it yours?"
+    else:
+        message = f"A {report.pet_type.lower()} went missing near {report.location}. Please keep an eye out."
+    return fan_out(recipients, message, pet_report=report)
+
+
+def notify_approved_reports(batch):
+    """Event consumer: runs notify_report_city for each freshly approved report."""
+    cutoff = timezone.now() - CITY_NOTIFY_MAX_AGE
+    report_ids = [e.report_id for e in batch if e.event_type == 'approved' and e.occurred_at >= cutoff]
+    for report in PetReport.objects.filter(pk__in=report_ids, is_approved=True).order_by('pk'):
+        notify_report_city(report)
+
+
+def mark_read(user, ids=None):
+    """
+    Marks the user's notifications read with a single UPDATE: all of them, or
+    only those in ``ids``. Returns how many changed.
+    """
+    if ids is None:
+        return unread.mark_all_notifications_read(user)
+    with transaction.atomic():
+        queryset = Notification.objects.filter(recipient=user, pk__in=ids, is_read=False)
+        changed_ids = list(queryset.values_list('pk', flat=True))
+        updated = queryset.update(is_read=True)
+        if updated:
+            unread.record_notifications_read(user.pk, updated)
+            sync.record_rows('notification', [(pk, [user.pk]) for pk in changed_ids])
+    return updated
+
+
+events.register(CITY_CONSUMER, notify_approved_reports)
@@ -0,0 +1,102 @@
+"""
+Keyset ("seek") pagination.
+
+Instead of OFFSET, each page continues from the sort key of the last row of
+the previous page, so page N costs the same as page 1 given an index on the
+ordering columns. Cursors are opaque URL-safe strings holding that key.
+The ordering must end in a unique column (normally ``id``).
+"""
+import base64
+import json
+from collections import namedtuple
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+
+KeysetPage = namedtuple('KeysetPage', 'object_list next_cursor has_next')
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class KeysetPaginator:
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset
+        self.ordering = list(ordering)
+        self.per_page = per_page
+        self.fields = [
+            (name.lstrip('-'), name.startswith('-')) for name in self.ordering
+        ]
+
+    def _encode(self, obj):
+        values = []
+        for name, _ in self.fields:
+            value = getattr(obj, name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+    def _decode(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(raw, list) or len(raw) != len(self.fields):
+                raise ValueError
+            model = self.queryset.model
+            values = [model._meta.get_field(name).to_python(value) for (name, _), value in zip(self.fields, raw)]
+            # Ordering columns are never null, and a null would not compare in _after().
+            if any(value is None for value in values):
+                raise ValueError
+            return values
+        except (ValueError, TypeError, ValidationError) as exc:
+            raise InvalidCursor(cursor) from exc
+
+    def _after(self, values):
+        # (a, b, id) > (x, y, z) expanded so each column can have its own direction:
+        # a > x OR (a = x AND b > y) OR (a = x AND b = y AND id > z)
+        condition = Q()
+        for i, (name, descending) in enumerate(self.fields):
+            step = Q(**{f"{name}__{'lt' if descending else 'gt'}": values[i]})
+            for j, (prev_name, _) in enumerate(self.fields[:i]):
+                step &= Q(**{prev_name: values[j]})
+            condition |= step
+        return condition
+
+    def page(self, cursor=None):
+        queryset = self.queryset.order_by(*self.ordering)
+        if cursor:
+            queryset = queryset.filter(self._after(self._decode(cursor)))
+        return self._page(list(queryset[:self.per_page + 1]))
+
+    def _page(self, rows):
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        next_cursor = self._encode(rows[-1]) if has_next else None
+        return KeysetPage(rows, next_cursor, has_next)
+
+
+class UnionKeysetPaginator(KeysetPaginator):
+    """
+    Keyset pages over the UNION ALL of several querysets of one model, for OR
+    conditions that no single index serves. Each branch gets the keyset
+    condition (and its own ORDER BY/LIMIT where the database allows it in a
+    compound query) so each can use its own index. Branches must not overlap.
+    """
+    def __init__(self, querysets, ordering, per_page):
+        self.querysets = list(querysets)
+        super().__init__(self.querysets[0], ordering, per_page)
+
+    def page(self, cursor=None):
+        after = self._after(self._decode(cursor)) if cursor else None
+        branches = []
+        for queryset in self.querysets:
+            if after is not None:
+                queryset = queryset.filter(after)
+            if connections[queryset.db].features.supports_slicing_ordering_in_compound:
+                queryset = queryset.order_by(*self.ordering)[:self.per_page + 1]
+            else:
+                queryset = queryset.order_by()
+            branches.append(queryset)
+        combined = branches[0].union(*branches[1:], all=True).order_by(*self.ordering)
+        return self._page(list(combined[:self.per_page + 1]))
@@ -0,0 +1,80 @@
+"""
+Report counts per (report_type, status, is_approved), kept by the
+``report_stats`` event consumer instead of COUNT(*) scans. Each event moves
+one report from its ``before`` bucket to its ``after`` bucket.
+
+The counts need a running consumer: the scheduler's ``event_consumers`` job
+(SCHEDULER_ENABLED, every EVENT_CONSUMER_INTERVAL seconds) or
+``manage.py consume_events`` from cron. Pages never apply events themselves.
+While the consumer keeps up, counts can trail the reports by one run. When
+events older than two intervals are still unapplied, nothing is consuming
+them, and counter() falls back to indexed COUNTs on PetReport so pages stay
+exact.
+"""
+import datetime
+from collections import Counter
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import events
+from .models import ConsumerOffset, PetReport, ReportEvent, ReportStat
+
+NAME = 'report_stats'
+
+
+def _bucket(state):
+    return (state['report_type'], state['status'], state['is_approved'])
+
+
+def apply_events(batch):
+    deltas = Counter()
+    for event in batch:
+        if event.payload.get('before'):
+            deltas[_bucket(event.payload['before'])] -= 1
+        if event.payload.get('after'):
+            deltas[_bucket(event.payload['after'])] += 1
+    for (report_type, status, is_approved), delta in deltas.items():
+        if not delta:
+            continue
+        lookup = {'report_type': report_type, 'status': status, 'is_approved': is_approved}
+        if ReportStat.objects.filter(**lookup).update(count=F('count') + delta):
+            continue
+        try:
+            with transaction.atomic():
+                ReportStat.objects.create(**lookup, count=delta)
+        except IntegrityError:
+            ReportStat.objects.filter(**lookup).update(count=F('count') + delta)
+
+
+def reset():
+    ReportStat.objects.all().delete()
+
+
+def counts(**filters):
+    """Sum of the stored counts in every bucket matching ``filters``."""
+    return sum(ReportStat.objects.filter(**filters).values_list('count', flat=True))
+
+
+def is_current(now=None):
+    """False when events have waited more than two consumer intervals, i.e. no consumer is running."""
+    position = ConsumerOffset.objects.filter(name=NAME).values_list('position', flat=True).first() or 0
+    cutoff = (now or timezone.now()) - datetime.timedelta(seconds=2 * settings.EVENT_CONSUMER_INTERVAL)
+    return not ReportEvent.objects.filter(seq__gt=position, occurred_at__lt=cutoff).exists()
+
+
+def _live_count(**filters):
+    return PetReport.objects.filter(**filters).count()
+
+
+def counter(now=None):
+    """
+    ``count(**filters)`` for one page: the stored counts while the consumer
+    is current, live COUNTs while it is not.
+    """
+    return counts if is_current(now) else _live_count
+
+
+events.register(NAME, apply_events, reset)
@@ -0,0 +1,74 @@
+"""
+A minimal in-process periodic scheduler.
+
+Jobs run on one daemon thread per process. It is started from the WSGI/ASGI
+entry points (never from management commands) when SCHEDULER_ENABLED is set.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicScheduler:
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def register(self, name, interval, func):
+        with self._lock:
+            self._jobs[name] = {'interval': interval, 'func': func, 'next_run': 0.0}
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name='petrescue-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            with self._lock:
+                due = [job for job in self._jobs.values() if job['next_run'] <= now]
+            for job in due:
+                job['next_run'] = now + job['interval']
+                self._run_job(job['func'])
+            self._stop.wait(1.0)
+
+    def _run_job(self, func):
+        close_old_connections()
+        try:
+            func()
+        except Exception:
+            logger.exception("Scheduled job %s failed", getattr(func, '__name__', func))
+        finally:
+            close_old_connections()
+
+
+scheduler = PeriodicScheduler()
+
+
+def start_if_enabled():
+    if not getattr(settings, 'SCHEDULER_ENABLED', False):
+        return
+    from .adoption import run_due_adoptions
+    from .digests import run_digests
+    from .events import run_all as run_event_consumers
+    from .sequencing import stamp_all
+
+    scheduler.register('adoption_due', settings.ADOPTION_SCHEDULER_INTERVAL, run_due_adoptions)
+    scheduler.register('log_sequencer', settings.LOG_SEQUENCER_INTERVAL, stamp_all)
+    scheduler.register('event_consumers', settings.EVENT_CONSUMER_INTERVAL, run_event_consumers)
+    if settings.NOTIFICATION_DIGEST_WINDOW:
+        scheduler.register('notification_digests', settings.NOTIFICATION_DIGEST_INTERVAL, run_digests)
+    scheduler.start()
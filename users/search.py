@@ -0,0 +1,148 @@
+"""
+Faceted search over pets available for adoption.
+
+Facet counts come from one grouped query: available pets grouped by every
+facet column at once. Each facet's counts are then derived in Python by
+applying the selections of all *other* facets, so choosing "Dog" still shows
+how many cats there are. The grouped rows are cached until a PetForAdoption
+row changes (see users/signals.py).
+"""
+from collections import Counter, namedtuple
+
+from django.core.cache import cache
+from django.db.models import Case, CharField, Count, Q, Value, When
+
+from .models import PetForAdoption
+from .pagination import InvalidCursor, KeysetPaginator
+
+FACET_ROWS_CACHE_KEY = 'adoption:facet_rows'
+FACET_ROWS_TIMEOUT = 600
+PAGE_SIZE = 12
+
+# (key, label, min age, max age) in years; None means unbounded.
+AGE_BUCKETS = (
+    ('baby', 'Under 1 year', 0, 0),
+    ('young', '1-2 years', 1, 2),
+    ('adult', '3-7 years', 3, 7),
+    ('senior', '8+ years', 8, None),
+)
+
+FACETS = (
+    ('pet_type', 'Type'),
+    ('gender', 'Gender'),
+    ('age_bucket', 'Age'),
+    ('breed', 'Breed'),
+    ('color', 'Color'),
+)
+
+SORTS = {
+    'newest': ('Newest first', ('-date_listed', '-id')),
+    'oldest': ('Oldest first', ('date_listed', 'id')),
+    'youngest': ('Youngest first', ('age', 'id')),
+    'oldest_age': ('Oldest pets first', ('-age', '-id')),
+    'name': ('Name A-Z', ('name', 'id')),
+}
+DEFAULT_SORT = 'newest'
+
+FacetOption = namedtuple('FacetOption', 'value label count selected')
+Facet = namedtuple('Facet', 'field label options')
+SearchResult = namedtuple('SearchResult', 'pets facets selected sort sorts next_cursor')
+
+
+def age_bucket_expression():
+    whens = []
+    for key, _, low, high in AGE_BUCKETS:
+        condition = Q(age__gte=low) if high is None else Q(age__gte=low, age__lte=high)
+        whens.append(When(condition, then=Value(key)))
+    return Case(*whens, output_field=CharField())
+
+
+def available_pets():
+    return PetForAdoption.objects.filter(status='Available').annotate(age_bucket=age_bucket_expression())
+
+
+def facet_rows():
+    """Counts of available pets per distinct combination of facet values."""
+    rows = cache.get(FACET_ROWS_CACHE_KEY)
+    if rows is None:
+        fields = [field for field, _ in FACETS]
+        rows = list(available_pets().values(*fields).annotate(n=Count('id')).order_by())
+        cache.set(FACET_ROWS_CACHE_KEY, rows, FACET_ROWS_TIMEOUT)
+    return rows
+
+
+def invalidate_facets():
+    cache.delete(FACET_ROWS_CACHE_KEY)
+
+
+def parse_selection(params):
+    """Selected values per facet from a QueryDict (``?pet_type=Dog&pet_type=Cat``)."""
+    selected = {}
+    for field, _ in FACETS:
+        values = [v for v in params.getlist(field) if v]
+        if values:
+            selected[field] = set(values)
+    return selected
+
+
+def _option_label(field, value):
+    if field == 'age_bucket':
+        return dict((key, label) for key, label, _, _ in AGE_BUCKETS).get(value, value)
+    if field == 'gender':
+        return dict(PetForAdoption.GENDER_CHOICES).get(value, value)
+    return value
+
+
+def compute_facets(rows, selected):
+    counts = {field: Counter() for field, _ in FACETS}
+    for row in rows:
+        mismatched = [field for field, values in selected.items() if row[field] not in values]
+        if len(mismatched) > 1:
+            continue
+        for field in counts:
+            # A row counts towards a facet if it matches every other facet's selection.
+            if not mismatched or mismatched == [field]:
+                if row[field]:
+                    counts[field][row[field]] += row['n']
+
+    facets = []
+    for field, label in FACETS:
+        chosen = selected.get(field, set())
+        if field == 'age_bucket':
+            order = [key for key, _, _, _ in AGE_BUCKETS]
+            values = [key for key in order if counts[field][key] or key in chosen]
+        else:
+            values = sorted(set(counts[field]) | chosen)
+        options = [
+            FacetOption(value, _option_label(field, value), counts[field][value], value in chosen)
+            for value in values
+        ]
+        facets.append(Facet(field, label, options))
+    return facets
+
+
+def search_pets(params, per_page=PAGE_SIZE, cards=False):
+    """``cards`` loads only PetForAdoption.CARD_FIELDS, for the HTML listing."""
+    selected = parse_selection(params)
+    sort = params.get('sort') if params.get('sort') in SORTS else DEFAULT_SORT
+
+    queryset = available_pets()
+    if cards:
+        queryset = queryset.cards()
+    for field, values in selected.items():
+        queryset = queryset.filter(**{f'{field}__in': values})
+
+    paginator = KeysetPaginator(queryset, SORTS[sort][1], per_page)
+    try:
+        page = paginator.page(params.get('cursor'))
+    except InvalidCursor:
+        page = paginator.page()
+
+    return SearchResult(
+        pets=page.object_list,
+        facets=compute_facets(facet_rows(), selected),
+        selected=selected,
+        sort=sort,
+        sorts=[(key, label) for key, (label, _) in SORTS.items()],
+        next_cursor=page.next_cursor,
+    )
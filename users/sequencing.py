@@ -0,0 +1,69 @@
+"""
+Commit-ordered sequence numbers for the append-only logs: ChangeLog (read by
+/api/sync/) and ReportEvent (read by the event consumers).
+
+Auto-increment ids are handed out at INSERT, so a transaction that stays open
+can commit an id below one a reader has already moved past, and that row is
+never read. Log rows are therefore written with ``seq`` null and numbered
+after they commit. stamp() locks the log's LogSequence row, numbers every
+committed row that has no number yet in id order, and commits. Only one
+stamp() per log runs at a time and it only sees committed rows, so sequence
+order is commit order: a reader following ``seq`` never finds a lower number
+appearing behind it, however long a writer's transaction ran.
+
+Writers call stamp_on_commit(). The event consumers and the scheduler's
+``log_sequencer`` job stamp too, which numbers rows whose writer stopped
+between its commit and the callback.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import ChangeLog, LogSequence, ReportEvent
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+LOGS = (ChangeLog, ReportEvent)
+
+
+def _stamp_batch(model, batch_size):
+    with transaction.atomic():
+        LogSequence.objects.get_or_create(name=model._meta.label_lower)
+        sequence = LogSequence.objects.select_for_update().get(name=model._meta.label_lower)
+        ids = list(model.objects.filter(seq__isnull=True).order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return 0
+        # seq = id + offset keeps id order within the batch and starts above every number handed out.
+        offset = sequence.value + 1 - ids[0]
+        model.objects.filter(pk__in=ids).update(seq=F('pk') + offset)
+        sequence.value = ids[-1] + offset
+        sequence.save(update_fields=['value'])
+    return len(ids)
+
+
+def stamp(model, batch_size=BATCH_SIZE):
+    """Numbers the committed, unnumbered rows of one log. Returns how many."""
+    if not model.objects.filter(seq__isnull=True).exists():
+        return 0
+    total = 0
+    while True:
+        count = _stamp_batch(model, batch_size)
+        total += count
+        if count < batch_size:
+            return total
+
+
+def stamp_on_commit(model):
+    """Numbers the log's new rows once the current transaction commits."""
+    transaction.on_commit(lambda: stamp(model), robust=True)
+
+
+def stamp_all():
+    """Scheduler job: numbers rows of every log that missed their on-commit stamp."""
+    for model in LOGS:
+        try:
+            stamp(model)
+        except Exception:
+            logger.exception("Stamping %s failed", model._meta.label)
@@ -17,7 +17,10 @@ class PetReportSerializer(serializers.ModelSerializer):
     reporter = UserSerializer(read_only=True)
     class Meta:
         model = PetReport
-        fields = '__all__'
+        # Moderation state stays internal.
+        exclude = ('priority', 'claimed_by', 'claim_expires_at')
+        # Derived from is_approved by PetReport.save().
+        read_only_fields = ('approved_at', 'adoption_eligible_at')
 
 class PetForAdoptionSerializer(serializers.ModelSerializer):
     class Meta:
@@ -33,6 +36,8 @@ class NotificationSerializer(serializers.ModelSerializer):
 class MessageSerializer(serializers.ModelSerializer):
     sender = UserSerializer(read_only=True)
     recipient = UserSerializer(read_only=True)
+    # From Message.objects.with_read_state().
+    is_read = serializers.BooleanField(read_only=True)
     class Meta:
         model = Message
         fields = '__all__'
\ No newline at end of file
@@ -0,0 +1,113 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import archive, chat_routing, events, feeds, locality, search, sync, triage, unread
+from .auth_cache import invalidate_user
+from .models import ChatAssignment, Message, Notification, PetForAdoption, PetReport, Profile
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Profile)
+def invalidate_cached_profile_owner(sender, instance, **kwargs):
+    invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def sync_admin_load(sender, instance, update_fields=None, **kwargs):
+    if update_fields and not {'is_staff', 'is_active'} & set(update_fields):
+        return
+    chat_routing.sync_admin_load(instance)
+
+
+@receiver(post_save, sender=Message)
+def track_unread_message(sender, instance, created, **kwargs):
+    if created:
+        unread.record_new_message(instance)
+        chat_routing.record_incoming_message(instance)
+
+
+@receiver(post_save, sender=Notification)
+def track_unread_notification(sender, instance, created, **kwargs):
+    if created:
+        unread.record_new_notifications(instance.recipient_id)
+
+
+@receiver(post_delete, sender=ChatAssignment)
+def release_assignment(sender, instance, **kwargs):
+    if instance.is_open:
+        chat_routing.record_assignment_removed(instance.admin_id)
+
+
+@receiver([post_save, post_delete], sender=PetForAdoption)
+def invalidate_adoption_facets(sender, instance, **kwargs):
+    search.invalidate_facets()
+
+
+@receiver(post_save, sender=PetForAdoption)
+def update_adoption_feed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: feeds.update_adoption_listing(instance))
+
+
+@receiver(post_save, sender=PetReport)
+def update_found_feed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        transaction.on_commit(lambda: feeds.update_found_report(instance))
+
+
+@receiver(post_delete, sender=PetReport)
+@receiver(post_delete, sender=PetForAdoption)
+def withdraw_from_feed(sender, instance, **kwargs):
+    # The pk is cleared once the delete finishes, so the entry id is taken now.
+    kind, entry_id = ('found', f'found-{instance.pk}') if sender is PetReport else ('adoptions', f'adoption-{instance.pk}')
+    transaction.on_commit(lambda: feeds.withdraw(kind, entry_id))
+
+
+@receiver(pre_save, sender=PetReport)
+def score_submitted_report(sender, instance, raw=False, **kwargs):
+    if not raw and instance._state.adding and not instance.is_approved:
+        instance.priority = triage.priority(instance)
+
+
+@receiver([post_save, post_delete], sender=PetReport)
+def invalidate_city_dashboard(sender, instance, **kwargs):
+    locality.invalidate_city(instance.city_key, getattr(instance, '_previous_city_key', ''))
+
+
+@receiver(post_save, sender=PetReport)
+@receiver(post_save, sender=PetForAdoption)
+@receiver(post_save, sender=Message)
+@receiver(post_save, sender=Notification)
+def record_sync_change(sender, instance, raw=False, **kwargs):
+    if not raw:
+        sync.record([instance])
+
+
+@receiver(post_delete, sender=PetReport)
+@receiver(post_delete, sender=PetForAdoption)
+@receiver(post_delete, sender=Message)
+@receiver(post_delete, sender=Notification)
+def record_sync_tombstone(sender, instance, **kwargs):
+    # Archived rows are still shown from the archive tables; clients keep them.
+    if not archive.archiving():
+        sync.record([instance], deleted=True)
+
+
+@receiver(post_save, sender=PetReport)
+def record_report_lifecycle(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        events.report_saved(instance, created)
+
+
+@receiver(post_delete, sender=PetReport)
+def record_report_deleted(sender, instance, **kwargs):
+    if archive.archiving():
+        events.report_archived(instance)
+    else:
+        events.report_deleted(instance)
@@ -0,0 +1,117 @@
+"""
+Change tracking and delta sync (GET /api/sync/?since=<seq>).
+
+Every write to PetReport, PetForAdoption, Message and Notification appends a
+ChangeLog row in the same transaction. Deletes append a tombstone. Model
+saves and deletes are recorded by signals (users/signals.py); code that
+writes with bulk_create() or QuerySet.update() calls record()/record_rows()
+itself. Reports and listings are public. A message is visible to its sender
+and recipient, and a notification only to its recipient.
+
+A client keeps the last ``next_since`` it was given and asks for the changes
+after it. Within a page, several changes to one object collapse into its
+current state. Sequence numbers are given out in commit order after the
+write commits (users/sequencing.py), so a change committed by a long
+transaction still lands after every cursor already handed out; rows not
+numbered yet are simply served on a later request.
+"""
+from collections import namedtuple
+
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from . import metrics, sequencing
+from .models import ChangeLog, Message, Notification, PetForAdoption, PetReport
+
+PAGE_SIZE = 200
+MAX_PAGE_SIZE = 1000
+
+# kind -> (model, serializer path, select_related, audience attributes; () means public,
+# and optionally the name of the manager method that builds the base queryset).
+# Serializers are imported on first use: the signals import this module at
+# startup, and that should not pull in DRF.
+SyncedModel = namedtuple('SyncedModel', 'model serializer related audience queryset', defaults=('all',))
+SYNCED = {
+    'report': SyncedModel(PetReport, 'users.serializers.PetReportSerializer', ('reporter',), ()),
+    'adoption': SyncedModel(PetForAdoption, 'users.serializers.PetForAdoptionSerializer', (), ()),
+    'message': SyncedModel(
+        Message, 'users.serializers.MessageSerializer', ('sender', 'recipient'), ('sender_id', 'recipient_id'),
+        'with_read_state',
+    ),
+    'notification': SyncedModel(Notification, 'users.serializers.NotificationSerializer', (), ('recipient_id',)),
+}
+KIND_FOR_MODEL = {synced.model: kind for kind, synced in SYNCED.items()}
+
+SyncPage = namedtuple('SyncPage', 'changes deleted next_since has_more')
+
+
+def record_rows(kind, rows, deleted=False):
+    """
+    Appends changes for ``rows`` of ``(object_id, audience)`` pairs, where
+    audience is a sequence of user ids, or empty for public objects.
+    """
+    now = timezone.now()
+    entries = [
+        ChangeLog(kind=kind, object_id=object_id, user_id=user_id, deleted=deleted, changed_at=now)
+        for object_id, audience in rows
+        for user_id in (dict.fromkeys(audience) or [None])
+    ]
+    ChangeLog.objects.bulk_create(entries)
+    sequencing.stamp_on_commit(ChangeLog)
+    metrics.incr('sync.changes_recorded', len(entries))
+
+
+def record(instances, deleted=False):
+    """Appends changes for model instances of one synced model."""
+    instances = list(instances)
+    if not instances:
+        return
+    kind = KIND_FOR_MODEL[type(instances[0])]
+    audience = SYNCED[kind].audience
+    record_rows(
+        kind, [(obj.pk, [getattr(obj, attr) for attr in audience]) for obj in instances], deleted=deleted
+    )
+
+
+def changes_since(user, since=0, limit=PAGE_SIZE, kinds=None, context=None):
+    """
+    The next page of changes visible to ``user`` after sequence ``since``.
+    ``context`` is passed to the serializers (for absolute image URLs).
+    """
+    visible = Q(user__isnull=True)
+    if user.is_authenticated:
+        visible |= Q(user_id=user.pk)
+    queryset = ChangeLog.objects.filter(visible, seq__gt=since)
+    if kinds:
+        queryset = queryset.filter(kind__in=kinds)
+    rows = list(queryset.order_by('seq').values_list('seq', 'kind', 'object_id', 'deleted')[:limit + 1])
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    # Last change per object wins; dicts keep first-insertion order, so pop first.
+    latest = {}
+    for seq, kind, object_id, deleted in rows:
+        latest.pop((kind, object_id), None)
+        latest[(kind, object_id)] = (seq, deleted)
+
+    payloads = {}
+    for kind, synced in SYNCED.items():
+        ids = [object_id for (k, object_id), (_, deleted) in latest.items() if k == kind and not deleted]
+        if not ids:
+            continue
+        objects = getattr(synced.model.objects, synced.queryset)().select_related(*synced.related).filter(pk__in=ids)
+        serializer_class = import_string(synced.serializer)
+        for data in serializer_class(objects, many=True, context=context or {}).data:
+            payloads[(kind, data['id'])] = data
+
+    changes, tombstones = [], []
+    for (kind, object_id), (seq, deleted) in latest.items():
+        data = payloads.get((kind, object_id))
+        if deleted or data is None:
+            # Gone since the change was logged; its tombstone may be on a later page.
+            tombstones.append({'seq': seq, 'type': kind, 'id': object_id})
+        else:
+            changes.append({'seq': seq, 'type': kind, 'id': object_id, 'data': data})
+    metrics.incr('sync.pages_served')
+    return SyncPage(changes, tombstones, rows[-1][0] if rows else since, has_more)
@@ -0,0 +1,59 @@
+import json
+from urllib.parse import quote, urljoin
+
+from django import template
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from petrescue.assets import VARIANTS_MANIFEST, width_variant_name
+
+register = template.Library()
+
+_variants = None
+
+
+def _load_variants():
+    global _variants
+    if _variants is None:
+        try:
+            with staticfiles_storage.open(VARIANTS_MANIFEST) as fh:
+                _variants = json.load(fh)
+        except (OSError, ValueError):
+            _variants = {}
+    return _variants
+
+
+@register.simple_tag
+def responsive_image(name, alt='', sizes='100vw', **attrs):
+    """
+    Renders a <picture> with AVIF/WebP sources and width-based srcsets for a
+    static image processed by collectstatic, or a plain <img> when no
+    variants exist (e.g. in development).
+    """
+    extra = format_html_join('', ' {}="{}"', attrs.items())
+    info = _load_variants().get(name)
+    if not info:
+        return format_html('<img src="{}" alt="{}"{}>', static(name), alt, extra)
+
+    url = static(name)
+    hashed = staticfiles_storage.stored_name(name)
+
+    def srcset(suffix=''):
+        # Variants are not in the hash manifest; their names derive from the
+        # already-hashed original, so they are joined onto STATIC_URL as-is.
+        entries = []
+        for w in info['widths']:
+            variant = hashed if w == info['width'] else width_variant_name(hashed, w)
+            entries.append(f"{urljoin(staticfiles_storage.base_url, quote(variant + suffix))} {w}w")
+        return ', '.join(entries)
+
+    sources = format_html_join(
+        '',
+        '<source type="image/{}" srcset="{}" sizes="{}">',
+        ((fmt, srcset('.' + fmt), sizes) for fmt in info['formats']),
+    )
+    return format_html(
+        '<picture>{}<img src="{}" srcset="{}" sizes="{}" alt="{}"{}></picture>',
+        sources, url, srcset(), sizes, alt, extra,
+    )
@@ -0,0 +1,650 @@
+import datetime
+import os
+import tempfile
+import threading
+import time
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import OperationalError, connection, connections, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import viewsets
+from rest_framework.test import APIRequestFactory
+
+from petrescue import routers
+
+from .auth_cache import get_cached_user, invalidate_user
+from .pagination import InvalidCursor, KeysetPaginator
+from . import (
+    adoption_queue, api_views, archive, chat_routing, events, fast_read, home_api, metrics, notifications,
+    report_stats, sequencing, sync, throttling, triage, unread,
+)
+from .models import AdminLoad, ChangeLog, Message, Notification, PetForAdoption, PetReport, Profile, ReportEvent
+from .serializers import NotificationSerializer, PetReportSerializer
+
+
+class CachedAuthenticationTests(TestCase):
+    password = 'Pw1!aaaa'
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('alice', 'alice@example.com', self.password)
+        Profile.objects.create(user=self.user, city='Springfield')
+        self.assertTrue(self.client.login(username='alice', password=self.password))
+
+    def _request(self):
+        request = RequestFactory().get('/dashboard/')
+        request.session = self.client.session
+        return request
+
+    def test_warm_cache_costs_no_queries(self):
+        self.assertEqual(get_cached_user(self._request()), self.user)
+        request = self._request()
+        with self.assertNumQueries(0):
+            user = get_cached_user(request)
+            self.assertEqual(user.profile.city, 'Springfield')
+
+    def test_saved_queries_count_the_profile_only_when_read(self):
+        get_cached_user(self._request())
+        metrics.reset()
+        get_cached_user(self._request())
+        self.assertEqual(metrics.snapshot('auth_cache.queries_saved'), {'auth_cache.queries_saved': 1})
+        user = get_cached_user(self._request())
+        user.profile
+        user.profile
+        self.assertEqual(metrics.snapshot('auth_cache.queries_saved'), {'auth_cache.queries_saved': 3})
+
+    def test_deactivated_user_is_logged_out(self):
+        self.assertEqual(self.client.get('/dashboard/').status_code, 200)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/dashboard/').status_code, 302)
+        self.assertFalse(get_cached_user(self._request()).is_authenticated)
+
+    def test_bulk_deactivation_with_invalidation(self):
+        self.assertEqual(self.client.get('/dashboard/').status_code, 200)
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        invalidate_user(self.user.pk)
+        self.assertEqual(self.client.get('/dashboard/').status_code, 302)
+
+
+@override_settings(
+    THROTTLE_RATES={'login': (3, 60)},
+    THROTTLE_LOCKOUT={'threshold': 2, 'base_seconds': 2, 'max_seconds': 5},
+)
+class ThrottlingTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 6000.0  # the start of a 60s window
+        patcher = mock.patch.object(throttling, 'time', mock.Mock(time=lambda: self.now))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _check(self, ip='10.0.0.1', username=None):
+        request = RequestFactory().post('/login/', REMOTE_ADDR=ip)
+        return throttling.check(request, 'login', username)
+
+    def test_ip_budget_slides_across_windows(self):
+        self.assertEqual([self._check().allowed for _ in range(4)], [True, True, True, False])
+        self.assertEqual(self._check(), throttling.Decision(False, 60, 'ip'))
+        self.assertTrue(self._check(ip='10.0.0.2').allowed)
+        # Half way into the next window the previous one still counts for half.
+        self.now += 90
+        self.assertEqual([self._check().allowed for _ in range(3)], [True, True, False])
+
+    def test_lockout_doubles_with_each_failure(self):
+        throttling.record_failure('login', 'Alice')
+        self.assertTrue(self._check(username='alice').allowed)
+        throttling.record_failure('login', 'alice')
+        self.assertEqual(self._check(username=' ALICE '), throttling.Decision(False, 3, 'user'))
+        throttling.record_failure('login', 'alice')
+        self.assertEqual(self._check(username='alice').retry_after, 5)
+        throttling.record_failure('login', 'alice')
+        self.assertEqual(self._check(username='alice').retry_after, 6)
+        self.now += 5
+        self.assertTrue(self._check(username='alice').allowed)
+        throttling.record_success('login', 'alice')
+        throttling.record_failure('login', 'alice')
+        self.assertTrue(self._check(username='alice').allowed)
+
+    def test_cache_errors_fall_back_to_the_local_store(self):
+        metrics.reset()
+        with mock.patch.object(throttling, '_shared', side_effect=ConnectionError), \
+                mock.patch.object(throttling, '_local', throttling.LocalStore()):
+            self.assertEqual([self._check().allowed for _ in range(4)], [True, True, True, False])
+        self.assertGreater(metrics.snapshot('throttle.cache_errors')['throttle.cache_errors'], 0)
+
+
+class ApprovalDatesTests(TestCase):
+    def setUp(self):
+        self.reporter = User.objects.create_user('bob', 'bob@example.com', 'Pw1!aaaa')
+
+    def _report(self, **kwargs):
+        return PetReport.objects.create(
+            report_type='Found', reporter=self.reporter, pet_type='Dog', color='Brown',
+            pet_image='pet_images/a.gif', location='Springfield', contact_info='bob@example.com', **kwargs
+        )
+
+    def test_flipping_is_approved_sets_the_dates(self):
+        report = self._report(date_reported=timezone.now() - datetime.timedelta(days=30))
+        self.assertIsNone(report.adoption_eligible_at)
+        report.is_approved = True
+        report.save(update_fields=['is_approved'])
+        report.refresh_from_db()
+        self.assertIsNotNone(report.approved_at)
+        self.assertEqual(report.adoption_eligible_at, report.approved_at)
+
+    def test_hold_runs_from_the_report_date(self):
+        report = self._report()
+        report.is_approved = True
+        report.save()
+        self.assertEqual(report.adoption_eligible_at, report.date_reported + PetReport.ADOPTION_HOLD)
+
+
+class FastListTests(TestCase):
+    def setUp(self):
+        self.lister = User.objects.create_user('dana', 'dana@example.com', 'Pw1!aaaa')
+        reported = datetime.datetime(2024, 3, 10, 23, 30, 15, 123456, tzinfo=datetime.timezone.utc)
+        for image in ('pet_images/rex.jpg', '', 'pet_images/two words.jpg'):
+            PetReport.objects.create(
+                report_type='Found', reporter=self.lister, pet_type='Dog', color='Brown', pet_image=image,
+                location='Springfield', contact_info='dana@example.com', date_reported=reported,
+                event_date=reported.date(),
+            )
+            PetForAdoption.objects.create(
+                name='Rex', age=3, pet_type='Dog', color='Brown', image=image.replace('pet_', 'adoption_'),
+                description='Calm.', lister=self.lister,
+            )
+        Notification.objects.create(recipient=self.lister, message='No report')
+        Notification.objects.create(recipient=self.lister, message='A report', pet_report=PetReport.objects.first())
+
+    def _render(self, view_class):
+        response = view_class.as_view({'get': 'list'})(APIRequestFactory().get('/api/'))
+        return response.render().content
+
+    def _assert_identical(self, view_class):
+        fast = self._render(view_class)
+        with mock.patch.object(fast_read, 'RowEncoder', side_effect=fast_read.UnsupportedSerializer):
+            regular = self._render(view_class)
+        self.assertEqual(fast, regular)
+        return fast
+
+    @override_settings(TIME_ZONE='America/New_York')
+    def test_fast_lists_render_the_same_bytes(self):
+        body = self._assert_identical(api_views.PetReportViewSet)
+        self.assertIn(b'"pet_image":null', body)
+        self.assertIn(b'"date_reported":"2024-03-10T19:30:15.123456-04:00"', body)
+        self._assert_identical(api_views.PetForAdoptionViewSet)
+
+    def test_missing_related_object_renders_as_null(self):
+        # PetReport.reporter is required, so a nullable nested relation stands in for it.
+        class NotificationReportSerializer(NotificationSerializer):
+            pet_report = PetReportSerializer(read_only=True)
+
+        class NotificationViewSet(fast_read.FastListMixin, viewsets.ReadOnlyModelViewSet):
+            queryset = Notification.objects.order_by('pk')
+            serializer_class = NotificationReportSerializer
+
+        body = self._assert_identical(NotificationViewSet)
+        self.assertIn(b'"pet_report":null', body)
+
+
+class KeysetCursorTests(TestCase):
+    def test_null_and_malformed_values_are_invalid(self):
+        paginator = KeysetPaginator(PetReport.objects.all(), ('-date_reported', '-id'), 10)
+        for cursor in ('W251bGwsIG51bGxd', 'WyJub3QgYSBkYXRlIiwgMV0', 'not-base64!'):
+            with self.assertRaises(InvalidCursor):
+                paginator.page(cursor)
+
+    def test_null_cursor_on_public_pages(self):
+        response = self.client.get('/pets/', {'cursor': 'W251bGwsIG51bGxd'})
+        self.assertEqual(response.status_code, 200)
+
+
+class FeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.reporter = User.objects.create_user('carol', 'carol@example.com', 'Pw1!aaaa')
+        self.report = PetReport.objects.create(
+            report_type='Found', reporter=self.reporter, pet_type='Cat', color='Grey',
+            pet_image='pet_images/a.gif', location='Springfield', contact_info='carol@example.com',
+        )
+
+    def _ids(self):
+        return [item['id'] for item in self.client.get('/feeds/found.json').json()['items']]
+
+    def test_invalid_since_is_a_bad_request(self):
+        for kind in ('found', 'adoptions'):
+            response = self.client.get(f'/feeds/{kind}.json', {'since': '2024-13-45T00:00:00'})
+            self.assertEqual(response.status_code, 400)
+
+    def test_entries_follow_the_report_lifecycle(self):
+        self.assertEqual(self._ids(), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.report.approve()
+            self.report.save()
+        self.assertEqual(self._ids(), [f'found-{self.report.pk}'])
+        self.assertEqual(self.client.get(f'/found/{self.report.pk}/').status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.report.close()
+            self.report.save()
+        self.assertEqual(self._ids(), [])
+        self.assertEqual(self.client.get(f'/found/{self.report.pk}/').status_code, 404)
+
+    def test_deleted_report_leaves_the_feed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.report.approve()
+            self.report.save()
+        self.assertEqual(len(self._ids()), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.report.delete()
+        self.assertEqual(self._ids(), [])
+
+
+class MessageReadStateTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('dave', 'dave@example.com', 'Pw1!aaaa')
+        self.admin = User.objects.create_user('erin', 'erin@example.com', 'Pw1!aaaa', is_staff=True)
+
+    def _read_state(self):
+        return dict(Message.objects.with_read_state().values_list('pk', 'is_read'))
+
+    def test_read_state_follows_the_watermark(self):
+        first = Message.objects.create(sender=self.admin, recipient=self.user, content='Hello')
+        second = Message.objects.create(sender=self.admin, recipient=self.user, content='Again')
+        reply = Message.objects.create(sender=self.user, recipient=self.admin, content='Hi')
+        self.assertEqual(self._read_state(), {first.pk: False, second.pk: False, reply.pk: False})
+
+        unread.mark_conversation_read(self.user, self.admin, first.pk)
+        self.assertEqual(self._read_state(), {first.pk: True, second.pk: False, reply.pk: False})
+
+        sequencing.stamp_all()
+        page = sync.changes_since(self.user, kinds=['message'])
+        self.assertEqual({c['id']: c['data']['is_read'] for c in page.changes},
+                         {first.pk: True, second.pk: False, reply.pk: False})
+
+    def test_message_after_the_read_point_stays_unread(self):
+        first = Message.objects.create(sender=self.admin, recipient=self.user, content='Hello')
+        # Arrives after the conversation page picked its last message.
+        Message.objects.create(sender=self.admin, recipient=self.user, content='Again')
+        self.assertEqual(unread.mark_conversation_read(self.user, self.admin, first.pk), 1)
+        self.assertEqual(unread.conversation_unread_counts(self.user), {self.admin.pk: 1})
+        self.assertEqual(unread.get_counts(self.user).unread_messages, 1)
+
+
+class AdoptionQueueTests(TestCase):
+    def test_section_counts_match_section_rows(self):
+        reporter = User.objects.create_user('frank', 'frank@example.com', 'Pw1!aaaa')
+        for days in (1, 10, 30, 40):
+            report = PetReport.objects.create(
+                report_type='Found', reporter=reporter, pet_type='Dog', color='Black',
+                pet_image='pet_images/a.gif', location='Springfield', contact_info='frank@example.com',
+                date_reported=timezone.now() - datetime.timedelta(days=days),
+            )
+            report.approve()
+            report.save()
+        # A row approved behind save()'s back has no due date.
+        PetReport.objects.filter(pk=report.pk).update(adoption_eligible_at=None)
+        events.catch_up(report_stats.NAME)
+
+        now = timezone.now()
+        counts = adoption_queue.section_counts(now)
+        self.assertEqual(counts, {'ready': 1, 'found': 3, 'lost': 0})
+        for name in adoption_queue.SECTIONS:
+            self.assertEqual(len(adoption_queue.section_page(name, now=now).reports), counts[name], name)
+
+
+class ReportStatsTests(TestCase):
+    def test_counts_fall_back_to_live_counts_without_a_consumer(self):
+        reporter = User.objects.create_user('xena', 'xena@example.com', 'Pw1!aaaa')
+        for report_type in ('Lost', 'Lost', 'Found'):
+            PetReport.objects.create(
+                report_type=report_type, reporter=reporter, pet_type='Dog', color='Grey',
+                pet_image='pet_images/a.gif', location='Springfield', contact_info='xena@example.com',
+            )
+        sequencing.stamp(ReportEvent)
+        # Fresh events may wait for the next consumer run.
+        self.assertTrue(report_stats.is_current())
+        self.assertEqual(report_stats.counter()(report_type='Lost'), 0)
+
+        ReportEvent.objects.update(occurred_at=timezone.now() - datetime.timedelta(hours=1))
+        self.assertFalse(report_stats.is_current())
+        self.assertEqual(report_stats.counter()(report_type='Lost'), 2)
+
+        events.catch_up(report_stats.NAME)
+        self.assertTrue(report_stats.is_current())
+        count = report_stats.counter()
+        self.assertIs(count, report_stats.counts)
+        self.assertEqual((count(report_type='Lost'), count(report_type='Found')), (2, 1))
+
+
+class CityNotificationTests(TestCase):
+    def test_profile_cities_match_on_the_normalised_key(self):
+        reporter = User.objects.create_user('gina', 'gina@example.com', 'Pw1!aaaa')
+        for username, city in (('hal', ' Springfield '), ('ivy', 'Downtown,  SPRINGFIELD'), ('jo', 'Shelbyville')):
+            Profile.objects.create(user=User.objects.create_user(username, f'{username}@example.com', 'x'), city=city)
+        report = PetReport.objects.create(
+            report_type='Lost', reporter=reporter, pet_type='Dog', color='White',
+            pet_image='pet_images/a.gif', location='Elm St, Springfield', contact_info='gina@example.com',
+        )
+        self.assertEqual(notifications.notify_report_city(report), 2)
+        self.assertEqual(
+            sorted(Notification.objects.values_list('recipient__username', flat=True)), ['hal', 'ivy'],
+        )
+
+    def test_approval_notifies_through_the_event_consumer(self):
+        admin = User.objects.create_user('yuri', 'yuri@example.com', 'Pw1!aaaa', is_staff=True)
+        Profile.objects.create(user=User.objects.create_user('zoe', 'zoe@example.com', 'x'), city='Springfield')
+        report = PetReport.objects.create(
+            report_type='Found', reporter=admin, pet_type='Cat', color='White',
+            pet_image='pet_images/a.gif', location='Springfield', contact_info='yuri@example.com',
+        )
+        self.client.force_login(admin)
+        self.client.post(reverse('users:admin_approve_report', args=[report.pk]))
+        self.assertTrue(PetReport.objects.get(pk=report.pk).is_approved)
+        self.assertFalse(Notification.objects.exists())
+
+        events.catch_up(notifications.CITY_CONSUMER)
+        events.catch_up(notifications.CITY_CONSUMER)
+        self.assertEqual(list(Notification.objects.values_list('recipient__username', flat=True)), ['zoe'])
+
+    def test_stale_approvals_are_not_notified(self):
+        reporter = User.objects.create_user('abe', 'abe@example.com', 'Pw1!aaaa')
+        Profile.objects.create(user=User.objects.create_user('bea', 'bea@example.com', 'x'), city='Springfield')
+        report = PetReport.objects.create(
+            report_type='Lost', reporter=reporter, pet_type='Dog', color='Red',
+            pet_image='pet_images/a.gif', location='Springfield', contact_info='abe@example.com',
+        )
+        report.approve()
+        report.save()
+        ReportEvent.objects.update(occurred_at=timezone.now() - notifications.CITY_NOTIFY_MAX_AGE * 2)
+        events.catch_up(notifications.CITY_CONSUMER)
+        self.assertFalse(Notification.objects.exists())
+
+
+class SyncSequenceTests(TestCase):
+    def test_late_commit_is_served_after_the_cursor(self):
+        # The row with the lower id stands for a transaction that commits late:
+        # a seq of -1 keeps it out of reads and out of stamping until then.
+        sync.record_rows('report', [(1, [])])
+        late = ChangeLog.objects.get()
+        ChangeLog.objects.filter(pk=late.pk).update(seq=-1)
+        sync.record_rows('report', [(2, [])])
+        sequencing.stamp(ChangeLog)
+
+        user = User.objects.create_user('kim', 'kim@example.com', 'Pw1!aaaa')
+        first = sync.changes_since(user)
+        self.assertEqual([d['id'] for d in first.deleted], [2])
+
+        ChangeLog.objects.filter(pk=late.pk).update(seq=None)
+        sequencing.stamp(ChangeLog)
+        second = sync.changes_since(user, since=first.next_since)
+        self.assertEqual([d['id'] for d in second.deleted], [1])
+        self.assertGreater(second.next_since, first.next_since)
+
+
+class ChatRoutingTests(TestCase):
+    password = 'Pw1!aaaa'
+
+    def setUp(self):
+        self.admins = [
+            User.objects.create_user(name, f'{name}@example.com', self.password, is_staff=True)
+            for name in ('mia', 'ned')
+        ]
+        self.users = [
+            User.objects.create_user(name, f'{name}@example.com', 'x') for name in ('olga', 'pat', 'quin', 'rae')
+        ]
+
+    def _open(self, admin):
+        return AdminLoad.objects.get(admin=admin).open_conversations
+
+    def _read_out(self, admin, user):
+        self.client.force_login(admin)
+        self.assertEqual(self.client.get(reverse('users:conversation', args=[user.pk])).status_code, 200)
+
+    def test_reading_out_closes_and_a_new_message_reopens(self):
+        user = self.users[0]
+        admin = chat_routing.assign_admin(user)
+        Message.objects.create(sender=user, recipient=admin, content='Help')
+        self.assertEqual(self._open(admin), 1)
+        self._read_out(admin, user)
+        self.assertEqual(self._open(admin), 0)
+        Message.objects.create(sender=user, recipient=admin, content='Still there?')
+        Message.objects.create(sender=user, recipient=admin, content='Hello?')
+        self.assertEqual(self._open(admin), 1)
+
+    def test_only_a_post_assigns_an_admin(self):
+        user = self.users[0]
+        self.client.force_login(user)
+        url = reverse('users:start_admin_chat')
+        self.assertRedirects(self.client.get(url), reverse('users:inbox'), fetch_redirect_response=False)
+        self.assertEqual(AdminLoad.objects.filter(open_conversations__gt=0).count(), 0)
+        response = self.client.post(url)
+        admin = user.chat_assignment.admin
+        self.assertRedirects(response, reverse('users:conversation', args=[admin.pk]), fetch_redirect_response=False)
+        with self.assertNumQueries(2):
+            self.assertEqual(chat_routing.assign_admin(user), admin)
+        self.assertEqual(self._open(admin), 1)
+
+    def test_new_chats_go_to_the_admin_who_read_out(self):
+        first = chat_routing.assign_admin(self.users[0])
+        second = chat_routing.assign_admin(self.users[1])
+        self.assertEqual(chat_routing.assign_admin(self.users[2]), first)
+        self.assertEqual([self._open(admin) for admin in (first, second)], [2, 1])
+        for user in (self.users[0], self.users[2]):
+            self._read_out(first, user)
+        self.assertEqual(chat_routing.assign_admin(self.users[3]), first)
+        self.assertEqual([self._open(admin) for admin in (first, second)], [1, 1])
+
+
+class TriageClaimTests(TestCase):
+    def test_report_approved_after_the_select_is_not_claimed(self):
+        reporter = User.objects.create_user('sam', 'sam@example.com', 'Pw1!aaaa')
+        admin = User.objects.create_user('tess', 'tess@example.com', 'Pw1!aaaa', is_staff=True)
+        report = PetReport.objects.create(
+            report_type='Found', reporter=reporter, pet_type='Dog', color='Brown',
+            pet_image='pet_images/a.gif', location='Springfield', contact_info='sam@example.com',
+        )
+        approved = []
+
+        def approve_after_first_select(execute, sql, params, many, context):
+            result = execute(sql, params, many, context)
+            if not approved and sql.lstrip().upper().startswith('SELECT'):
+                approved.append(True)
+                PetReport.objects.filter(pk=report.pk).update(is_approved=True)
+            return result
+
+        with connection.execute_wrapper(approve_after_first_select):
+            self.assertIsNone(triage.claim_next(admin))
+        report.refresh_from_db()
+        self.assertIsNone(report.claimed_by_id)
+
+
+class ArchiveTests(TestCase):
+    def test_archiving_is_not_reported_as_deletion(self):
+        user = User.objects.create_user('vic', 'vic@example.com', 'Pw1!aaaa')
+        admin = User.objects.create_user('wes', 'wes@example.com', 'Pw1!aaaa', is_staff=True)
+        Message.objects.create(sender=user, recipient=admin, content='Old news')
+        report = PetReport.objects.create(
+            report_type='Lost', reporter=user, pet_type='Cat', color='Black',
+            pet_image='pet_images/a.gif', location='Springfield', contact_info='vic@example.com',
+        )
+        report.close()
+        report.save()
+
+        self.assertEqual(archive.archive_message_batch(Message.objects.all(), 10), 1)
+        self.assertEqual(archive.archive_report_batch(PetReport.objects.all(), 10), 1)
+        self.assertFalse(ChangeLog.objects.filter(deleted=True).exists())
+        self.assertEqual(ReportEvent.objects.filter(report_id=report.pk).latest('pk').event_type, 'archived')
+        self.assertEqual(len(archive.conversation_messages(user, admin)), 1)
+
+
+class ReportAdminSearchTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('cleo', 'cleo@example.com', 'Pw1!aaaa')
+        self.reports = {}
+        for username, location in (('dora', 'Elm St, Springfield'), ('dan', 'Shelbyville'), ('eli', 'Springdale')):
+            reporter = User.objects.create_user(username, f'{username}@example.com', 'x')
+            self.reports[username] = PetReport.objects.create(
+                report_type='Lost', reporter=reporter, pet_type='Dog', color='Grey',
+                pet_image='pet_images/a.gif', location=location, contact_info=f'{username}@example.com',
+            )
+        self.client.force_login(self.admin)
+
+    def _search(self, term):
+        response = self.client.get(reverse('admin:users_petreport_changelist'), {'q': term})
+        return sorted(report.reporter.username for report in response.context['cl'].result_list)
+
+    def test_each_search_is_one_indexed_lookup(self):
+        self.assertEqual(self._search(str(self.reports['dan'].pk)), ['dan'])
+        self.assertEqual(self._search(' SPRING'), ['dora', 'eli'])
+        self.assertEqual(self._search('@da'), ['dan'])
+        self.assertEqual(self._search('@d'), ['dan', 'dora'])
+        self.assertEqual(self._search('da'), [])
+
+
+class MediaAccessTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        os.makedirs(os.path.join(media_root.name, 'pet_images'))
+        with open(os.path.join(media_root.name, 'pet_images', 'a.gif'), 'wb') as f:
+            f.write(b'GIF89a')
+        overrides = override_settings(MEDIA_ROOT=media_root.name, MEDIA_SENDFILE_HEADER=None)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        reporter = User.objects.create_user('uma', 'uma@example.com', 'Pw1!aaaa')
+        PetReport.objects.create(
+            report_type='Found', reporter=reporter, pet_type='Dog', color='Brown',
+            pet_image='pet_images/a.gif', location='Springfield', contact_info='uma@example.com',
+        )
+
+    def test_unapproved_image_is_hidden_under_every_spelling(self):
+        for path in ('pet_images/a.gif', 'pet_images//a.gif', 'pet_images/./a.gif', 'x/../pet_images/a.gif'):
+            self.assertEqual(self.client.get('/media/' + path).status_code, 404, path)
+
+    def test_offload_header_carries_the_normalised_name(self):
+        PetReport.objects.update(is_approved=True)
+        with override_settings(MEDIA_SENDFILE_HEADER='X-Accel-Redirect'):
+            response = self.client.get('/media/pet_images/./a.gif')
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/pet_images/a.gif')
+
+
+class HomeApiTests(TransactionTestCase):
+    # Outside a transaction, so build() takes the thread pool path.
+    def setUp(self):
+        self.user = User.objects.create_user('kim', 'kim@example.com', 'Pw1!aaaa')
+        Profile.objects.create(user=self.user, city='Springfield')
+        Notification.objects.create(recipient=self.user, message='Found a match')
+        self.request = RequestFactory().get('/api/home/')
+        self.request.user = self.user
+        self.threads = {}
+        sections = {name: self._recording(name, builder) for name, builder in home_api.SECTIONS.items()}
+        patcher = mock.patch.dict(home_api.SECTIONS, sections)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _recording(self, name, builder):
+        def build_section(query):
+            self.threads[name] = threading.current_thread()
+            return builder(query)
+        return build_section
+
+    def test_sections_run_on_the_shared_pool(self):
+        data = home_api.build(self.request)
+        offloaded = {name for name, thread in self.threads.items() if thread is not threading.main_thread()}
+        self.assertNotIn('profile', offloaded)
+        self.assertTrue(offloaded)
+        self.assertTrue(all(self.threads[name].name.startswith('petrescue-home') for name in offloaded))
+        self.assertEqual(data['notifications']['results'][0]['message'], 'Found a match')
+        with transaction.atomic():
+            self.assertEqual(home_api.build(self.request), data)
+
+    def test_busy_pool_builds_on_the_request_thread(self):
+        executor = mock.Mock()
+        with mock.patch.object(home_api, '_get_executor', return_value=(executor, threading.Semaphore(0))):
+            data = home_api.build(self.request, 'unread,notifications')
+        executor.submit.assert_not_called()
+        self.assertEqual(set(self.threads), {'unread', 'notifications'})
+        self.assertTrue(all(thread is threading.main_thread() for thread in self.threads.values()))
+        self.assertEqual(len(data['notifications']['results']), 1)
+
+    def test_workers_leave_half_of_the_connection_pool(self):
+        pool = mock.patch.dict(settings.DATABASES['default'], {'POOL': {'MAX_SIZE': 4}})
+        with pool, override_settings(HOME_API_WORKERS=8):
+            self.assertEqual(home_api.worker_count(), 2)
+
+
+@skipUnless('replica' in settings.DATABASES, "run with --settings=petrescue.settings_sqlite_replica")
+@override_settings(DATABASE_REPLICAS={'replica': 1})
+class ReplicaRoutingTests(TransactionTestCase):
+    # The replica is a second, separately migrated database that never sees
+    # the primary's writes, so a read shows which one served it. Without the
+    # alias the class is skipped, but the runner still collects its databases.
+    databases = {'default', 'replica'}.intersection(settings.DATABASES)
+
+    def setUp(self):
+        self.reporter = User.objects.create_user('lee', 'lee@example.com', 'Pw1!aaaa')
+        self._report()
+        self.middleware = routers.ReadYourWritesMiddleware(self._view)
+        self.session = {}
+        patcher = mock.patch.object(routers, 'health', routers.ReplicaHealth())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _report(self):
+        return PetReport.objects.create(
+            report_type='Lost', reporter=self.reporter, pet_type='Dog', color='Tan',
+            pet_image='pet_images/a.gif', location='Springfield', contact_info='lee@example.com',
+        )
+
+    def _view(self, request):
+        if request.method == 'POST':
+            self._report()
+        return HttpResponse(str(PetReport.objects.count()))
+
+    def _count(self, method='get'):
+        request = getattr(RequestFactory(), method)('/')
+        request.session = self.session
+        return int(self.middleware(request).content)
+
+    def test_session_reads_its_own_writes(self):
+        self.assertEqual(self._count(), 0)
+        self.assertEqual(self._count('post'), 2)
+        self.assertIn(routers.PIN_SESSION_KEY, self.session)
+        self.assertEqual(self._count(), 2)
+        self.session[routers.PIN_SESSION_KEY] = 0
+        self.assertEqual(self._count(), 0)
+
+    def test_home_sections_read_from_the_replica(self):
+        user = User.objects.create_user('kim', 'kim@example.com', 'Pw1!aaaa')
+        Notification.objects.create(recipient=user, message='Found a match')
+
+        def home(request):
+            data = home_api.build(request, 'adoptions,notifications')
+            return HttpResponse(str(len(data['notifications']['results'])))
+
+        request = RequestFactory().get('/api/home/')
+        request.user, request.session = user, {}
+        self.assertEqual(routers.ReadYourWritesMiddleware(home)(request).content, b'0')
+        request.session[routers.PIN_SESSION_KEY] = time.time() + 60
+        self.assertEqual(routers.ReadYourWritesMiddleware(home)(request).content, b'1')
+
+    def test_failed_connection_ejects_the_replica(self):
+        self.assertEqual(self._count(), 0)
+        with mock.patch.object(connections['replica'], 'ensure_connection', side_effect=OperationalError):
+            self.assertEqual(self._count(), 1)
+        # Ejected until the next health check, even though it answers again.
+        self.assertFalse(routers.health.is_healthy('replica'))
+        self.assertEqual(self._count(), 1)
+
+    def test_failed_query_ejects_the_replica(self):
+        self.assertEqual(self._count(), 0)
+        with self.assertRaises(OperationalError):
+            connections['replica'].cursor().execute('SELECT * FROM no_such_table')
+        self.assertEqual(self._count(), 1)
@@ -0,0 +1,170 @@
+"""
+Attempt limiting for login and registration.
+
+Every password check or user creation costs a PBKDF2 hash, so a credential
+stuffing burst can pin every worker's CPU. ``check()`` runs before any
+hashing and rejects a request when either
+
+* the client IP has used up its sliding-window budget for the scope
+  (THROTTLE_RATES), or
+* the username is locked out after repeated failures. Each failure past
+  THROTTLE_LOCKOUT['threshold'] doubles the lockout, up to 'max_seconds'.
+  Rejecting during the lockout replaces sleeping in the worker, which would
+  tie it up just as badly as hashing.
+
+Counters live in the cache named by THROTTLE_CACHE so all workers share them.
+If that cache errors, the process falls back to a local store rather than
+failing open.
+"""
+import hashlib
+import threading
+import time
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import caches
+
+from . import metrics
+
+Decision = namedtuple('Decision', 'allowed retry_after reason')
+
+ALLOW = Decision(True, 0, None)
+
+
+class LocalStore:
+    """Minimal thread-safe subset of the cache API, used when the shared cache fails."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}
+
+    def _live(self, key, now):
+        item = self._data.get(key)
+        if item is not None and item[1] <= now:
+            del self._data[key]
+            item = None
+        return item
+
+    def get(self, key, default=None):
+        with self._lock:
+            item = self._live(key, time.time())
+            return default if item is None else item[0]
+
+    def set(self, key, value, timeout):
+        with self._lock:
+            self._data[key] = (value, time.time() + timeout)
+
+    def incr_with_expiry(self, key, timeout):
+        now = time.time()
+        with self._lock:
+            item = self._live(key, now)
+            value = 1 if item is None else item[0] + 1
+            self._data[key] = (value, now + timeout if item is None else item[1])
+            return value
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+_local = LocalStore()
+
+
+def _shared():
+    return caches[getattr(settings, 'THROTTLE_CACHE', 'default')]
+
+
+def _call(op, *args):
+    """Run ``op(store, *args)`` against the shared cache, or the local store if it errors."""
+    try:
+        return op(_shared(), *args)
+    except Exception:
+        metrics.incr('throttle.cache_errors')
+        return op(_local, *args)
+
+
+def _incr(store, key, timeout):
+    if isinstance(store, LocalStore):
+        return store.incr_with_expiry(key, timeout)
+    if store.add(key, 1, timeout):
+        return 1
+    try:
+        return store.incr(key)
+    except ValueError:  # expired between add() and incr()
+        store.add(key, 1, timeout)
+        return 1
+
+
+def client_ip(request):
+    if getattr(settings, 'THROTTLE_TRUST_X_FORWARDED_FOR', False):
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        if forwarded:
+            return forwarded.split(',')[0].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _username_ident(username):
+    # Hashed so arbitrary user input is always a valid cache key.
+    return hashlib.sha1(username.strip().lower().encode()).hexdigest()
+
+
+def _window_hit(scope, ident, limit, window):
+    """
+    Record one attempt in a sliding window approximated from two fixed
+    windows; return seconds to wait if the budget is exhausted, else 0.
+    """
+    now = time.time()
+    current = int(now // window)
+    elapsed = (now % window) / window
+    prefix = f'throttle:{scope}:{ident}:'
+    previous_count = _call(lambda s, k: s.get(k, 0), prefix + str(current - 1)) or 0
+    current_count = _call(lambda s, k: s.get(k, 0), prefix + str(current)) or 0
+    if previous_count * (1 - elapsed) + current_count >= limit:
+        return max(1, int(window - now % window))
+    _call(_incr, prefix + str(current), window * 2)
+    return 0
+
+
+def check(request, scope, username=None):
+    """Decide whether an attempt may proceed. Call before hashing anything."""
+    lockout = _call(lambda s, k: s.get(k), _lock_key(scope, username)) if username else None
+    if lockout and lockout > time.time():
+        metrics.incr(f'throttle.{scope}.rejected_user')
+        return Decision(False, int(lockout - time.time()) + 1, 'user')
+
+    limit, window = settings.THROTTLE_RATES[scope]
+    wait = _window_hit(scope, client_ip(request), limit, window)
+    if wait:
+        metrics.incr(f'throttle.{scope}.rejected_ip')
+        return Decision(False, wait, 'ip')
+
+    metrics.incr(f'throttle.{scope}.allowed')
+    return ALLOW
+
+
+def _fail_key(scope, username):
+    return f'throttle:{scope}:fail:{_username_ident(username)}'
+
+
+def _lock_key(scope, username):
+    return f'throttle:{scope}:lock:{_username_ident(username)}'
+
+
+def record_failure(scope, username):
+    """Count a failed attempt for ``username``; lock it out past the threshold."""
+    if not username:
+        return
+    conf = settings.THROTTLE_LOCKOUT
+    failures = _call(_incr, _fail_key(scope, username), conf['max_seconds'])
+    metrics.incr(f'throttle.{scope}.failures')
+    if failures >= conf['threshold']:
+        delay = min(conf['base_seconds'] * 2 ** (failures - conf['threshold']), conf['max_seconds'])
+        _call(lambda s, k, v, t: s.set(k, v, t), _lock_key(scope, username), time.time() + delay, delay)
+        metrics.incr(f'throttle.{scope}.lockouts')
+
+
+def record_success(scope, username):
+    if not username:
+        return
+    _call(lambda s, k: s.delete(k), _fail_key(scope, username))
+    _call(lambda s, k: s.delete(k), _lock_key(scope, username))
@@ -0,0 +1,183 @@
+"""
+Moderation triage: a priority score per submitted report and a queue that
+several admins can work at once.
+
+priority() runs when a report is submitted (a pre_save signal) and is stored
+in PetReport.priority. The moderation queue is served highest priority first,
+newest first among equals, in keyset pages from the (is_approved, priority,
+date_reported, id) index.
+
+Admins claim reports before acting on them. A claim is a lease that lapses
+after MODERATION_LEASE_SECONDS, so a report an admin walked away from goes
+back to the pool. Claims are taken with a conditional UPDATE, so two admins
+can never hold the same report; approving or rejecting claims it first.
+"""
+import datetime
+from collections import namedtuple
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import PetReport
+from .pagination import InvalidCursor, KeysetPaginator
+
+PAGE_SIZE = 25
+ORDERING = ('-priority', '-date_reported', '-id')
+# Columns the queue shows on top of PetReport.CARD_FIELDS.
+QUEUE_FIELDS = ('priority', 'claimed_by_id', 'claim_expires_at', 'claimed_by__username')
+
+MAX_PRIORITY = 100
+TYPE_POINTS = {'Found': 30, 'Lost': 10}
+INJURY_POINTS = 15
+URGENT_INJURY_POINTS = 25
+URGENT_WORDS = (
+    'bleed', 'blood', 'broken', 'fracture', 'hit by', 'limp', 'wound', 'unconscious', 'seizure',
+    'breathing', 'collapse', 'vomit', 'burn', 'trapped', 'dehydrat', 'emaciat', 'pregnant',
+)
+# (days since the pet was lost/found, points), first match wins.
+RECENCY_POINTS = ((1, 15), (3, 10), (7, 5))
+TRUSTED_POINTS_PER_REPORT, TRUSTED_MAX_REPORTS = 2, 5
+PENDING_FLOOD, PENDING_FLOOD_POINTS = 5, -15
+DUPLICATE_DAYS = 7
+DUPLICATE_POINTS = -20
+POSSIBLE_MATCH_POINTS = 10
+
+QueuePage = namedtuple('QueuePage', 'reports next_cursor')
+
+
+# -----------------------
+# Scoring
+# -----------------------
+def _injury_points(report):
+    injury = (report.injury or '').lower()
+    if not injury.strip():
+        return 0
+    urgent = any(word in injury for word in URGENT_WORDS)
+    return INJURY_POINTS + (URGENT_INJURY_POINTS if urgent else 0)
+
+
+def _recency_points(report, now):
+    if not report.event_date:
+        return 0
+    age = (timezone.localdate(now) - report.event_date).days
+    return next((points for days, points in RECENCY_POINTS if age <= days), 0)
+
+
+def _reporter_points(report):
+    """Approved reports earn trust; a backlog of pending ones looks like a flood."""
+    mine = PetReport.objects.filter(reporter_id=report.reporter_id).exclude(pk=report.pk)
+    approved = mine.filter(is_approved=True)[:TRUSTED_MAX_REPORTS].count()
+    pending = mine.filter(is_approved=False)[:PENDING_FLOOD].count()
+    return approved * TRUSTED_POINTS_PER_REPORT + (PENDING_FLOOD_POINTS if pending >= PENDING_FLOOD else 0)
+
+
+def _duplicate_points(report, now):
+    """
+    The same reporter filing the same kind of pet in the same city again is
+    probably a resubmission; an open report of the opposite type nearby is a
+    possible match worth seeing early. Only earlier reports count, so
+    rescoring leaves the first of two duplicates alone.
+    """
+    if not report.city_key:
+        return 0
+    submitted = report.date_reported or now
+    nearby = (
+        PetReport.objects.filter(
+            city_key=report.city_key, pet_type__iexact=report.pet_type,
+            date_reported__gte=submitted - datetime.timedelta(days=DUPLICATE_DAYS),
+            date_reported__lte=submitted,
+        )
+        .exclude(pk=report.pk)
+    )
+    if nearby.filter(reporter_id=report.reporter_id, report_type=report.report_type).exists():
+        return DUPLICATE_POINTS
+    opposite = 'Lost' if report.report_type == 'Found' else 'Found'
+    if nearby.filter(report_type=opposite, status='Open', is_approved=True).exists():
+        return POSSIBLE_MATCH_POINTS
+    return 0
+
+
+def priority(report, now=None):
+    """The report's triage score, 0 (routine) to MAX_PRIORITY (urgent)."""
+    now = now or timezone.now()
+    score = (
+        TYPE_POINTS.get(report.report_type, 0)
+        + _injury_points(report)
+        + _recency_points(report, now)
+        + _reporter_points(report)
+        + _duplicate_points(report, now)
+    )
+    return max(0, min(score, MAX_PRIORITY))
+
+
+# -----------------------
+# Queue and claims
+# -----------------------
+def queue_page(cursor=None):
+    """One page of unapproved reports in priority order; an invalid cursor gives the first page."""
+    queryset = (
+        PetReport.objects.select_related('claimed_by')
+        .cards(reporter=True, extra=QUEUE_FIELDS)
+        .filter(is_approved=False)
+    )
+    paginator = KeysetPaginator(queryset, ORDERING, PAGE_SIZE)
+    try:
+        page = paginator.page(cursor)
+    except InvalidCursor:
+        page = paginator.page()
+    return QueuePage(page.object_list, page.next_cursor)
+
+
+def _lease_end(now):
+    return now + datetime.timedelta(seconds=settings.MODERATION_LEASE_SECONDS)
+
+
+def _free(now):
+    return Q(claimed_by__isnull=True) | Q(claim_expires_at__lte=now)
+
+
+def claim_state(report, user, now=None):
+    """'mine', 'other' (an active claim by someone else) or 'free'."""
+    now = now or timezone.now()
+    if report.claimed_by_id is None or report.claim_expires_at is None or report.claim_expires_at <= now:
+        return 'free'
+    return 'mine' if report.claimed_by_id == user.pk else 'other'
+
+
+def claim(report_id, user, now=None):
+    """Claims (or renews) one report. False if another admin holds it or it is not pending."""
+    now = now or timezone.now()
+    return bool(
+        PetReport.objects.filter(_free(now) | Q(claimed_by=user), pk=report_id, is_approved=False)
+        .update(claimed_by=user, claim_expires_at=_lease_end(now))
+    )
+
+
+def claim_next(user, now=None, attempts=5):
+    """
+    Claims the highest-priority report nobody holds and returns its id, or
+    None when there is none. Losing a race to another admin moves on to the
+    next candidate.
+    """
+    now = now or timezone.now()
+    for _ in range(attempts):
+        candidate = (
+            PetReport.objects.filter(_free(now), is_approved=False)
+            .order_by(*ORDERING).values_list('pk', flat=True).first()
+        )
+        if candidate is None:
+            return None
+        # Re-checks is_approved: the report may have been approved since the SELECT.
+        if PetReport.objects.filter(_free(now), pk=candidate, is_approved=False).update(
+            claimed_by=user, claim_expires_at=_lease_end(now)
+        ):
+            return candidate
+    return None
+
+
+def release(report_id, user):
+    """Gives up the user's claim on a report. Returns whether they held one."""
+    return bool(
+        PetReport.objects.filter(pk=report_id, claimed_by=user).update(claimed_by=None, claim_expires_at=None)
+    )
@@ -0,0 +1,124 @@
+"""
+Read watermarks and unread counters for messages and notifications.
+
+Reading a conversation moves a watermark on a single row instead of updating
+every unread Message; notifications are flagged read with one UPDATE. The
+unread totals live on UnreadCounter so the nav badge never has to count rows.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from . import sync
+from .models import ArchivedMessage, ConversationReadState, Message, Notification, UnreadCounter
+
+
+def _increment(model, lookup, **deltas):
+    """UPDATE ... SET f = f + n for one row, creating the row if it is missing."""
+    changes = {field: F(field) + amount for field, amount in deltas.items()}
+    if model.objects.filter(**lookup).update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:
+        model.objects.filter(**lookup).update(**changes)
+
+
+def _decrement(model, lookup, **deltas):
+    model.objects.filter(**lookup).update(
+        **{field: Greatest(F(field) - Value(amount), Value(0)) for field, amount in deltas.items()}
+    )
+
+
+# -----------------------
+# Messages
+# -----------------------
+def record_new_message(message):
+    _increment(
+        ConversationReadState,
+        {'user_id': message.recipient_id, 'participant_id': message.sender_id},
+        unread_count=1,
+    )
+    _increment(UnreadCounter, {'user_id': message.recipient_id}, unread_messages=1)
+
+
+def mark_conversation_read(user, participant, last_message_id):
+    """
+    Moves the user's watermark for this conversation up to last_message_id.
+    Returns how many messages went from unread to read.
+
+    The state row is locked while the messages between the old and the new
+    watermark are counted, and both counters drop by exactly that many, so a
+    message arriving meanwhile stays unread on the badge and in the
+    conversation.
+    """
+    lookup = ConversationReadState.objects.filter(user=user, participant=participant)
+    state = lookup.first()
+    if state is None or (state.unread_count == 0 and state.last_read_message_id >= last_message_id):
+        return 0
+    with transaction.atomic():
+        state = lookup.select_for_update().get()
+        if state.last_read_message_id >= last_message_id:
+            return 0
+        pair = {'sender': participant, 'recipient': user}
+        # Message.is_read is derived from the watermark; tell sync clients which ones flipped.
+        flipped = list(Message.objects.filter(
+            **pair, pk__gt=state.last_read_message_id, pk__lte=last_message_id,
+        ).values_list('pk', flat=True))
+        read = len(flipped) + ArchivedMessage.objects.filter(
+            **pair, original_id__gt=state.last_read_message_id, original_id__lte=last_message_id,
+        ).count()
+        ConversationReadState.objects.filter(pk=state.pk).update(
+            last_read_message_id=last_message_id,
+            unread_count=Greatest(F('unread_count') - Value(read), Value(0)),
+        )
+        sync.record_rows('message', [(pk, [participant.pk, user.pk]) for pk in flipped])
+        if read:
+            _decrement(UnreadCounter, {'user_id': user.pk}, unread_messages=read)
+    return read
+
+
+def conversation_unread_counts(user):
+    """{participant_id: unread_count} for every conversation the user has."""
+    return dict(
+        ConversationReadState.objects.filter(user=user, unread_count__gt=0)
+        .values_list('participant_id', 'unread_count')
+    )
+
+
+# -----------------------
+# Notifications
+# -----------------------
+def record_new_notifications(recipient_id, count=1):
+    _increment(UnreadCounter, {'user_id': recipient_id}, unread_notifications=count)
+
+
+def record_notifications_read(recipient_id, count):
+    _decrement(UnreadCounter, {'user_id': recipient_id}, unread_notifications=count)
+
+
+def mark_all_notifications_read(user):
+    """
+    Flags every unread notification up to the newest one read in one UPDATE
+    (served by the (recipient, is_read, created_at) index) and zeroes the
+    counter. The flagged ids are read first so they can be recorded for delta
+    sync. Returns how many changed.
+    """
+    latest_id = (
+        Notification.objects.filter(recipient=user).order_by('-pk').values_list('pk', flat=True).first()
+    )
+    if latest_id is None:
+        return 0
+    with transaction.atomic():
+        unread_rows = Notification.objects.filter(recipient=user, is_read=False, pk__lte=latest_id)
+        changed_ids = list(unread_rows.values_list('pk', flat=True))
+        changed = unread_rows.update(is_read=True) if changed_ids else 0
+        sync.record_rows('notification', [(pk, [user.pk]) for pk in changed_ids])
+    UnreadCounter.objects.filter(user=user).update(unread_notifications=0)
+    return changed
+
+
+def get_counts(user):
+    """The user's UnreadCounter, or an unsaved zeroed one if none exists yet."""
+    return UnreadCounter.objects.filter(user=user).first() or UnreadCounter(user=user)
@@ -6,72 +6,24 @@ from django import forms
 from django.urls import reverse
 from django.contrib import messages
 from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils import timezone
-import datetime
-import random
-from django.db.models import Q 
+from django.db import transaction
+from django.db.models import Count, Q
 
-from .decorators import staff_required, superuser_required
-from .models import Profile, PetReport, PetForAdoption, Notification, Message 
-from .serializers import (
-    ProfileSerializer,
-    PetReportSerializer,
-    PetForAdoptionSerializer,
-    NotificationSerializer,
-    UserSerializer,
-)
-from rest_framework.views import APIView
-from rest_framework.response import Response
-from rest_framework import viewsets, status
-from rest_framework.permissions import AllowAny
-
-# -----------------------
-# REST viewsets / APIView
-# -----------------------
-class ProfileViewSet(viewsets.ModelViewSet):
-    queryset = Profile.objects.all()
-    serializer_class = ProfileSerializer
-
-
-class PetReportViewSet(viewsets.ModelViewSet):
-    queryset = PetReport.objects.all()
-    serializer_class = PetReportSerializer
-
-
-class PetForAdoptionViewSet(viewsets.ModelViewSet):
-    queryset = PetForAdoption.objects.all()
-    serializer_class = PetForAdoptionSerializer
-
-
-class NotificationViewSet(viewsets.ModelViewSet):
-    queryset = Notification.objects.all()
-    serializer_class = NotificationSerializer
-
-
-class RegisterView(APIView):
-    permission_classes = [AllowAny]
-
-    def post(self, request):
-        username = request.data.get("username")
-        email = request.data.get("email")
-        password = request.data.get("password")
+from petrescue.db.pool import pool_stats
 
-        if not username or not password or not email:
-            return Response(
-                {"error": "Username, email, and password are required."},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
-
-        if User.objects.filter(username=username).exists():
-            return Response({"error": "Username already exists."}, status=status.HTTP_400_BAD_REQUEST)
-
-        if User.objects.filter(email=email).exists():
-            return Response({"error": "Email already exists."}, status=status.HTTP_400_BAD_REQUEST)
-
-        user = User.objects.create_user(username=username, email=email, password=password)
-        Profile.objects.create(user=user)
-        return Response(UserSerializer(user).data, status=status.HTTP_201_CREATED)
+from . import (
+    adoption_queue, archive, chat_routing, feeds, locality, metrics, report_stats, search, throttling,
+    triage, unread,
+)
+from .decorators import staff_required, superuser_required
+from .pagination import InvalidCursor, KeysetPaginator
+from .models import AdminLoad, Profile, PetReport, PetForAdoption, Message 
 
+MANAGE_USERS_PAGE_SIZE = 25
+REPORT_HISTORY_PAGE_SIZE = 20
 
 # -----------------------
 # Forms
@@ -186,18 +138,31 @@ def home_view(request):
     return render(request, "users/home.html", context)
 
 
+def _throttled(request, template, reason, decision, context=None):
+    messages.error(request, f"{reason} Please try again in {decision.retry_after} seconds.")
+    response = render(request, template, context, status=429)
+    response["Retry-After"] = str(decision.retry_after)
+    return response
+
+
 def login_view(request):
     if request.method == "POST":
         form_username = request.POST.get("username")
         form_password = request.POST.get("password")
 
+        decision = throttling.check(request, "login", username=form_username)
+        if not decision.allowed:
+            return _throttled(request, "users/login.html", "Too many login attempts.", decision)
+
         user = authenticate(request, username=form_username, password=form_password)
 
         if user is not None:
+            throttling.record_success("login", form_username)
             auth_login(request, user)
             messages.success(request, "Welcome back! You are logged in.")
             return redirect("users:dashboard")
         else:
+            throttling.record_failure("login", form_username)
             messages.error(request, "Invalid username or password. Please try again.")
             return render(request, "users/login.html")
     else:
@@ -214,6 +179,12 @@ def logout_view(request):
 
 def register_view(request):
     if request.method == "POST":
+        decision = throttling.check(request, "register")
+        if not decision.allowed:
+            return _throttled(
+                request, "users/register.html", "Too many registration attempts.", decision,
+                {"form": RegistrationForm()},
+            )
         form = RegistrationForm(request.POST)
         if form.is_valid():
             cleaned_data = form.cleaned_data
@@ -256,11 +227,56 @@ def contact_view(request):
 
 
 def pets_list_view(request):
-    all_pets = PetForAdoption.objects.filter(status="Available")
-    context = {"pets": all_pets}
+    result = search.search_pets(request.GET, cards=True)
+    next_url = None
+    if result.next_cursor:
+        params = request.GET.copy()
+        params["cursor"] = result.next_cursor
+        next_url = "?" + params.urlencode()
+    first_params = request.GET.copy()
+    first_params.pop("cursor", None)
+    context = {
+        "pets": result.pets,
+        "facets": result.facets,
+        "sort": result.sort,
+        "sorts": result.sorts,
+        "is_filtered": bool(result.selected),
+        "next_url": next_url,
+        "first_url": "?" + first_params.urlencode() if "cursor" in request.GET else None,
+    }
     return render(request, "users/pets_list.html", context)
 
 
+def feed_view(request, kind, fmt):
+    """Public Atom/JSON feed; see users/feeds.py."""
+    if kind not in feeds.FEED_KINDS or fmt not in ("atom", "json"):
+        raise Http404
+    params = {key: request.GET[key] for key in ("pet_type", "city", "since") if request.GET.get(key)}
+    try:
+        since = feeds.parse_since(params.get("since"))
+    except ValueError:
+        return HttpResponseBadRequest("'since' must be an ISO 8601 date and time.")
+
+    doc = feeds.get_document(kind)
+    entries = feeds.filter_entries(doc["entries"], params.get("pet_type"), params.get("city"), since)
+    etag = feeds.feed_etag(doc, fmt, params)
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None and since is not None and not entries:
+        response = HttpResponse(status=304)
+    if response is None:
+        if fmt == "atom":
+            body, content_type = feeds.render_atom(request, kind, entries)
+        else:
+            body, content_type = feeds.render_json(request, kind, entries, doc["updated"])
+        response = HttpResponse(body, content_type=content_type)
+    else:
+        metrics.incr("feeds.not_modified")
+    response["ETag"] = etag
+    patch_cache_control(response, public=True, max_age=60)
+    return response
+
+
 def pet_detail_view(request, pet_id):
     """
     Displays detailed information for a pet listed for adoption (PetForAdoption model).
@@ -279,19 +295,29 @@ def dashboard_view(request):
     profile = getattr(request.user, "profile", None)
 
     view_filter = request.GET.get("view")
-    open_reports_qs = PetReport.objects.filter(status="Open", is_approved=True).order_by("-date_reported")
+    current_view = view_filter if view_filter in locality.VIEWS else "all"
 
-    if view_filter == "lost":
-        open_reports_qs = open_reports_qs.filter(report_type="Lost")
-    elif view_filter == "found":
-        open_reports_qs = open_reports_qs.filter(report_type="Found")
+    # Users with a city see their city's feed unless they ask for everything.
+    city_key = locality.user_city_key(request.user)
+    show_all = not city_key or request.GET.get("scope") == "all"
+    open_reports, next_cursor = locality.dashboard_page(
+        "" if show_all else city_key, current_view, request.GET.get("cursor")
+    )
 
-    open_reports = list(open_reports_qs)
+    next_url = None
+    if next_cursor:
+        params = request.GET.copy()
+        params["cursor"] = next_cursor
+        next_url = "?" + params.urlencode()
 
     context = {
         "profile": profile,
         "open_reports": open_reports,
         "current_view": view_filter or "all",
+        "city": profile.city if city_key else None,
+        "show_all": show_all,
+        "scope_param": "scope=all&" if show_all and city_key else "",
+        "next_url": next_url,
     }
     return render(request, "users/dashboard.html", context)
 
@@ -310,23 +336,24 @@ def create_pet_report_view(request, report_type):
         if form.is_valid():
             injury_detail = form.cleaned_data.get("injury") if report_type == "Found" else None
             is_approved_status = False
-            pet_report = PetReport.objects.create(
-                report_type=report_type,
-                reporter=request.user,
-                name=form.cleaned_data.get("name"),
-                age=form.cleaned_data.get("age"),
-                gender=form.cleaned_data.get("gender"),
-                pet_type=form.cleaned_data["pet_type"],
-                breed=form.cleaned_data.get("breed"),
-                color=form.cleaned_data["color"],
-                pet_image=form.cleaned_data["pet_image"],
-                location=form.cleaned_data["location"],
-                contact_info=form.cleaned_data["contact_info"],
-                event_date=form.cleaned_data.get("event_date"),
-                health_information=form.cleaned_data.get("health_information"),
-                injury=injury_detail,
-                is_approved=is_approved_status,
-            )
+            with transaction.atomic():
+                pet_report = PetReport.objects.create(
+                    report_type=report_type,
+                    reporter=request.user,
+                    name=form.cleaned_data.get("name"),
+                    age=form.cleaned_data.get("age"),
+                    gender=form.cleaned_data.get("gender"),
+                    pet_type=form.cleaned_data["pet_type"],
+                    breed=form.cleaned_data.get("breed"),
+                    color=form.cleaned_data["color"],
+                    pet_image=form.cleaned_data["pet_image"],
+                    location=form.cleaned_data["location"],
+                    contact_info=form.cleaned_data["contact_info"],
+                    event_date=form.cleaned_data.get("event_date"),
+                    health_information=form.cleaned_data.get("health_information"),
+                    injury=injury_detail,
+                    is_approved=is_approved_status,
+                )
             messages.success(request, "Your pet report has been submitted successfully!")
             return redirect("users:dashboard")
     else:
@@ -342,6 +369,16 @@ def pet_report_detail_view(request, report_id):
     context = {"report": report}
     return render(request, "users/pet_report_detail.html", context)
 
+
+def found_report_view(request, report_id):
+    """
+    Public page for an approved, open Found report (the found-pets feed links
+    here). The reporter and their contact details need a login.
+    """
+    report = get_object_or_404(PetReport, pk=report_id, report_type="Found", is_approved=True, status="Open")
+    context = {"report": report, "public": True}
+    return render(request, "users/pet_report_detail.html", context)
+
 @login_required
 def inbox_view(request):
     # Identify unique users involved in conversations with the current user
@@ -354,6 +391,7 @@ def inbox_view(request):
     if not request.user.is_staff:
         participants = participants.filter(is_staff=True)
         
+    unread_by_participant = unread.conversation_unread_counts(request.user)
     conversations = []
     for participant in participants:
         last_message = Message.objects.filter(
@@ -361,9 +399,7 @@ def inbox_view(request):
             Q(sender=participant, recipient=request.user)
         ).latest('timestamp')
         
-        unread_count = Message.objects.filter(
-            recipient=request.user, sender=participant, is_read=False
-        ).count()
+        unread_count = unread_by_participant.get(participant.pk, 0)
         
         conversations.append({
             'participant': participant,
@@ -390,13 +426,17 @@ def conversation_view(request, participant_id):
          messages.error(request, "You can only maintain conversations with administrative users.")
          return redirect('users:inbox')
 
-    messages_qs = Message.objects.filter(
-        Q(sender=request.user, recipient=participant) | 
-        Q(sender=participant, recipient=request.user)
-    ).order_by('timestamp')
+    # Includes archived history, oldest first
+    messages_qs = archive.conversation_messages(request.user, participant)
     
-    # Mark incoming messages as read
-    Message.objects.filter(recipient=request.user, sender=participant, is_read=False).update(is_read=True)
+    # Mark incoming messages as read by moving the conversation watermark
+    last_incoming_id = max(
+        (m.pk for m in messages_qs if isinstance(m, Message) and m.sender_id == participant.pk),
+        default=0,
+    )
+    marked = unread.mark_conversation_read(request.user, participant, last_incoming_id)
+    if request.user.is_staff:
+        chat_routing.record_conversation_read(request.user, participant, marked)
     
     if request.method == 'POST':
         form = MessageForm(request.POST)
@@ -421,10 +461,12 @@ def conversation_view(request, participant_id):
 
 @login_required
 def start_admin_chat_view(request):
-  admin_pool = User.objects.filter(is_staff=True).exclude(pk=request.user.pk)
-  if admin_pool.exists():
-    random_index = random.randint(0, admin_pool.count() - 1)
-    admin_user = admin_pool[random_index]
+  # Assigning an admin writes, so it only happens on POST.
+  if request.method != 'POST':
+    messages.error(request, "Invalid request method.")
+    return redirect('users:inbox')
+  admin_user = chat_routing.assign_admin(request.user)
+  if admin_user is not None:
     return redirect('users:conversation', participant_id=admin_user.id)
   else:
     messages.warning(request, "No administrators are currently available to start a chat.")
@@ -433,33 +475,38 @@ def start_admin_chat_view(request):
 
 @staff_required
 def admin_adoption_processing_view(request):
-    threshold_date = timezone.now() - datetime.timedelta(days=15)
-    pending_status_q = Q(status='Pending Adoption')
-    overdue_q = Q(
-        report_type='Found',
-        status='Open',
-        is_approved=True,
-        date_reported__lt=threshold_date
-    )
-    pets_ready_for_listing = PetReport.objects.filter(pending_status_q | overdue_q).distinct().order_by('-date_reported')
-    open_found_reports = PetReport.objects.filter(
-        report_type='Found',
-        status='Open',
-        is_approved=True,
-        date_reported__gte=threshold_date  
-    ).order_by('-date_reported')
-    open_lost_reports = PetReport.objects.filter(
-        report_type='Lost',
-        status='Open',
-        is_approved=True
-    ).order_by('-date_reported')
+    """
+    Renders the first page of the ready-for-listing section. The other
+    sections load as fragments from admin_adoption_section_view.
+    """
+    ready = adoption_queue.section_page("ready")
+    context = {
+        "counts": adoption_queue.section_counts(),
+        "ready": ready,
+        "ready_next_url": _adoption_section_next_url(ready),
+    }
+    return render(request, "admin/process_adoption.html", context)
+
+
+def _adoption_section_next_url(section):
+    if not section.next_cursor:
+        return None
+    url = reverse("users:admin_adoption_section", args=[section.name])
+    return f"{url}?cursor={section.next_cursor}"
 
+
+@staff_required
+def admin_adoption_section_view(request, section):
+    """Table rows for one page of an adoption processing section."""
+    if section not in adoption_queue.SECTIONS:
+        raise Http404("Unknown section.")
+    page = adoption_queue.section_page(section, request.GET.get("cursor"))
     context = {
-        'pets_ready_for_listing': pets_ready_for_listing, 
-        'open_found_reports': open_found_reports,
-        'open_lost_reports': open_lost_reports,
+        "section": page,
+        "next_url": _adoption_section_next_url(page),
+        "first_page": not request.GET.get("cursor"),
     }
-    return render(request, 'admin/process_adoption.html', context)
+    return render(request, "admin/process_adoption_rows.html", context)
 
 
 @staff_required
@@ -475,7 +522,7 @@ def admin_put_for_adoption_view(request, report_id):
     
     # Check if the report is 'Open' and if it has actually passed the 15-day mark, as a security measure
     if report.status == 'Open':
-        if report.date_reported > (timezone.now() - datetime.timedelta(days=15)):
+        if report.adoption_eligible_at is None or report.adoption_eligible_at > timezone.now():
              messages.error(request, "This 'Open' report is not yet eligible for adoption processing.")
              return redirect('users:admin_adoption_processing')
 
@@ -489,11 +536,12 @@ def admin_put_for_adoption_view(request, report_id):
             new_adoption_pet.image = report.pet_image
             new_adoption_pet.lister = request.user
             new_adoption_pet.status = 'Available'
-            new_adoption_pet.save()
+            with transaction.atomic():
+                new_adoption_pet.save()
 
-            # Close the original report
-            report.status = 'Closed'
-            report.save()
+                # Close the original report
+                report.close()
+                report.save()
 
             messages.success(request, f"Pet '{new_adoption_pet.name}' has been successfully listed for adoption!")
             return redirect('users:admin_adoption_processing')
@@ -521,9 +569,13 @@ def admin_dashboard_view(request):
     total_admins = User.objects.filter(is_staff=True, is_superuser=False).count()
     total_normal_users = User.objects.filter(is_staff=False).count()
     pets_for_adoption_count = PetForAdoption.objects.filter(status="Available").count()
-    lost_reports_count = PetReport.objects.filter(report_type="Lost", status="Open").count()
-    found_reports_count = PetReport.objects.filter(report_type="Found", status="Open").count()
-    unapproved_reports_count = PetReport.objects.filter(is_approved=False).count()
+    # Report counts come from the event-fed ReportStat rows, kept current by the
+    # scheduler or consume_events, or from live COUNTs when neither is running.
+    count = report_stats.counter()
+    lost_reports_count = count(report_type="Lost", status="Open")
+    found_reports_count = count(report_type="Found", status="Open")
+    unapproved_reports_count = count(is_approved=False)
+    admin_loads = AdminLoad.objects.select_related("admin").order_by("-open_conversations", "-unread_messages")
 
     context = {
         "total_normal_users": total_normal_users,
@@ -532,20 +584,94 @@ def admin_dashboard_view(request):
         "lost_reports_count": lost_reports_count,
         "found_reports_count": found_reports_count,
         "unapproved_reports_count": unapproved_reports_count,
+        "admin_loads": admin_loads,
     }
     return render(request, "admin/dashboard.html", context)
 
 
+@staff_required
+def admin_metrics_view(request):
+    """
+    Returns the performance counters collected by this worker process as JSON.
+    """
+    data = metrics.snapshot()
+    data["db_pools"] = pool_stats()
+    return JsonResponse(data)
+
+
 @staff_required
 def admin_moderate_reports_view(request):
     """
-    Admin view to list reports awaiting approval.
+    Admin view to list reports awaiting approval, highest triage priority
+    first, with each report's claim state for the requesting admin.
     """
-    reports_to_moderate = PetReport.objects.filter(is_approved=False).order_by("-date_reported")
-    context = {"reports_to_moderate": reports_to_moderate}
+    page = triage.queue_page(request.GET.get("cursor"))
+    next_url = None
+    if page.next_cursor:
+        params = request.GET.copy()
+        params["cursor"] = page.next_cursor
+        next_url = "?" + params.urlencode()
+    now = timezone.now()
+    for report in page.reports:
+        report.claim_state = triage.claim_state(report, request.user, now)
+    context = {
+        "reports_to_moderate": page.reports,
+        "next_url": next_url,
+        "is_paged": bool(request.GET.get("cursor")),
+        "lease_minutes": settings.MODERATION_LEASE_SECONDS // 60,
+    }
     return render(request, "admin/moderate_reports.html", context)
 
 
+@staff_required
+def admin_claim_next_report_view(request):
+    """
+    Admin action to claim the highest-priority report nobody else holds.
+    """
+    if request.method == "POST":
+        report_id = triage.claim_next(request.user)
+        if report_id is None:
+            messages.info(request, "There are no unclaimed reports left in the queue.")
+        else:
+            messages.success(request, f"Report #{report_id} is yours for the next "
+                                      f"{settings.MODERATION_LEASE_SECONDS // 60} minutes.")
+        return redirect("users:admin_moderate_reports")
+
+    messages.error(request, "Invalid request method.")
+    return redirect("users:admin_moderate_reports")
+
+
+@staff_required
+def admin_claim_report_view(request, report_id):
+    """
+    Admin action to claim (or renew the claim on) one report.
+    """
+    if request.method == "POST":
+        if triage.claim(report_id, request.user):
+            messages.success(request, f"Report #{report_id} is yours for the next "
+                                      f"{settings.MODERATION_LEASE_SECONDS // 60} minutes.")
+        else:
+            messages.error(request, f"Report #{report_id} is claimed by another admin or no longer pending.")
+        return redirect("users:admin_moderate_reports")
+
+    messages.error(request, "Invalid request method.")
+    return redirect("users:admin_moderate_reports")
+
+
+@staff_required
+def admin_release_report_view(request, report_id):
+    """
+    Admin action to hand a claimed report back to the queue.
+    """
+    if request.method == "POST":
+        if triage.release(report_id, request.user):
+            messages.success(request, f"Report #{report_id} is back in the queue.")
+        return redirect("users:admin_moderate_reports")
+
+    messages.error(request, "Invalid request method.")
+    return redirect("users:admin_moderate_reports")
+
+
 @staff_required
 def admin_approve_report_view(request, report_id):
     """
@@ -557,9 +683,15 @@ def admin_approve_report_view(request, report_id):
         if report.is_approved:
             messages.warning(request, f"Report #{report.pk} is already approved.")
             return redirect("users:admin_moderate_reports")
+        if not triage.claim(report.pk, request.user):
+            messages.error(request, f"Report #{report.pk} is claimed by another admin.")
+            return redirect("users:admin_moderate_reports")
 
-        report.is_approved = True
-        report.save()
+        # Users in the report's city are notified by the city_notifications
+        # event consumer once the approval commits.
+        with transaction.atomic():
+            report.approve()
+            report.save()
         messages.success(
             request,
             f"Report #{report.pk} ({report.report_type}) has been successfully approved and is now visible on the dashboard.",
@@ -577,6 +709,9 @@ def admin_reject_report_view(request, report_id):
     """
     if request.method == "POST":
         report = get_object_or_404(PetReport, pk=report_id)
+        if not report.is_approved and not triage.claim(report.pk, request.user):
+            messages.error(request, f"Report #{report.pk} is claimed by another admin.")
+            return redirect("users:admin_moderate_reports")
         report.delete()
         messages.success(request, f"Report #{report_id} ({report.report_type}) has been successfully rejected and deleted.")
         return redirect("users:admin_moderate_reports")
@@ -588,10 +723,41 @@ def admin_reject_report_view(request, report_id):
 @staff_required
 def admin_manage_users_view(request):
     """
-    Lists all non-superuser users for management.
+    Lists non-superuser users for management, a page at a time in username
+    order, with their report counts. ``q`` is a prefix match on username or
+    email.
     """
-    users_to_manage = User.objects.filter(is_superuser=False).select_related("profile")
-    context = {"users": users_to_manage}
+    query = request.GET.get("q", "").strip()
+    users_to_manage = User.objects.filter(is_superuser=False)
+    if query:
+        users_to_manage = users_to_manage.filter(
+            Q(username__istartswith=query) | Q(email__istartswith=query)
+        )
+    users_to_manage = users_to_manage.select_related("profile").annotate(
+        lost_reports=Count("pet_reports", filter=Q(pet_reports__report_type="Lost")),
+        found_reports=Count("pet_reports", filter=Q(pet_reports__report_type="Found")),
+        open_reports=Count("pet_reports", filter=Q(pet_reports__status="Open")),
+        pending_reports=Count("pet_reports", filter=Q(pet_reports__is_approved=False)),
+    )
+
+    paginator = KeysetPaginator(users_to_manage, ("username",), MANAGE_USERS_PAGE_SIZE)
+    try:
+        page = paginator.page(request.GET.get("cursor"))
+    except InvalidCursor:
+        page = paginator.page()
+
+    next_url = None
+    if page.next_cursor:
+        params = request.GET.copy()
+        params["cursor"] = page.next_cursor
+        next_url = "?" + params.urlencode()
+
+    context = {
+        "users": page.object_list,
+        "query": query,
+        "next_url": next_url,
+        "is_paged": "cursor" in request.GET,
+    }
     return render(request, "admin/manage_users.html", context)
 
 
@@ -659,27 +825,28 @@ def admin_view_user_reports(request, user_id):
     """
     Admin view to display all reports submitted by a specific user.
     """
-    try:
-        user = User.objects.get(pk=user_id)
-        reports = PetReport.objects.filter(reporter=user).order_by("-date_reported")
-
-        context = {"user": user, "reports": reports}
-        return render(request, "admin/user_reports.html", context)
-    except User.DoesNotExist:
-        messages.error(request, "User not found.")
-        return redirect("users:admin_manage_users")
+    return user_report_history_view(request, user_id)
 
 
+@staff_required
 def user_report_history_view(request, user_id):
     """
-    View to display the report history of a specific user.
+    View to display the report history of a specific user, a page at a time,
+    with per-type and per-status totals.
     """
     try:
-        user = User.objects.get(pk=user_id)
-        reports = PetReport.objects.filter(reporter=user).order_by("-date_reported")
-
-        context = {"user": user, "reports": reports}
-        return render(request, "admin/user_report_history.html", context)
+        user = User.objects.select_related("profile").get(pk=user_id)
     except User.DoesNotExist:
         messages.error(request, "User not found.")
         return redirect("users:admin_manage_users")
+
+    cursor = archive.decode_history_cursor(request.GET.get("cursor"))
+    reports, next_cursor = archive.report_history_page(user, cursor, REPORT_HISTORY_PAGE_SIZE)
+    context = {
+        "user": user,
+        "reports": reports,
+        "summary": archive.report_summary(user),
+        "next_cursor": archive.encode_history_cursor(next_cursor) if next_cursor else None,
+        "is_paged": cursor is not None,
+    }
+    return render(request, "admin/user_report_history.html", context)
@@ -0,0 +1,107 @@
+"""
+Worker warm-up, run from the WSGI/ASGI entry points when WARMUP_ON_START is
+set, i.e. before the worker accepts traffic (with gunicorn's --preload, once
+in the master before it forks).
+
+The URLconfs, views and DRF are otherwise imported by the first request
+(petrescue/urls.py includes them lazily), templates are compiled on first
+render, and the shared caches fill on first read. warm_up() does all of that
+up front. Each step is best-effort: a failure is logged and the worker still
+starts.
+"""
+import logging
+import os
+import time
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.template import TemplateSyntaxError, engines
+from django.urls import get_resolver, reverse
+
+from . import feeds, locality, search
+
+logger = logging.getLogger(__name__)
+
+
+def load_urlconfs():
+    """Imports every URLconf and view module by populating the reverse lookups."""
+    get_resolver()
+    reverse('users:home')
+
+
+def _project_template_names(engine):
+    """Template names under the engine's DIRS and the project's own apps' templates/."""
+    roots = [Path(directory) for directory in engine.dirs]
+    if engine.app_dirs:
+        base_dir = Path(settings.BASE_DIR)
+        roots += [
+            Path(config.path) / 'templates' for config in apps.get_app_configs()
+            if base_dir in Path(config.path).parents
+        ]
+    for root in roots:
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith(('.html', '.txt', '.xml')):
+                    yield (Path(dirpath) / filename).relative_to(root).as_posix()
+
+
+def compile_templates():
+    """Compiles the project's templates into the cached template loader. Returns how many."""
+    compiled = 0
+    for engine in engines.all():
+        for name in _project_template_names(engine):
+            try:
+                engine.get_template(name)
+                compiled += 1
+            except TemplateSyntaxError:
+                logger.exception("Template %s does not compile", name)
+    return compiled
+
+
+def open_connections():
+    """
+    Opens a connection per database; pooled backends keep it idle for the
+    first request. Under --preload this only proves the databases answer: a
+    forked worker drops the pooled connections it inherits (petrescue/db/pool.py).
+    """
+    for alias in settings.DATABASES:
+        connection = connections[alias]
+        connection.ensure_connection()
+        connection.close()
+
+
+def prime_caches():
+    """Fills the shared caches the busiest anonymous pages read."""
+    locality.dashboard_page()
+    search.facet_rows()
+    for kind in feeds.FEED_KINDS:
+        feeds.get_document(kind)
+
+
+STEPS = (
+    ('urls', load_urlconfs),
+    ('templates', compile_templates),
+    ('connections', open_connections),
+    ('caches', prime_caches),
+)
+
+
+def warm_up():
+    """Runs every step; returns {step: seconds}."""
+    timings = {}
+    for name, step in STEPS:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception("Warm-up step %s failed", name)
+        timings[name] = time.perf_counter() - started
+    logger.info("Warm-up finished: %s", ', '.join(f'{name} {seconds * 1000:.0f} ms' for name, seconds in timings.items()))
+    return timings
+
+
+def warm_up_if_enabled():
+    if getattr(settings, 'WARMUP_ON_START', False):
+        warm_up()